@@ -1 +1,3 @@
 # Global Time Utility (gtime) package
+
+__version__ = "0.3.3"
@@ -5,7 +5,7 @@
 Entry point for running gtime as a module: python -m gtime
 """
 
-from .cli import main
+from .complete import main
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Learned query aliases for Global Time Utility (gtime)
+Misspellings that fuzzy matching resolved ('Frankfort' -> Frankfurt) are remembered in
+~/.cache/gtime/aliases.json. Once a query has been used often enough, or the user confirmed its
+match (by adding it as a favorite, or by looking up one of the cities suggested for it), it is
+answered by a dict lookup next to the exact tier and never reaches the fuzzy scorer again.
+The table keeps at most MAX_ALIASES entries, evicting the least used and, among those, the oldest.
+"""
+
+import atexit
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .core import CACHE_DIR, get_city_index
+from .data import CITY_DB
+
+ALIAS_FILE = CACHE_DIR / "aliases.json"
+MAX_ALIASES = 500
+# Fuzzy lookups of the same query before it is answered from the table
+PROMOTE_AFTER = 3
+# How long suggestions stay open for the user to confirm one by looking it up
+PENDING_SECONDS = 600
+
+_table: Optional[dict] = None
+# Set while lookups have bumped use counts that are not on disk yet
+_dirty = False
+_flush_registered = False
+
+def _load() -> dict:
+    global _table
+    if _table is None:
+        try:
+            with open(ALIAS_FILE, "r") as f:
+                _table = json.load(f)
+        except Exception:
+            _table = {}
+        _table.setdefault("aliases", {})
+    return _table
+
+def _save() -> None:
+    global _dirty
+    _dirty = False
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(ALIAS_FILE, "w") as f:
+            json.dump(_table, f)
+    except Exception:
+        pass
+
+def _label(city_info: Tuple[str, str, str, str]) -> str:
+    return f"{city_info[0]} ({city_info[1]})"
+
+def lookup(query: str) -> Optional[Tuple[str, str, str, str]]:
+    """The city a promoted alias points to, counting the use; None for unknown or unpromoted queries."""
+    entry = _load()["aliases"].get(query.strip().lower())
+    if not entry or entry["uses"] < PROMOTE_AFTER:
+        return None
+    idx = get_city_index()["name_to_index"].get(entry["city"])
+    if idx is None:
+        return None
+    # Counted in memory and written once at exit, so a hit never waits on the disk
+    global _dirty, _flush_registered
+    entry["uses"] += 1
+    entry["last"] = int(time.time())
+    _dirty = True
+    if not _flush_registered:
+        _flush_registered = True
+        atexit.register(_flush)
+    return CITY_DB[idx]
+
+def _flush() -> None:
+    if _dirty:
+        _save()
+
+def _evict(aliases: Dict[str, dict]) -> None:
+    while len(aliases) > MAX_ALIASES:
+        del aliases[min(aliases, key=lambda query: (aliases[query]["uses"], aliases[query]["last"]))]
+
+def learn(query: str, city_info: Tuple[str, str, str, str], confirmed: bool = False) -> None:
+    """Count a fuzzy resolution of query to city_info; a confirmed one is promoted at once."""
+    key = query.strip().lower()
+    label = _label(city_info)
+    if not key or label not in get_city_index()["name_to_index"]:
+        return
+    aliases = _load()["aliases"]
+    entry = aliases.get(key)
+    if entry is None or entry["city"] != label:
+        entry = aliases[key] = {"city": label, "uses": 0}
+    entry["uses"] = max(entry["uses"] + 1, PROMOTE_AFTER if confirmed else 0)
+    entry["last"] = int(time.time())
+    _evict(aliases)
+    _save()
+
+def remember_suggestions(query: str, suggestions: List[str]) -> None:
+    """Keep the suggestions shown for an unresolved query, so looking one up soon after confirms it."""
+    if suggestions:
+        _load()["pending"] = {"query": query, "suggestions": suggestions, "at": int(time.time())}
+        _save()
+
+def confirm_suggestion(city_info: Tuple[str, str, str, str]) -> None:
+    """Called with each successful lookup: if it picked one of the pending suggestions, learn it."""
+    table = _load()
+    pending = table.get("pending")
+    if not pending:
+        return
+    if _label(city_info) in pending["suggestions"] and time.time() - pending["at"] <= PENDING_SECONDS:
+        learn(pending["query"], city_info, confirmed=True)
+    del table["pending"]
+    _save()
+
+def stats() -> Dict[str, int]:
+    aliases = _load()["aliases"]
+    return {"learned": len(aliases), "promoted": sum(entry["uses"] >= PROMOTE_AFTER for entry in aliases.values())}
+
+def clear() -> None:
+    global _table
+    _table = {"aliases": {}}
+    try:
+        ALIAS_FILE.unlink()
+    except OSError:
+        pass
@@ -12,43 +12,43 @@ import os
 import json
 import datetime
 from pathlib import Path
-from typing import List, Tuple, Optional
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt
-from rich.text import Text
-from rich.panel import Panel
-from rich.align import Align
-from rich.box import ROUNDED
+from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
 import random
 import time
 
 from .core import (
-    load_favorites, save_favorites, get_city_by_name, fuzzy_search_city, suggest_cities,
-    get_time_emoji, get_greeting, get_funny_footer
+    load_favorites, save_favorites, get_city_by_name, fuzzy_search_city, suggest_cities, rank_cities, TIER_FUZZY,
+    get_time_emoji, get_greeting, get_funny_footer, FUN_FACTS, parse_meeting_time, parse_instant, resolve_zone, format_utc_offset,
+    current_time, current_datetime, resolve_cities
 )
 from .data import CITY_DB
 
-console = Console()
+class _LazyConsole:
+    """Stands in for rich's Console until something is printed, so quiet paths never import rich."""
+    _console = None
+
+    def __getattr__(self, name):
+        global console
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        console = _LazyConsole._console
+        return getattr(console, name)
+
+console = _LazyConsole()
 FAV_FILE = Path.home() / ".gtime_favorites.json"
 
 def print_city_time(city, country, tz, emoji, meeting_time: Optional[datetime.datetime] = None):
-    from .core import ZoneInfo
-    now = datetime.datetime.now(ZoneInfo(tz))
-    dt = meeting_time.astimezone(ZoneInfo(tz)) if meeting_time else now
+    from rich.table import Table
+    from rich.panel import Panel
+    from .zones import localize
+    dt = localize(tz, meeting_time.timestamp() if meeting_time else current_time())
     hour = dt.hour
     emoji_time = get_time_emoji(hour)
     greeting = get_greeting(hour)
     footer = get_funny_footer(city, hour)
-    offset = dt.utcoffset()
-    if offset is not None:
-        total_minutes = offset.total_seconds() / 60
-        hours = int(total_minutes // 60)
-        minutes = int(abs(total_minutes) % 60)
-        sign = '+' if hours >= 0 else '-'
-        offset_str = f'UTC{sign}{abs(hours)}' + (f':{minutes:02}' if minutes else '')
-    else:
-        offset_str = 'UTC?'
+    offset_str = format_utc_offset(dt.utcoffset())
     table = Table(show_header=False, box=None)
     table.add_row(f"[bold cyan]{emoji} {city}, {country}[/bold cyan]")
     table.add_row(f"[green]{dt.strftime('%A, %B %d, %Y')}[/green]")
@@ -57,80 +57,102 @@ def print_city_time(city, country, tz, emoji, meeting_time: Optional[datetime.da
     table.add_row(f"[italic magenta]{footer}[/italic magenta]")
     console.print(Panel(table, title=f"{greeting}!", expand=False))
 
-def print_favorites(favs: List[str], meeting_time: Optional[datetime.datetime] = None):
-    from .core import ZoneInfo
+PAGE_SIZE = 50
+SORT_KEYS = ("offset", "time", "name")
+
+def _time_table(title=None, show_header: bool = True, widths: Optional[Tuple[int, ...]] = None):
+    from rich.table import Table
+    from rich.box import ROUNDED
+    widths = widths or (None,) * 5
+    paged = widths[0] is not None
+    table = Table(title=title, show_header=show_header, show_lines=not paged, box=ROUNDED, expand=False)
+    table.add_column("Flag", style="bold", justify="center", width=widths[0])
+    table.add_column("City", style="bold cyan", width=widths[1], no_wrap=paged)
+    table.add_column("Local Time", style="green", width=widths[2], no_wrap=paged)
+    table.add_column("Phase", style="magenta", width=widths[3], no_wrap=paged)
+    table.add_column("UTC Offset", style="yellow", width=widths[4], no_wrap=paged)
+    return table
+
+def _zone_offsets(found: List[Tuple[str, str, str, str]], ts: int) -> Dict[str, int]:
+    """UTC offset at ts of each distinct zone among the cities, one lookup per zone however many cities share it."""
+    from .zones import offset_at
+    offsets: Dict[str, int] = {}
+    for _, _, tz, _ in found:
+        if tz not in offsets:
+            offsets[tz] = offset_at(tz, ts)
+    return offsets
+
+def _sort_index(found: List[Tuple[str, str, str, str]], sort: Optional[str], ts: int) -> List[int]:
+    """Order rows by a key computed once per city (one offset lookup per zone), before any row is built."""
+    if not sort:
+        return list(range(len(found)))
+    if sort == "name":
+        keys = [(city.lower(), country.lower()) for city, country, _, _ in found]
+    else:
+        offsets = _zone_offsets(found, ts)
+        if sort == "offset":
+            keys = [offsets[tz] for _, _, tz, _ in found]
+        else:
+            keys = [(ts + offsets[tz]) % 86400 for _, _, tz, _ in found]
+    return sorted(range(len(found)), key=keys.__getitem__)
+
+def _iter_time_rows(found: List[Tuple[str, str, str, str]], order: List[int], ts: int):
+    from .formatting import time_row
+    offsets = _zone_offsets(found, ts)
+    for i in order:
+        yield time_row(found[i], ts, offsets[found[i][2]])
+
+def _print_paged(rows, found: List[Tuple[str, str, str, str]], page_size: int = PAGE_SIZE):
+    """Print rows in fixed-width chunks as they are produced, holding at most one page in memory."""
+    widths = [4, 0, 20, 17, 10]
+    # Fixed widths keep every page aligned; the city column takes whatever the terminal has left
+    longest = max(len(city) + len(country) + 2 for city, country, _, _ in found)
+    widths[1] = max(12, min(longest, console.width - sum(widths) - 16))
+    widths = tuple(widths)
+    table = _time_table(widths=widths)
+    for row in rows:
+        table.add_row(*row)
+        if table.row_count >= page_size:
+            console.print(table)
+            table = _time_table(show_header=False, widths=widths)
+    if table.row_count:
+        console.print(table)
+
+def _resolve_all(names: List[str]) -> List[Tuple[str, str, str, str]]:
+    return [c for c in map(get_city_by_name, names) if c]
+
+def print_favorites(favs: List[str], meeting_time: Optional[datetime.datetime] = None, sort: Optional[str] = None):
+    from rich.text import Text
+    from rich.panel import Panel
+    from rich.align import Align
+    from rich.box import ROUNDED
     if not favs:
         console.print("[red]No favorite cities set. Use 'gtime add <city>' to add one.[/red]")
         console.print("[yellow]Use 'gtime <city>' to search one and 'gtime --help' for more info[/yellow]")
         return
     banner = Text("🌍 GLOBAL TIME FAVORITES 🌍", style="bold magenta on cyan", justify="center")
     console.print(Align.center(banner))
-    table = Table(title=None, show_lines=True, box=ROUNDED, expand=False)
-    table.add_column("Flag", style="bold", justify="center")
-    table.add_column("City", style="bold cyan")
-    table.add_column("Local Time", style="green")
-    table.add_column("Phase", style="magenta")
-    table.add_column("UTC Offset", style="yellow")
-    for fav in favs:
-        city_info = get_city_by_name(fav)
-        if not city_info:
-            continue
-        city, country, tz, emoji = city_info
-        now = datetime.datetime.now(ZoneInfo(tz))
-        if meeting_time:
-            # Convert meeting time (assumed to be in local timezone) to the city's timezone
-            local_dt = datetime.datetime.now().astimezone()
-            local_tz = local_dt.tzinfo
-            meeting_time_local = meeting_time.replace(tzinfo=local_tz)
-            dt = meeting_time_local.astimezone(ZoneInfo(tz))
-        else:
-            dt = now
-        hour = dt.hour
-        emoji_time = get_time_emoji(hour)
-        phase = get_greeting(hour)
-        offset = dt.utcoffset()
-        if offset is not None:
-            total_minutes = offset.total_seconds() / 60
-            hours = int(total_minutes // 60)
-            minutes = int(abs(total_minutes) % 60)
-            sign = '+' if hours >= 0 else '-'
-            offset_str = f'UTC{sign}{abs(hours)}' + (f':{minutes:02}' if minutes else '')
-        else:
-            offset_str = 'UTC?'
-        table.add_row(
-            emoji, f"{city}, {country}", f"{dt.strftime('%a, %b %d %I:%M %p')}", f"{emoji_time} {phase}", offset_str
-        )
-    fun_facts = [
-        "Did you know? There are 24 time zones in the world! 🌐",
-        "UTC stands for Universal Time Coordinated! 🕒",
-        "Some countries have 30 or 45 minute offsets! ⏰",
-        "The world is a beautiful place—enjoy every timezone! 🌏",
-        "Time flies like an arrow. Fruit flies like a banana! 🍌",
-        "It's always 5 o'clock somewhere! 🍹",
-        "China uses only one time zone despite spanning 5 geographical zones! 🇨🇳",
-        "Russia has 11 time zones - the most of any country! 🇷🇺",
-        "The International Date Line isn't straight - it zigzags! 📅",
-        "Some Pacific islands are a full day ahead of others! 🏝️",
-        "Nepal has a unique +5:45 UTC offset - not a round hour! 🏔️",
-        "Australia's Lord Howe Island has a 30-minute daylight saving! ⏰",
-        "The North and South Poles technically have all time zones! 🧭",
-        "France has the most time zones (12) due to overseas territories! 🇫🇷",
-        "Arizona (mostly) doesn't observe daylight saving time! 🌵",
-        "Time zones were invented by railway companies! 🚂",
-        "Before time zones, every city had its own local time! 🏙️",
-        "The first country to see the new year is Kiribati! 🎉",
-        "GMT and UTC are almost the same but not exactly! ⏱️",
-        "Some countries have changed time zones for political reasons! 🗳️",
-    ]
-    footer = random.choice(fun_facts)
+    found = _resolve_all(favs)
+    # One instant for the whole render; a naive meeting time is in the local timezone, with that date's DST rules
+    ts = int(meeting_time.astimezone().timestamp() if meeting_time else current_time())
+    rows = _iter_time_rows(found, _sort_index(found, sort, ts), ts)
+    footer = random.choice(FUN_FACTS)
+    if len(found) > PAGE_SIZE:
+        console.print("[bold magenta]Your Favorite Cities[/bold magenta]")
+        _print_paged(rows, found)
+        console.print(f"[italic cyan]{footer}")
+        return
+    table = _time_table()
+    for row in rows:
+        table.add_row(*row)
     panel = Panel(table, title="[bold magenta]Your Favorite Cities[/bold magenta]", subtitle=f"[italic cyan]{footer}", border_style="bright_magenta", box=ROUNDED)
     console.print(panel)
 
-def print_compare(cities: List[str]):
-    from .core import ZoneInfo
+def print_compare(cities: List, sort: Optional[str] = None, at: Optional[datetime.datetime] = None):
+    """Compare cities given by name or as resolved (city, country, tz, emoji) rows, which are kept as they are."""
     found = []
     for name in cities:
-        city_info = get_city_by_name(name)
+        city_info = name if isinstance(name, tuple) else get_city_by_name(name)
         if city_info:
             found.append(city_info)
         else:
@@ -138,31 +160,269 @@ def print_compare(cities: List[str]):
     if not found:
         console.print("[red]No valid cities to compare.[/red]")
         return
-    table = Table(title="[bold magenta]Global Time Compare[/bold magenta]", show_lines=True, box=ROUNDED, expand=False)
-    table.add_column("Flag", style="bold", justify="center")
-    table.add_column("City", style="bold cyan")
-    table.add_column("Local Time", style="green")
-    table.add_column("Phase", style="magenta")
+    print_times(found, int(at.timestamp() if at else current_time()), "[bold magenta]Global Time Compare[/bold magenta]", sort)
+
+def print_times(found: List[Tuple[str, str, str, str]], ts: int, title: str, sort: Optional[str] = None):
+    """The shared table of resolved cities at one instant, paged when it is long."""
+    rows = _iter_time_rows(found, _sort_index(found, sort, ts), ts)
+    if len(found) > PAGE_SIZE:
+        console.print(title)
+        _print_paged(rows, found)
+        return
+    table = _time_table(title=title)
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
+
+def _format_shift(seconds: int) -> str:
+    hours, minutes = divmod(abs(seconds) // 60, 60)
+    return (f"{hours}h" if hours else "") + (f"{minutes}m" if minutes else "")
+
+def print_transitions(zone_cities: Dict[str, List[str]], days: int):
+    from rich.table import Table
+    from rich.box import ROUNDED
+    from .zones import cached_upcoming_transitions
+    now = int(current_time())
+    rows = cached_upcoming_transitions(list(zone_cities), now, days)
+    if not rows:
+        console.print(f"[green]No UTC offset changes in the next {days} days.[/green]")
+        return
+    table = Table(title=f"[bold magenta]Upcoming UTC Offset Changes (next {days} days)[/bold magenta]", show_lines=True, box=ROUNDED, expand=False)
+    table.add_column("When (your time)", style="green")
+    table.add_column("In", style="dim")
+    table.add_column("Cities", style="bold cyan")
+    table.add_column("Local Clocks", style="magenta")
     table.add_column("UTC Offset", style="yellow")
-    for city, country, tz, emoji in found:
-        now = datetime.datetime.now(ZoneInfo(tz))
-        hour = now.hour
-        emoji_time = get_time_emoji(hour)
-        phase = get_greeting(hour)
-        offset = now.utcoffset()
-        if offset is not None:
-            total_minutes = offset.total_seconds() / 60
-            hours = int(total_minutes // 60)
-            minutes = int(abs(total_minutes) % 60)
-            sign = '+' if hours >= 0 else '-'
-            offset_str = f'UTC{sign}{abs(hours)}' + (f':{minutes:02}' if minutes else '')
-        else:
-            offset_str = 'UTC?'
-        table.add_row(
-            emoji, f"{city}, {country}", f"{now.strftime('%a, %b %d %I:%M %p')}", f"{emoji_time} {phase}", offset_str
+    for ts, tz, before, after in rows:
+        when = datetime.datetime.fromtimestamp(ts).astimezone()
+        cities = zone_cities[tz]
+        names = ", ".join(cities[:3]) + (f" +{len(cities) - 3} more" if len(cities) > 3 else "")
+        direction = "forward" if after > before else "back"
+        clocks = (
+            f"{time.strftime('%H:%M', time.gmtime(ts + before))} → {time.strftime('%H:%M', time.gmtime(ts + after))}"
+            f" ({direction} {_format_shift(after - before)})"
         )
+        offsets = f"{format_utc_offset(datetime.timedelta(seconds=before))} → {format_utc_offset(datetime.timedelta(seconds=after))}"
+        table.add_row(when.strftime('%a, %b %d %Y %I:%M %p'), f"{(ts - now) // 86400}d", names, clocks, offsets)
     console.print(table)
 
+TIMELINE_HOURS = (24, 48)
+TIMELINE_NAME_WIDTH = 18
+PHASE_STYLES = {
+    "Good morning": "black on khaki1",
+    "Good afternoon": "black on gold1",
+    "Good evening": "white on dark_orange3",
+    "Good night": "grey70 on navy_blue",
+}
+
+@lru_cache(maxsize=None)
+def _timeline_cell(hour: int, now: bool) -> str:
+    style = PHASE_STYLES[get_greeting(hour)] + (" bold underline" if now else "")
+    return f"[{style}]{hour:02}[/]"
+
+@lru_cache(maxsize=8)
+def timeline_lines(found: Tuple[Tuple[str, str, str, str], ...], start: int, hours: int, now_col: int) -> List[str]:
+    """One markup line per city: its name, then a two-character cell per hour colored by phase.
+    Offsets are computed once per distinct zone and cities sharing a zone share the cells;
+    watch mode redraws reuse the lines until the current hour moves."""
+    from .ranges import local_hours
+    zones = list(dict.fromkeys(tz for _, _, tz, _ in found))
+    cells = {}
+    for tz, row in zip(zones, local_hours(zones, start, hours)):
+        cells[tz] = "".join(_timeline_cell(hour, col == now_col) for col, hour in enumerate(row))
+    width = TIMELINE_NAME_WIDTH
+    return [f"[bold cyan]{city[:width - 1]:<{width}}[/]{cells[tz]}" for city, _, tz, _ in found]
+
+def timeline_start(now: datetime.datetime) -> int:
+    # Columns start at the viewer's local midnight, whatever offset `now` was given in
+    return int(now.astimezone().replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+def timeline_markup(found: List[Tuple[str, str, str, str]], hours: int, now: datetime.datetime) -> List[str]:
+    """Heading, 'now' marker, one line per city and the legend; all but the legend are printed unwrapped."""
+    now = now.astimezone()
+    start = timeline_start(now)
+    now_col = (int(now.timestamp()) - start) // 3600
+    marker = " " * (TIMELINE_NAME_WIDTH + 2 * now_col) + "▼ now" if now_col < hours else ""
+    return [
+        f"[bold magenta]Timeline for {now.strftime('%a, %b %d')} (your time, {hours}h)[/bold magenta]",
+        f"[bold]{marker}[/bold]",
+        *timeline_lines(tuple(found), start, hours, now_col),
+        "  ".join(f"[{style}] {phase[5:]} [/]" for phase, style in PHASE_STYLES.items()),
+    ]
+
+def print_timeline(cities: List[str], hours: int = 24, at: Optional[datetime.datetime] = None):
+    found = _resolve_all(cities)
+    if not found:
+        console.print("[red]No favorite cities set. Use 'gtime add <city>' to add one.[/red]")
+        return
+    *lines, legend = timeline_markup(found, hours, at or current_datetime())
+    for line in lines:
+        console.print(line, no_wrap=True, overflow="crop")
+    console.print(legend)
+
+def _signed_shift(seconds: int) -> str:
+    return ("+" if seconds > 0 else "-") + _format_shift(seconds)
+
+def print_recurring_drift(found: List[Tuple[str, str, str, str]], source: str, label: str,
+                          meeting_time: datetime.datetime, weeks: int):
+    from rich.table import Table
+    from rich.box import ROUNDED
+    from .zones import weekly_drift, wall_to_instant, localize
+    import calendar
+    wall = calendar.timegm(meeting_time.timetuple())
+    zone_cities: Dict[str, List[str]] = {}
+    for city, _, tz, _ in found:
+        zone_cities.setdefault(tz, []).append(city)
+    first = wall_to_instant(source, wall)
+    when = meeting_time.strftime("%a %I:%M %p")
+    rows = weekly_drift(source, wall, weeks, list(zone_cities))
+    if not rows:
+        console.print(f"[green]No drift: a weekly meeting on {when} {label} stays at the same local time for every favorite over {weeks} weeks.[/green]")
+        return
+    # Consecutive weeks with the same shifts are reported as one run
+    runs = []
+    for week, ts, drift in rows:
+        if runs and runs[-1][1] == week - 1 and runs[-1][2] == drift:
+            runs[-1][1] = week
+        else:
+            runs.append([week, week, drift, ts])
+    table = Table(title=f"[bold magenta]Weekly meeting {when} {label}: weeks that move for favorites[/bold magenta]", show_lines=True, box=ROUNDED, expand=False)
+    table.add_column("Weeks", style="green")
+    table.add_column("Dates", style="dim")
+    table.add_column("Cities", style="bold cyan")
+    table.add_column("Local Time (week 1 → then)", style="magenta")
+    table.add_column("Shift", style="yellow")
+    for start, end, drift, ts in runs:
+        weeks_label = f"{start + 1}" if start == end else f"{start + 1}–{end + 1}"
+        dates = meeting_time.date() + datetime.timedelta(weeks=start)
+        dates_label = dates.strftime("%b %d") + ("" if start == end else " – " + (meeting_time.date() + datetime.timedelta(weeks=end)).strftime("%b %d"))
+        for tz, shift in drift.items():
+            before, after = localize(tz, first), localize(tz, ts)
+            table.add_row(weeks_label, dates_label, ", ".join(zone_cities[tz]),
+                          f"{before.strftime('%a %H:%M')} → {after.strftime('%a %H:%M')}", _signed_shift(shift))
+    console.print(table)
+
+def is_interactive() -> bool:
+    return sys.stdin.isatty() and sys.stdout.isatty()
+
+def pick_cities(initial: str = "", multi: bool = False, title: str = "City") -> List[Tuple[str, str, str, str]]:
+    from .core import _get_city_names
+    from .picker import pick
+    names, _ = _get_city_names()
+    return [CITY_DB[idx] for idx in pick(names, initial, multi, title)]
+
+def add_favorite(city_info: Tuple[str, str, str, str], favs: List[str]):
+    city, country, _, _ = city_info
+    if len({other for name, other, _, _ in CITY_DB if name == city} | {country}) > 1:
+        # Saved as 'City (Country)' so the favorite resolves to this row, not the first city of that name
+        city = f"{city} ({country})"
+    if city not in favs:
+        favs.append(city)
+        save_favorites(favs)
+        console.print(f"[green]Added {city} to favorites![/green]")
+    else:
+        console.print(f"[yellow]{city} is already in favorites.[/yellow]")
+
+def pop_option(args: List[str], name: str, default: Optional[str] = None) -> Optional[str]:
+    if name in args:
+        idx = args.index(name)
+        if idx + 1 < len(args):
+            value = args[idx + 1]
+            del args[idx:idx + 2]
+            return value
+        del args[idx]
+    return default
+
+def run_http_server(args: List[str]):
+    from .server import serve, DEFAULT_HOST, DEFAULT_PORT
+    host = pop_option(args, "--host", DEFAULT_HOST)
+    port = pop_option(args, "--port", str(DEFAULT_PORT))
+    if not port.isdigit():
+        console.print(f"[red]Invalid port:[/red] {port}")
+        return
+    def started(addresses):
+        for address in addresses:
+            console.print(f"[green]Serving gtime JSON API on http://{address[0]}:{address[1]}[/green]")
+        console.print("[dim]Endpoints: /resolve, /time, /convert, /meeting. Press Ctrl+C to stop.[/dim]")
+    try:
+        serve(host, int(port), started)
+    except KeyboardInterrupt:
+        console.print("\n[green]Stopped HTTP server.[/green]")
+    except OSError as e:
+        console.print(f"[red]Could not start HTTP server:[/red] {e}")
+
+def run_convert(args: List[str]):
+    from .ranges import FORMATS, parse_duration, convert_range, write_rows
+    fmt = pop_option(args, "--format", "csv")
+    step = parse_duration(pop_option(args, "--step", "1h"))
+    start_text = pop_option(args, "--from")
+    end_text = pop_option(args, "--to", "1d")
+    start = parse_instant(start_text) if start_text else current_datetime().replace(second=0, microsecond=0)
+    if fmt not in FORMATS:
+        console.print(f"[red]Invalid format:[/red] {fmt} [yellow](use one of: {', '.join(FORMATS)})[/yellow]")
+        return
+    if not step:
+        console.print("[red]Invalid step.[/red] [yellow]Use a duration such as 30m, 1h or 1d12h.[/yellow]")
+        return
+    if start is None:
+        console.print(f"[red]Invalid instant:[/red] {start_text}")
+        return
+    # --to takes an instant, or a duration counted from --from
+    span = parse_duration(end_text)
+    end = start + datetime.timedelta(seconds=span) if span else parse_instant(end_text)
+    if end is None or end < start:
+        console.print(f"[red]Invalid end of range:[/red] {end_text}")
+        return
+    if not args:
+        console.print("[red]Usage: gtime convert [--from <t>] [--to <t|duration>] [--step <duration>] [--format csv|jsonl] <city1> <city2> ...[/red]")
+        return
+    found = []
+    for name in args:
+        city_info = get_city_by_name(name)
+        if not city_info:
+            console.print(f"[red]City not found:[/red] {name}")
+            suggestions = suggest_cities(name)
+            if suggestions:
+                console.print(f"[yellow]Did you mean:[/yellow] {', '.join(suggestions)}")
+            return
+        found.append(city_info)
+    rows = convert_range([tz for _, _, tz, _ in found], int(start.timestamp()), int(end.timestamp()), step)
+    try:
+        write_rows(sys.stdout, ["utc"] + [city for city, _, _, _ in found], rows, fmt)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader (e.g. 'head') went away; point stdout at devnull so the exit flush stays quiet
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+def run_localize(args: List[str]):
+    from .localize import FORMATS, localize
+    fmt = pop_option(args, "--format")
+    workers = pop_option(args, "--workers", str(os.cpu_count() or 1))
+    source = args[0] if args and args[0] != "-" else None
+    if fmt is None:
+        fmt = "jsonl" if source and source.endswith((".jsonl", ".ndjson")) else "csv"
+    if fmt not in FORMATS:
+        console.print(f"[red]Invalid format:[/red] {fmt} [yellow](use one of: {', '.join(FORMATS)})[/yellow]")
+        return
+    if not workers.isdigit() or int(workers) < 1:
+        console.print(f"[red]Invalid number of workers:[/red] {workers}")
+        return
+    if source is None and sys.stdin.isatty():
+        console.print("[red]Usage: gtime localize [--format csv|jsonl] [--workers N] [FILE][/red] [yellow](reads stdin without FILE)[/yellow]")
+        return
+    try:
+        rows, failed = localize(source, sys.stdout.buffer, fmt, int(workers), stdin=sys.stdin.buffer)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    except OSError as e:
+        console.print(f"[red]Could not read input:[/red] {e}")
+        return
+    if failed:
+        # stdout carries the data; report on stderr
+        sys.stderr.write(f"gtime: {failed} of {rows} rows had an unknown city or unparseable timestamp\n")
+
 def watch_mode(func, *args, **kwargs):
     try:
         while True:
@@ -176,67 +436,6 @@ def watch_mode(func, *args, **kwargs):
     except KeyboardInterrupt:
         console.print("\n[green]Exited watch mode.[/green]")
 
-def parse_meeting_time(args: List[str]) -> Tuple[Optional[datetime.datetime], Optional[str]]:
-    if "at" in args:
-        idx = args.index("at")
-    elif "on" in args:
-        idx = args.index("on")
-    else:
-        return None, None
-    time_str = " ".join(args[idx+1:])
-    today = datetime.datetime.now()
-    
-    timezone_spec = None
-    timezone_info = None
-    timezone_aliases = {
-        'UTC': ('UTC', 'Coordinated Universal Time'),
-        'GMT': ('UTC', 'Greenwich Mean Time'),
-        'EST': ('America/New_York', 'Eastern Standard Time'),
-        'EDT': ('America/New_York', 'Eastern Daylight Time'), 
-        'CST': ('America/Chicago', 'Central Standard Time'),
-        'CDT': ('America/Chicago', 'Central Daylight Time'),
-        'MST': ('America/Denver', 'Mountain Standard Time'),
-        'MDT': ('America/Denver', 'Mountain Daylight Time'),
-        'PST': ('America/Los_Angeles', 'Pacific Standard Time'),
-        'PDT': ('America/Los_Angeles', 'Pacific Daylight Time'),
-        'CET': ('Europe/Paris', 'Central European Time'),
-        'CEST': ('Europe/Paris', 'Central European Summer Time'),
-        'JST': ('Asia/Tokyo', 'Japan Standard Time'),
-        'IST': ('Asia/Kolkata', 'India Standard Time'),
-    }
-    
-    parts = time_str.split()
-    if len(parts) > 1 and parts[-1].upper() in timezone_aliases:
-        tz_abbr = parts[-1].upper()
-        timezone_spec, tz_name = timezone_aliases[tz_abbr]
-        timezone_info = f"{tz_name} ({tz_abbr})"
-        time_str = " ".join(parts[:-1])
-    
-    formats = [
-        "%I:%M %p",    # 12-hour format with AM/PM (e.g., "3:30 PM")
-        "%H:%M",       # 24-hour format (e.g., "15:30")
-        "%I %p",       # Hour only with AM/PM (e.g., "3 PM")
-        "%H",          # Hour only 24-hour (e.g., "15")
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.datetime.strptime(time_str, fmt)
-            meeting_time = today.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
-            
-            if timezone_spec:
-                from .core import ZoneInfo
-                specified_tz = ZoneInfo(timezone_spec)
-                meeting_time_in_tz = meeting_time.replace(tzinfo=specified_tz)
-                local_meeting_time = meeting_time_in_tz.astimezone()
-                meeting_time = local_meeting_time.replace(tzinfo=None)
-            
-            return meeting_time, timezone_info
-        except (ValueError, Exception):
-            continue
-    
-    return None, None
-
 def print_help():
     help_text = """
 [bold cyan]gtime - Global Time Utility[/bold cyan]
@@ -244,17 +443,48 @@ def print_help():
 [bold yellow]Usage:[/bold yellow]
   gtime [command] [arguments]
   gtime <city name>
+  gtime <IANA zone | abbreviation | UTC offset>   (e.g. Asia/Kathmandu, NZST, UTC+5:45)
 
 [bold yellow]Commands:[/bold yellow]
-  [green]add <city>[/green]         Add a city to your favorites
+  [green]add <city>[/green]         Add a city to your favorites ('gtime add' alone opens the interactive picker)
   [green]remove <city>[/green]      Remove a city from your favorites
   [green]list[/green]               List your favorite cities and their current times
   [green]list --watch[/green]       Watch mode: continuously refresh your favorites list every 60 seconds
   [green]meeting at / on <time>[/green]  Show favorite cities' times for a meeting (e.g. 'meeting at 10:00 AM', 'meeting at 15:30 UTC', or 'meeting on 3 PM EST')
-  [green]compare <city1> <city2> ...[/green]  Compare times for multiple cities
+  [green]meeting at <time> [in <city|tz>] for <city> ...[/green]  The meeting's time in the given cities instead of favorites
+                     (e.g. 'meeting at 10:00 in Tokyo for London "New York"'); with no cities after 'for', reads one per line from stdin
+  [green]meeting recur <time> <tz|city> [--weeks N][/green]  Weeks where a weekly meeting moves for a favorite because of DST (e.g. 'meeting recur 9 AM EST --weeks 26')
+  [green]compare <city1> <city2> ...[/green]  Compare times for multiple cities ('gtime compare' alone picks interactively)
   [green]compare <city1> <city2> ... --watch[/green]  Watch mode: continuously refresh city comparison
+  [green]--sort offset|time|name[/green]  Order list, meeting and compare rows by UTC offset, local time of day or city name
+  [green]convert [--from <t>] [--to <t|duration>] [--step <duration>] [--format csv|jsonl] <city1> <city2> ...[/green]
+                     Stream a table of local times for each step of a range as CSV or JSON Lines
+  [green]localize [--format csv|jsonl] [--workers N] [FILE][/green]
+                     Add a local_time column to (utc timestamp, city) records from FILE or stdin
+  [green]ics <file.ics> [--from <t>] [--to <t|duration>] [--format table|jsonl] [city ...][/green]
+                     Each calendar event (recurrences expanded, next 30 days by default) in your favorites' or the given cities' local times
+  [green]timeline [--hours 24|48] [--watch] [city ...][/green]
+                     Hourly day/night heatmap for your favorites (or the given cities), current hour marked
+  [green]dashboard [favorites] [timeline] [NAME=city,city,...] [--hours 24|48] [--once][/green]
+                     Several panels in one live screen (default: favorites and timeline), each redrawn only when it changes
+  [green]team load <roster.csv> [--name TEAM][/green]  Store a roster of people and their cities (columns name,city and optionally team)
+  [green]team show <team> [--working][/green]  Team members grouped by time zone; --working keeps those in working hours (9-17 on weekdays)
+  [green]team list | team remove <team>[/green]  List or remove loaded teams
+  [green]overlap [--week] [--hours 9-17] [--format table|csv] [city ...][/green]
+                     Matrix of working hours shared by every pair of favorites (or the given cities), per day or per week
+  [green]next <HH:MM | H AM/PM> [--favorites | --all | city ...][/green]
+                     When each city's clock next reads that time, and what that is in yours, soonest first (DST gaps and repeats noted)
+  [green]cache build|stats|clear [--aliases][/green]  Manage the on-disk index snapshot that lets gtime start without rebuilding its lookup indexes
+                     (clear --aliases also forgets the misspellings gtime learned to correct)
+  [green]--at <ISO instant or date>[/green]  Show a city, list or compare at another instant (e.g. '--at 2025-03-30T09:00Z'); with meeting, sets the date
   [green]watch[/green]              Same as 'list --watch' - watch your favorites in real-time
+  [green]watch --stream json [--every <duration>] [--changes] [--count N] [city ...][/green]
+                     One JSON Lines record per city and tick (every minute by default) for status bars and scripts;
+                     --changes writes a city only when its local minute or offset moved
+  [green]transitions [--days N] [--all][/green]  List upcoming UTC offset (DST) changes for favorites, or every known city
+  [green]http [--host H] [--port N][/green]  Serve /resolve, /time, /convert and /meeting as a JSON API
   [green]<city name>[/green]        Show the current time for any city (fuzzy search supported)
+  [green]--completion bash|zsh|fish[/green]  Print a shell completion script (e.g. eval "$(gtime --completion bash)")
   [green]-h, --help[/green]         Show this help message
 
 [bold yellow]Watch Mode:[/bold yellow]
@@ -263,109 +493,749 @@ def print_help():
 """
     console.print(help_text)
 
-def main():
-    args = sys.argv[1:]
-    if args and args[0] in ('-h', '--help'):
-        print_help()
-        return
-    favs = load_favorites()
-    local_hour = datetime.datetime.now().hour
-    greeting = get_greeting(local_hour)
+class Context:
+    """What a command handler receives: its arguments, the global options and, on first access,
+    the dependencies it declared. Touching an undeclared dependency is a programming error."""
+
+    def __init__(self, name: str, args: List[str], needs: Tuple[str, ...], sort: Optional[str] = None,
+                 at: Optional[datetime.datetime] = None):
+        self.name = name
+        self.args = args
+        self.needs = needs
+        self.sort = sort
+        self.at = at
+
+    def __getattr__(self, name):
+        loader = DEPENDENCIES.get(name)
+        if loader is None:
+            raise AttributeError(name)
+        if name not in self.needs:
+            raise AttributeError(f"command '{self.name}' did not declare dependency '{name}'")
+        value = loader()
+        setattr(self, name, value)
+        return value
+
+def _rich_console():
+    console.file  # any attribute access swaps the lazy proxy for the real rich Console
+    return console
+
+def _fuzzy_engine():
+    from types import SimpleNamespace
+    # thefuzz itself is imported by core on the first lookup that misses an exact match
+    return SimpleNamespace(find=get_city_by_name, suggest=suggest_cities, rank=rank_cities, resolve=resolve_cities)
+
+def _tz_layer():
+    from . import zones
+    return zones
+
+# Dependencies a command can declare; each is loaded the first time the handler touches it
+DEPENDENCIES = {
+    "favorites": load_favorites,
+    "console": _rich_console,
+    "fuzzy": _fuzzy_engine,
+    "tz": _tz_layer,
+}
+
+# name -> (handler, declared dependencies, print the greeting banner first);
+# "" is bare 'gtime' and None the fallback city lookup
+COMMANDS: Dict[Optional[str], Tuple[object, Tuple[str, ...], bool]] = {}
+
+def command(*names: Optional[str], needs: Tuple[str, ...] = (), banner: bool = False):
+    def register(handler):
+        for name in names:
+            COMMANDS[name] = (handler, needs, banner)
+        return handler
+    return register
+
+def print_banner():
+    greeting = get_greeting(current_datetime().hour)
     try:
         user = os.getlogin()
     except Exception:
         user = "user"
     console.print(f"[bold blue]{greeting}, {user}! Welcome to Global Time Utility 🌐[/bold blue]")
 
-    if not args:
-        print_favorites(favs)
+def _print_not_found(ctx: Context, name: str, message: str = "[red]City not found:[/red] {}"):
+    from .aliases import remember_suggestions
+    ctx.console.print(message.format(name))
+    suggestions = ctx.fuzzy.suggest(name)
+    if suggestions:
+        ctx.console.print(f"[yellow]Did you mean:[/yellow] {', '.join(suggestions)}")
+        remember_suggestions(name, suggestions)
+
+@command("--complete")
+def cmd_complete(ctx: Context):
+    from .complete import answer
+    answer(ctx.args)
+
+@command("--completion", needs=("console",))
+def cmd_completion(ctx: Context):
+    from .complete import completion_script, SCRIPTS
+    script = completion_script(ctx.args[0] if ctx.args else "")
+    if script is None:
+        ctx.console.print(f"[red]Usage: gtime --completion {'|'.join(SCRIPTS)}[/red]")
         return
+    sys.stdout.write(script)
+
+@command("-h", "--help", needs=("console",))
+def cmd_help(ctx: Context):
+    print_help()
 
-    cmd = args[0].lower()
+@command("convert", needs=("console",))
+def cmd_convert(ctx: Context):
+    # Machine-readable output: no greeting banner
+    run_convert(ctx.args)
 
-    if cmd == "watch" or (cmd == "list" and len(args) > 1 and args[1] == "--watch"):
-        watch_mode(print_favorites, favs)
+@command("localize", needs=("console",))
+def cmd_localize(ctx: Context):
+    run_localize(ctx.args)
+
+ICS_SUMMARY_WIDTH = 32
+
+def run_ics(ctx: Context):
+    from .ics import FORMATS, events, occurrences, localized
+    from .ranges import parse_duration, format_local, _iso
+    from .formatting import local_time_label
+    usage = "[red]Usage: gtime ics <file.ics> [--from <t>] [--to <t|duration>] [--format table|jsonl] [city ...][/red]"
+    fmt = pop_option(ctx.args, "--format", "table")
+    start_text = pop_option(ctx.args, "--from")
+    end_text = pop_option(ctx.args, "--to", "30d")
+    if fmt not in FORMATS:
+        ctx.console.print(f"[red]Invalid format:[/red] {fmt} [yellow](use one of: {', '.join(FORMATS)})[/yellow]")
         return
-    if cmd == "compare" and (len(args) > 2 and args[-1] == "--watch"):
-        watch_mode(print_compare, [c for c in args[1:-1]])
+    if not ctx.args:
+        ctx.console.print(usage)
         return
-
-    if cmd == "add" and len(args) > 1:
-        city_info = get_city_by_name(" ".join(args[1:]))
+    start = parse_instant(start_text) if start_text else current_datetime().replace(hour=0, minute=0, second=0, microsecond=0)
+    if start is None:
+        ctx.console.print(f"[red]Invalid instant:[/red] {start_text}")
+        return
+    span = parse_duration(end_text)
+    end = start + datetime.timedelta(seconds=span) if span else parse_instant(end_text)
+    if end is None or end < start:
+        ctx.console.print(f"[red]Invalid end of range:[/red] {end_text}")
+        return
+    path, names = ctx.args[0], ctx.args[1:] or ctx.favorites
+    found = []
+    for name in names:
+        city_info = ctx.fuzzy.find(name)
         if city_info:
-            city, *_ = city_info
-            if city not in favs:
-                favs.append(city)
-                save_favorites(favs)
-                console.print(f"[green]Added {city} to favorites![/green]")
-            else:
-                console.print(f"[yellow]{city} is already in favorites.[/yellow]")
+            found.append(city_info)
         else:
-            console.print("[red]City not found.[/red]")
-            suggestions = suggest_cities(" ".join(args[1:]))
-            if suggestions:
-                console.print(f"[yellow]Did you mean:[/yellow] {', '.join(suggestions)}")
+            _print_not_found(ctx, name)
+    if not found:
+        ctx.console.print("[red]No cities to convert to. Add favorites or name cities after the file.[/red]")
+        return
+    zones = [tz for _, _, tz, _ in found]
+    try:
+        f = open(path, "r", encoding="utf-8", errors="replace", newline="")
+    except OSError as e:
+        ctx.console.print(f"[red]Cannot read calendar:[/red] {e}")
         return
+    with f:
+        rows = localized(occurrences(events(f), int(start.timestamp()), int(end.timestamp())), zones)
+        try:
+            if fmt == "jsonl":
+                for (ts, until, summary, uid, all_day), offsets in rows:
+                    row = {"summary": summary, "uid": uid, "utc": _iso(ts, 0, "Z"), "end": _iso(until, 0, "Z"), "all_day": all_day}
+                    row.update((city, format_local(ts, offset)) for (city, _, _, _), offset in zip(found, offsets))
+                    sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+                return
+            widths = (ICS_SUMMARY_WIDTH,) + (20,) * len(found)
+            count = 0
+            table = None
+            for (ts, _, summary, _, _), offsets in rows:
+                if table is None:
+                    table = _ics_table(found, widths, show_header=not count)
+                table.add_row(summary, *[local_time_label(ts, offset) for offset in offsets])
+                count += 1
+                if table.row_count >= PAGE_SIZE:
+                    ctx.console.print(table)
+                    table = None
+            if table is not None:
+                ctx.console.print(table)
+            ctx.console.print(f"[dim]{count} occurrences between {start.strftime('%Y-%m-%d %H:%M')} and {end.strftime('%Y-%m-%d %H:%M')} (your time)[/dim]")
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
-    if cmd == "remove" and len(args) > 1:
-        city = " ".join(args[1:])
-        if city in favs:
-            favs.remove(city)
-            save_favorites(favs)
-            console.print(f"[green]Removed {city} from favorites.[/green]")
-        else:
-            console.print(f"[yellow]{city} is not in favorites.[/yellow]")
+def _ics_table(found: List[Tuple[str, str, str, str]], widths: Tuple[int, ...], show_header: bool):
+    from rich.table import Table
+    from rich.box import ROUNDED
+    table = Table(show_header=show_header, box=ROUNDED, expand=False)
+    table.add_column("Event", style="bold cyan", width=widths[0], no_wrap=True)
+    for (city, _, _, emoji), width in zip(found, widths[1:]):
+        table.add_column(f"{emoji} {city}", style="green", width=width, no_wrap=True)
+    return table
+
+@command("ics", needs=("favorites", "console", "fuzzy"))
+def cmd_ics(ctx: Context):
+    # Output may be machine-readable: no greeting banner
+    run_ics(ctx)
+
+@command("http", needs=("console",), banner=True)
+def cmd_http(ctx: Context):
+    run_http_server(ctx.args)
+
+@command("", needs=("favorites", "console"), banner=True)
+def cmd_default(ctx: Context):
+    if not ctx.favorites and is_interactive():
+        picked = pick_cities(title="Look up city")
+        if picked:
+            print_city_time(*picked[0], ctx.at)
+            return
+    print_favorites(ctx.favorites, ctx.at, sort=ctx.sort)
+
+@command("transitions", needs=("favorites", "console", "tz"), banner=True)
+def cmd_transitions(ctx: Context):
+    days = pop_option(ctx.args, "--days", "90")
+    if not days.isdigit():
+        ctx.console.print(f"[red]Invalid number of days:[/red] {days}")
         return
+    rows = CITY_DB if ("--all" in ctx.args or not ctx.favorites) else _resolve_all(ctx.favorites)
+    zone_cities: Dict[str, List[str]] = {}
+    for city, _, tz, _ in rows:
+        zone_cities.setdefault(tz, []).append(city)
+    print_transitions(zone_cities, int(days))
 
-    if cmd == "list":
-        print_favorites(favs)
+@command("timeline", needs=("favorites", "console"), banner=True)
+def cmd_timeline(ctx: Context):
+    hours = pop_option(ctx.args, "--hours", "24")
+    if not hours.isdigit() or int(hours) not in TIMELINE_HOURS:
+        ctx.console.print(f"[red]Invalid number of hours:[/red] {hours} [yellow](use 24 or 48)[/yellow]")
         return
+    watch = "--watch" in ctx.args
+    cities = [name for name in ctx.args if name != "--watch"] or ctx.favorites
+    if watch:
+        watch_mode(print_timeline, cities, int(hours))
+    else:
+        print_timeline(cities, int(hours), ctx.at)
+
+def _format_age(seconds: int) -> str:
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
+@command("cache", needs=("console",))
+def cmd_cache(ctx: Context):
+    from . import aliases, snapshot
+    action = ctx.args[0] if ctx.args else "stats"
+    if action == "build":
+        start = time.perf_counter()
+        built = snapshot.build()
+        ctx.console.print(f"[green]Built index snapshot:[/green] {built['cities']} cities, {built['zone_tables']} offset tables "
+                          f"for {built['zones']} zones, {built['bytes'] / 1024:.0f} KiB in {(time.perf_counter() - start) * 1000:.0f} ms")
+    elif action == "clear":
+        if snapshot.clear():
+            ctx.console.print("[green]Removed index snapshot.[/green]")
+        else:
+            ctx.console.print("[yellow]No index snapshot to remove.[/yellow]")
+        if "--aliases" in ctx.args:
+            aliases.clear()
+            ctx.console.print("[green]Forgot learned aliases.[/green]")
+    elif action == "stats":
+        info = snapshot.stats()
+        ctx.console.print(f"[bold cyan]Snapshot:[/bold cyan] {info['path']}")
+        if not info["exists"]:
+            ctx.console.print("[yellow]Not built. Run 'gtime cache build'.[/yellow]")
+        elif not info["valid"]:
+            ctx.console.print(f"[yellow]Stale ({info['bytes'] / 1024:.0f} KiB): built for other city data or another gtime version. Run 'gtime cache build'.[/yellow]")
+        else:
+            ctx.console.print(f"  Size: {info['bytes'] / 1024:.0f} KiB, age {_format_age(info['age_seconds'])}, "
+                              f"{info['cities']} cities, {info['zone_tables']} offset tables")
+        rate = "n/a" if info["hit_rate"] is None else f"{info['hit_rate']:.0%}"
+        ctx.console.print(f"  Loads: {info['hits']} hits, {info['misses']} misses (hit rate {rate}), {info['builds']} builds")
+        learned = aliases.stats()
+        ctx.console.print(f"  Learned aliases: {learned['learned']} ({learned['promoted']} answering without fuzzy search)")
+    else:
+        ctx.console.print("[red]Usage: gtime cache build|stats|clear [--aliases][/red]")
 
-    if cmd == "meeting":
-        if len(args) == 1:
-            print_favorites(favs)
+def run_dashboard(ctx: Context):
+    from .dashboard import ClockPanel, TimelinePanel, run
+    hours = pop_option(ctx.args, "--hours", "24")
+    if not hours.isdigit() or int(hours) not in TIMELINE_HOURS:
+        ctx.console.print(f"[red]Invalid number of hours:[/red] {hours} [yellow](use 24 or 48)[/yellow]")
+        return
+    once = "--once" in ctx.args
+    specs = [arg for arg in ctx.args if arg != "--once"] or ["favorites", "timeline"]
+    panels = []
+    for spec in specs:
+        if spec == "favorites":
+            panels.append(ClockPanel("Your Favorite Cities", _resolve_all(ctx.favorites), ctx.sort))
+        elif spec == "timeline":
+            panels.append(TimelinePanel(_resolve_all(ctx.favorites), int(hours)))
+        elif "=" in spec:
+            # A named compare group: 'work=London,Tokyo,New York'
+            title, _, names = spec.partition("=")
+            found = []
+            for name in filter(None, (n.strip() for n in names.split(","))):
+                city_info = ctx.fuzzy.find(name)
+                if city_info:
+                    found.append(city_info)
+                else:
+                    _print_not_found(ctx, name)
+            panels.append(ClockPanel(title, found, ctx.sort))
+        else:
+            ctx.console.print(f"[red]Unknown panel:[/red] {spec} [yellow](use favorites, timeline or NAME=city,city,...)[/yellow]")
             return
-        meeting_time, timezone_info = parse_meeting_time(args)
-        if meeting_time is None:
-            console.print("[red]Invalid meeting command. Use: 'meeting at/on <time>' (e.g. 'meeting at 10:00 AM', 'meeting at 15:30 UTC', or 'meeting on 3 PM EST').[/red]")
-            console.print("[yellow]See 'gtime -h' for help.[/yellow]")
+    panels = [panel for panel in panels if panel.found]
+    if not panels:
+        ctx.console.print("[red]No favorite cities set. Use 'gtime add <city>' to add one.[/red]")
+        return
+    from rich.console import Group
+    if once:
+        ts = int(ctx.at.timestamp() if ctx.at else current_time())
+        ctx.console.print(Group(*[panel.render(ts) for panel in panels]))
+        return
+
+    from rich.live import Live
+    def draw(ts, rendered):
+        updated = time.strftime("%H:%M", time.localtime(ts))
+        live.update(Group(*rendered, f"[dim]Updated {updated}. Press Ctrl+C to exit the dashboard.[/dim]"), refresh=True)
+
+    # No auto refresh: the screen is redrawn only when the scheduler wakes a panel
+    with Live(console=ctx.console, auto_refresh=False, screen=is_interactive()) as live:
+        try:
+            run(panels, draw)
+        except KeyboardInterrupt:
+            pass
+    ctx.console.print("[green]Exited dashboard.[/green]")
+
+@command("dashboard", needs=("favorites", "console", "fuzzy"))
+def cmd_dashboard(ctx: Context):
+    run_dashboard(ctx)
+
+def print_team(ctx: Context, team: str, members: List[List[str]], working: bool = False):
+    from rich.table import Table
+    from rich.box import ROUNDED
+    from .core import offset_label
+    from .formatting import PHASE_LABELS, local_time_label
+    from .team import zone_groups, is_working
+    ts = int(ctx.at.timestamp() if ctx.at else current_time())
+    groups = zone_groups(members, ts)
+    if working:
+        groups = [group for group in groups if is_working(ts, group[1])]
+    if ctx.sort == "offset":
+        groups.sort(key=lambda group: group[1])
+    elif ctx.sort == "time":
+        groups.sort(key=lambda group: (ts + group[1]) % 86400)
+    elif ctx.sort == "name":
+        groups.sort(key=lambda group: group[2][0][1].lower())
+    shown = sum(len(group[2]) for group in groups)
+    scope = f"{shown} of {len(members)} members in working hours" if working else f"{len(members)} members"
+    table = Table(title=f"[bold magenta]Team {team}: {scope}, {len(groups)} zones[/bold magenta]", show_lines=True, box=ROUNDED, expand=False)
+    table.add_column("Local Time", style="green")
+    table.add_column("Phase", style="magenta")
+    table.add_column("UTC Offset", style="yellow")
+    table.add_column("Cities", style="bold cyan")
+    table.add_column("Members")
+    for tz, offset, group in groups:
+        local = ts + offset
+        cities = ", ".join(dict.fromkeys(member[1] for member in group))
+        table.add_row(local_time_label(ts, offset), PHASE_LABELS[local // 3600 % 24], offset_label(offset),
+                      cities, f"[bold]{len(group)}[/bold]: " + ", ".join(member[0] for member in group))
+    ctx.console.print(table)
+
+def run_team(ctx: Context):
+    from . import team
+    usage = "[red]Usage: gtime team load <roster.csv> [--name TEAM] | show <team> [--working] | list | remove <team>[/red]"
+    action, rest = (ctx.args[0], ctx.args[1:]) if ctx.args else ("list", [])
+    teams = team.load_teams()
+    if action == "load":
+        name = pop_option(rest, "--name")
+        if len(rest) != 1:
+            ctx.console.print(usage)
+            return
+        path = Path(rest[0])
+        try:
+            loaded, missing = team.read_roster(str(path), name or path.stem)
+        except OSError as e:
+            ctx.console.print(f"[red]Cannot read roster:[/red] {e}")
             return
-        print_favorites(favs, meeting_time)
-        if timezone_info:
-            console.print(f"\n[dim]✓ Meeting time converted from {timezone_info}[/dim]")
+        if name:
+            # --name puts everyone in one team, whatever the roster's team column says
+            loaded = {name: [member for members in loaded.values() for member in members]}
+        teams.update(loaded)
+        team.save_teams(teams)
+        for team_name, members in loaded.items():
+            zones = len({member[3] for member in members})
+            ctx.console.print(f"[green]Loaded team {team_name}:[/green] {len(members)} members in {zones} zones")
+        if missing:
+            ctx.console.print(f"[yellow]Skipped members in unknown cities:[/yellow] {', '.join(missing)}")
+    elif action == "show":
+        working = "--working" in rest
+        names = [arg for arg in rest if arg != "--working"]
+        if len(names) != 1:
+            ctx.console.print(usage)
+        elif names[0] not in teams:
+            ctx.console.print(f"[red]Team not found:[/red] {names[0]}")
+        else:
+            print_team(ctx, names[0], teams[names[0]], working)
+    elif action == "list":
+        if not teams:
+            ctx.console.print("[yellow]No teams loaded. Use 'gtime team load <roster.csv>'.[/yellow]")
+        for team_name, members in sorted(teams.items()):
+            ctx.console.print(f"[bold cyan]{team_name}[/bold cyan]: {len(members)} members in {len({m[3] for m in members})} zones")
+    elif action == "remove" and len(rest) == 1:
+        if teams.pop(rest[0], None) is None:
+            ctx.console.print(f"[yellow]{rest[0]} is not a loaded team.[/yellow]")
+        else:
+            team.save_teams(teams)
+            ctx.console.print(f"[green]Removed team {rest[0]}.[/green]")
+    else:
+        ctx.console.print(usage)
+
+@command("team", needs=("console",), banner=True)
+def cmd_team(ctx: Context):
+    run_team(ctx)
+
+OVERLAP_NAME_WIDTH = 12
+
+def _format_minutes(minutes: int) -> str:
+    if not minutes:
+        return "[dim]-[/dim]"
+    hours, minutes = divmod(minutes, 60)
+    text = f"{hours}h{minutes:02}" if minutes else f"{hours}h"
+    return f"[green]{text}[/green]" if hours >= 3 else f"[yellow]{text}[/yellow]"
+
+def run_overlap(ctx: Context):
+    from .overlap import overlap_matrix
+    from .team import WORK_HOURS
+    usage = "[red]Usage: gtime overlap [--week] [--hours 9-17] [--format table|csv] [city ...][/red]"
+    fmt = pop_option(ctx.args, "--format", "table")
+    hours_text = pop_option(ctx.args, "--hours", f"{WORK_HOURS[0]}-{WORK_HOURS[1]}")
+    week = "--week" in ctx.args
+    names = [arg for arg in ctx.args if arg != "--week"] or ctx.favorites
+    first, _, last = hours_text.partition("-")
+    if fmt not in ("table", "csv") or not (first.isdigit() and last.isdigit() and int(first) < int(last) <= 24):
+        ctx.console.print(usage)
         return
+    hours = (int(first), int(last))
+    found = []
+    for name in names:
+        city_info = ctx.fuzzy.find(name)
+        if city_info:
+            found.append(city_info)
+        else:
+            _print_not_found(ctx, name)
+    if len(found) < 2:
+        ctx.console.print("[red]Need at least two cities: add favorites or name them.[/red]")
+        return
+    now = ctx.at or current_datetime()
+    day = (now.date() - datetime.date(1970, 1, 1)).days
+    matrix = overlap_matrix([tz for _, _, tz, _ in found], day, week, hours)
+    cities = [city for city, _, _, _ in found]
+    if fmt == "csv":
+        import csv
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(["city"] + cities)
+        for city, row in zip(cities, matrix):
+            writer.writerow([city] + row)
+        return
+    from rich.table import Table
+    from rich.box import ROUNDED
+    when = f"the week of {(now - datetime.timedelta(days=now.weekday())).strftime('%a, %b %d')}" if week else now.strftime("%a, %b %d")
+    table = Table(title=f"[bold magenta]Shared working hours ({hours[0]}:00-{hours[1]}:00 local) for {when}[/bold magenta]",
+                  box=ROUNDED, expand=False)
+    table.add_column("", style="bold cyan", no_wrap=True)
+    for city in cities:
+        table.add_column(city[:OVERLAP_NAME_WIDTH], justify="right", no_wrap=True)
+    for city, row in zip(cities, matrix):
+        table.add_row(city[:OVERLAP_NAME_WIDTH], *map(_format_minutes, row))
+    ctx.console.print(table)
+
+@command("overlap", needs=("favorites", "console", "fuzzy"))
+def cmd_overlap(ctx: Context):
+    run_overlap(ctx)
 
-    if cmd == "compare" and len(args) > 1:
-        not_found = []
+NEXT_NOTES = {"gap": "skipped once (DST)", "repeat": "occurs twice (DST)"}
+
+def run_next(ctx: Context):
+    from rich.table import Table
+    from rich.box import ROUNDED
+    from .formatting import city_label, local_time_label
+    from .zones import next_wall_times, offset_at
+    usage = "[red]Usage: gtime next <HH:MM | H AM/PM> [--favorites | --all | city ...][/red] [yellow](e.g. 'next 9:00 Tokyo')[/yellow]"
+    everywhere = "--all" in ctx.args
+    words = [arg for arg in ctx.args if arg not in ("--all", "--favorites")]
+    # The time is one or two words ('09:00', '9 AM'); the rest are cities
+    split = 2 if words[1:2] and words[1].upper() in ("AM", "PM") else 1
+    parsed, _ = parse_meeting_time(["at"] + words[:split]) if words else (None, None)
+    if parsed is None:
+        ctx.console.print(usage)
+        return
+    if everywhere:
+        found = list(CITY_DB)
+    else:
         found = []
-        for name in args[1:]:
-            if name == "--watch":
-                continue
-            city_info = get_city_by_name(name)
+        for name, city_info in ctx.fuzzy.resolve(words[split:] or ctx.favorites).items():
             if city_info:
                 found.append(city_info)
             else:
-                not_found.append(name)
-        if not_found:
-            for nf in not_found:
-                console.print(f"[red]City not found:[/red] {nf}")
-                suggestions = suggest_cities(nf)
-                if suggestions:
-                    console.print(f"[yellow]Did you mean:[/yellow] {', '.join(suggestions)}")
-        if found:
-            print_compare([c[0] for c in found])
+                _print_not_found(ctx, name)
+    if not found:
+        ctx.console.print("[red]No cities: name some, add favorites or use --all.[/red]")
+        return
+    now = int(ctx.at.timestamp() if ctx.at else current_time())
+    answers = next_wall_times([tz for _, _, tz, _ in found], parsed.hour * 3600 + parsed.minute * 60, now)
+    rows = sorted(found, key=lambda city_info: (answers[city_info[2]][0], city_info[0]))
+    table = Table(title=f"[bold magenta]Next {parsed.strftime('%I:%M %p')} local time[/bold magenta]", box=ROUNDED, expand=False)
+    table.add_column("In", style="dim", justify="right")
+    table.add_column("City", style="bold cyan")
+    table.add_column("Their Time", style="green", no_wrap=True)
+    table.add_column("Your Time", style="yellow", no_wrap=True)
+    table.add_column("Note", style="magenta")
+    for city_info in rows:
+        ts, note = answers[city_info[2]]
+        yours = datetime.datetime.fromtimestamp(ts).astimezone().strftime('%a, %b %d %I:%M %p')
+        table.add_row(_format_shift(ts - now) or "now", city_label(city_info[0], city_info[1]),
+                      local_time_label(ts, offset_at(city_info[2], ts)), yours, NEXT_NOTES.get(note, ""))
+    ctx.console.print(table)
+
+@command("next", needs=("favorites", "console", "fuzzy"))
+def cmd_next(ctx: Context):
+    run_next(ctx)
+
+def run_watch_stream(ctx: Context):
+    from .ranges import parse_duration
+    from .ticks import stream
+    usage = "Usage: gtime watch --stream json [--every <duration>] [--changes] [--count N] [city ...]"
+    fmt = pop_option(ctx.args, "--stream")
+    every = parse_duration(pop_option(ctx.args, "--every", "1m"))
+    count = pop_option(ctx.args, "--count")
+    changes = "--changes" in ctx.args
+    names = [arg for arg in ctx.args if arg != "--changes"] or ctx.favorites
+    # stdout carries the records; everything else goes to stderr
+    if fmt != "json" or not every or (count is not None and not (count.isdigit() and int(count) > 0)):
+        sys.stderr.write(usage + "\n")
+        return
+    found = []
+    for name in names:
+        city_info = ctx.fuzzy.find(name)
+        if city_info:
+            found.append(city_info)
         else:
-            console.print("[red]No valid cities to compare.[/red]")
+            sys.stderr.write(f"gtime: city not found: {name}\n")
+    if not found:
+        sys.stderr.write("gtime: no cities to stream; add favorites or name them\n")
+        return
+    try:
+        stream(found, sys.stdout, every, changes, int(count) if count else None)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # The reader went away; point stdout at devnull so the exit flush stays quiet
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+@command("watch", needs=("favorites", "fuzzy"))
+def cmd_watch(ctx: Context):
+    if "--stream" in ctx.args:
+        run_watch_stream(ctx)
+        return
+    print_banner()
+    watch_mode(print_favorites, ctx.favorites, sort=ctx.sort)
+
+@command("list", needs=("favorites",), banner=True)
+def cmd_list(ctx: Context):
+    if ctx.args[:1] == ["--watch"]:
+        watch_mode(print_favorites, ctx.favorites, sort=ctx.sort)
         return
+    print_favorites(ctx.favorites, ctx.at, sort=ctx.sort)
 
-    city_info = get_city_by_name(" ".join(args))
+@command("add", needs=("favorites", "console", "fuzzy"), banner=True)
+def cmd_add(ctx: Context):
+    from .aliases import learn, confirm_suggestion
+    query = " ".join(ctx.args)
+    ranked = ctx.fuzzy.rank(query, k=1) if query else []
+    city_info = ranked[0][1] if ranked else None
+    # Adding a fuzzy match, or picking a city for a query that matched nothing, confirms the correction
+    confirmed = bool(ranked) and ranked[0][0] == TIER_FUZZY
+    if not city_info and is_interactive():
+        if query:
+            ctx.console.print(f"[red]City not found:[/red] {query}")
+        picked = pick_cities(query, title="Add city")
+        city_info = picked[0] if picked else None
+        if not city_info:
+            return
+        confirmed = bool(query)
     if city_info:
-        print_city_time(*city_info)
+        if confirmed:
+            learn(query, city_info, confirmed=True)
+        confirm_suggestion(city_info)
+        add_favorite(city_info, ctx.favorites)
+    elif not query:
+        ctx.console.print("[red]Usage: gtime add <city>[/red]")
+    else:
+        _print_not_found(ctx, query, "[red]City not found.[/red]")
+
+@command("remove", needs=("favorites", "console"), banner=True)
+def cmd_remove(ctx: Context):
+    city = " ".join(ctx.args)
+    if not city:
+        ctx.console.print("[red]Usage: gtime remove <city>[/red]")
+        return
+    if city in ctx.favorites:
+        ctx.favorites.remove(city)
+        save_favorites(ctx.favorites)
+        ctx.console.print(f"[green]Removed {city} from favorites.[/green]")
+    else:
+        ctx.console.print(f"[yellow]{city} is not in favorites.[/yellow]")
+
+def run_meeting_recur(ctx: Context):
+    weeks = pop_option(ctx.args, "--weeks", "12")
+    words = ctx.args[1:]
+    usage = "[red]Usage: gtime meeting recur <time> <tz|city> [--weeks N][/red] [yellow](e.g. 'meeting recur 9 AM EST --weeks 26')[/yellow]"
+    if not weeks.isdigit() or int(weeks) < 1:
+        ctx.console.print(f"[red]Invalid number of weeks:[/red] {weeks}")
+        return
+    # The time is one or two words ('15:30', '9 AM'); the rest names the meeting's timezone
+    for split in (2, 1):
+        if split == 1 and words[1:2] and words[1].upper() in ("AM", "PM"):
+            continue
+        meeting_time, _ = parse_meeting_time(["at"] + words[:split], ctx.at.date() if ctx.at else None)
+        zone = resolve_zone(" ".join(words[split:])) if meeting_time and words[split:] else None
+        if zone:
+            break
+    else:
+        ctx.console.print(usage)
+        return
+    found = _resolve_all(ctx.favorites)
+    if not found:
+        ctx.console.print("[red]No favorite cities set. Use 'gtime add <city>' to add one.[/red]")
+        return
+    print_recurring_drift(found, zone[0], zone[1], meeting_time, int(weeks))
+
+def _meeting_targets(names: List[str]) -> List[str]:
+    """City names after 'for'; '-' or none at all with piped input reads one name per line from stdin."""
+    if names == ["-"] or (not names and not sys.stdin.isatty()):
+        return [line.strip() for line in sys.stdin if line.strip() and not line.lstrip().startswith("#")]
+    return names
+
+def print_meeting_for(ctx: Context, names: List[str], meeting_time: datetime.datetime):
+    found: Dict[Tuple[str, str, str, str], None] = {}
+    for name, city_info in ctx.fuzzy.resolve(names).items():
+        if city_info:
+            found[city_info] = None
+        else:
+            _print_not_found(ctx, name)
+    if not found:
+        ctx.console.print("[red]No valid cities for the meeting.[/red]")
+        return
+    print_times(list(found), int(meeting_time.astimezone().timestamp()), "[bold magenta]Meeting Times[/bold magenta]", ctx.sort)
+
+@command("meeting", needs=("favorites", "console", "fuzzy"), banner=True)
+def cmd_meeting(ctx: Context):
+    if not ctx.args:
+        print_favorites(ctx.favorites, ctx.at, sort=ctx.sort)
+        return
+    if ctx.args[0] == "recur":
+        run_meeting_recur(ctx)
+        return
+    args, targets = ctx.args, None
+    if "for" in args:
+        idx = args.index("for")
+        args, targets = args[:idx], _meeting_targets(args[idx + 1:])
+        if not targets:
+            ctx.console.print("[red]Usage: gtime meeting at <time> [in <city|tz>] for <city> ...[/red] [yellow](or pipe one city per line)[/yellow]")
+            return
+    zone = None
+    if "in" in args:
+        idx = args.index("in")
+        zone = resolve_zone(" ".join(args[idx + 1:]))
+        if not zone:
+            ctx.console.print(f"[red]Unknown timezone or city:[/red] {' '.join(args[idx + 1:])}")
+            return
+        args = args[:idx]
+    meeting_time, timezone_info = parse_meeting_time(["meeting"] + args, ctx.at.date() if ctx.at else None,
+                                                     zone[0] if zone else None)
+    if meeting_time is None:
+        ctx.console.print("[red]Invalid meeting command. Use: 'meeting at/on <time>' (e.g. 'meeting at 10:00 AM', 'meeting at 15:30 UTC', or 'meeting on 3 PM EST').[/red]")
+        ctx.console.print("[yellow]See 'gtime -h' for help.[/yellow]")
+        return
+    if zone:
+        timezone_info = zone[1]
+    if targets is None:
+        print_favorites(ctx.favorites, meeting_time, sort=ctx.sort)
+    else:
+        print_meeting_for(ctx, targets, meeting_time)
+    if timezone_info:
+        ctx.console.print(f"\n[dim]✓ Meeting time converted from {timezone_info}[/dim]")
+
+@command("compare", needs=("favorites", "console", "fuzzy"))
+def cmd_compare(ctx: Context):
+    if len(ctx.args) > 1 and ctx.args[-1] == "--watch":
+        watch_mode(print_compare, ctx.args[:-1], sort=ctx.sort)
+        return
+    if not ctx.args:
+        if is_interactive():
+            picked = pick_cities(multi=True, title="Compare cities")
+            if picked:
+                print_compare(picked, sort=ctx.sort, at=ctx.at)
+        elif ctx.favorites:
+            print_compare(ctx.favorites, sort=ctx.sort, at=ctx.at)
+        else:
+            ctx.console.print("[red]Usage: gtime compare <city1> <city2> ...[/red]")
+        return
+    found = []
+    for name in ctx.args:
+        if name == "--watch":
+            continue
+        city_info = ctx.fuzzy.find(name)
+        if city_info:
+            found.append(city_info)
+        else:
+            _print_not_found(ctx, name)
+    if found:
+        print_compare(found, sort=ctx.sort, at=ctx.at)
+    else:
+        ctx.console.print("[red]No valid cities to compare.[/red]")
+
+AMBIGUOUS_CHOICES = 5
+
+@command(None, needs=("console", "fuzzy", "favorites"))
+def cmd_city(ctx: Context):
+    query = " ".join(ctx.args)
+    # Favorites win ties between equally good matches
+    ranked = ctx.fuzzy.rank(query, k=AMBIGUOUS_CHOICES, weights=dict.fromkeys(ctx.favorites, 1))
+    if ranked:
+        from .aliases import learn, confirm_suggestion
+        tier, city_info = ranked[0]
+        print_city_time(*city_info, ctx.at)
+        if tier == TIER_FUZZY:
+            learn(query, city_info)
+        confirm_suggestion(city_info)
+        # Equally good name matches are worth offering; near misses of a fuzzy guess are not
+        others = [f"{city} ({country})" for other_tier, (city, country, _, _) in ranked[1:]
+                  if other_tier == tier != TIER_FUZZY]
+        if others:
+            ctx.console.print(f"[dim]Also matches: {', '.join(others)}. Use the full name, e.g. 'gtime \"{others[0]}\"'.[/dim]")
+    else:
+        _print_not_found(ctx, query, "[red]Invalid command or city not found. See 'gtime -h' for help.[/red]")
+
+def main():
+    args = sys.argv[1:]
+    sort = at = None
+    if not args or args[0] not in ("--complete", "--completion", "-h", "--help"):
+        sort = pop_option(args, "--sort")
+        if sort and sort not in SORT_KEYS:
+            console.print(f"[red]Invalid sort key:[/red] {sort} [yellow](use one of: {', '.join(SORT_KEYS)})[/yellow]")
+            return
+        at_text = pop_option(args, "--at")
+        at = parse_instant(at_text) if at_text else None
+        if at_text and at is None:
+            console.print(f"[red]Invalid instant:[/red] {at_text} [yellow](use an ISO date or time, e.g. 2025-03-30 or 2025-03-30T09:00Z)[/yellow]")
+            return
+    name = args[0].lower() if args else ""
+    if name in COMMANDS:
+        args = args[1:]
     else:
-        console.print("[red]Invalid command or city not found. See 'gtime -h' for help.[/red]")
-        suggestions = suggest_cities(" ".join(args))
-        if suggestions:
-            console.print(f"[yellow]Did you mean:[/yellow] {', '.join(suggestions)}")
+        # Anything that is not a command is a city lookup
+        name = None
+    handler, needs, banner = COMMANDS[name]
+    if banner:
+        print_banner()
+    handler(Context(name or "city", args, needs, sort, at))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Shell completion backend for Global Time Utility (gtime)
+Answers 'gtime --complete <partial>' from a sorted prefix index file that is memory-mapped
+and binary searched, so a lookup touches a few pages instead of loading the city database.
+This module must only import the standard library: it runs on every <TAB>. It is also the
+console entry point, so 'gtime --complete' is answered before gtime.cli is imported.
+"""
+
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+# Same locations as gtime.core, repeated here so completion never imports the lookup layer
+FAV_FILE = Path.home() / ".gtime_favorites.json"
+INDEX_FILE = Path.home() / ".cache" / "gtime" / "complete.idx"
+DATA_FILE = Path(__file__).with_name("data.py")
+
+INDEX_MAGIC = b"#gtime-complete-1"
+MAX_CANDIDATES = 50
+
+COMMANDS = ["add", "remove", "list", "watch", "meeting", "compare", "transitions", "http", "convert", "localize", "timeline", "cache", "dashboard", "team", "ics", "overlap", "next"]
+CITY_COMMANDS = ["add", "remove", "compare", "convert", "timeline", "overlap", "watch", "next"]
+# Commands whose only valid arguments are current favorites
+FAVORITE_COMMANDS = ["remove"]
+
+def _data_signature() -> str:
+    try:
+        st = os.stat(DATA_FILE)
+    except OSError:
+        return "0"
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+def _key(name: str) -> bytes:
+    return name.casefold().encode("utf-8")
+
+def build_index(cities: Iterable[str], path: Path = INDEX_FILE, signature: Optional[str] = None) -> None:
+    """Write the two sorted sections: whole-name keys first, then keys for every later word."""
+    names, words = set(), set()
+    for city in cities:
+        names.add((_key(city), city))
+        for word in city.split()[1:]:
+            words.add((_key(word), city))
+    names_section = b"".join(k + b"\t" + c.encode("utf-8") + b"\n" for k, c in sorted(names))
+    words_section = b"".join(k + b"\t" + c.encode("utf-8") + b"\n" for k, c in sorted(words))
+    header = b"%s %s " % (INDEX_MAGIC, (signature or _data_signature()).encode("ascii"))
+    # The header records where the word section starts; pad the offset so its width is fixed
+    words_offset = len(header) + 13 + len(names_section)
+    header += b"%012d\n" % words_offset
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header + names_section + words_section)
+    os.replace(tmp, path)
+
+def _lower_bound(buf, lo: int, hi: int, key: bytes) -> int:
+    """Offset of the first line in [lo, hi) whose key sorts at or after `key`; lo and hi are line starts."""
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = buf.rfind(b"\n", lo, mid) + 1 or lo
+        end = buf.find(b"\n", start)
+        if buf[start:buf.find(b"\t", start, end)] < key:
+            lo = end + 1
+        else:
+            hi = start
+    return lo
+
+def _scan(buf, lo: int, hi: int, key: bytes, limit: int) -> List[str]:
+    found = []
+    pos = _lower_bound(buf, lo, hi, key)
+    while pos < hi and len(found) < limit:
+        end = buf.find(b"\n", pos)
+        tab = buf.find(b"\t", pos, end)
+        if not buf[pos:tab].startswith(key):
+            break
+        found.append(buf[tab + 1:end].decode("utf-8"))
+        pos = end + 1
+    return found
+
+def _open_index(path: Path, signature: Optional[str]) -> Optional[Tuple[mmap.mmap, int, int]]:
+    try:
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header_end = buf.find(b"\n")
+    parts = buf[:header_end].split(b" ")
+    if len(parts) != 3 or parts[0] != INDEX_MAGIC or parts[1].decode("ascii") != (signature or _data_signature()):
+        buf.close()
+        return None
+    return buf, header_end + 1, int(parts[2])
+
+def _load_favorites() -> List[str]:
+    try:
+        with open(FAV_FILE, "r") as f:
+            return [fav for fav in json.load(f) if isinstance(fav, str)]
+    except Exception:
+        return []
+
+def complete(partial: str, limit: int = MAX_CANDIDATES, path: Path = INDEX_FILE,
+             signature: Optional[str] = None, command: Optional[str] = None) -> List[str]:
+    """Ranked city candidates for `partial`: favorites, then name prefixes, then word prefixes.
+    After a command in FAVORITE_COMMANDS only favorites are offered, matched by any word's prefix."""
+    folded = partial.casefold()
+    if command in FAVORITE_COMMANDS:
+        return [fav for fav in _load_favorites()
+                if any(word.startswith(folded) for word in [fav.casefold()] + fav.casefold().split()[1:])][:limit]
+    index = _open_index(path, signature)
+    if index is None:
+        from .data import CITY_DB
+        build_index((city for city, _, _, _ in CITY_DB), path, signature)
+        index = _open_index(path, signature)
+        if index is None:
+            return []
+    buf, names_start, words_start = index
+    key = _key(partial)
+    ranked = [fav for fav in _load_favorites() if fav.casefold().startswith(folded)]
+    seen = set(ranked)
+    try:
+        for lo, hi in ((names_start, words_start), (words_start, len(buf))):
+            for city in _scan(buf, lo, hi, key, limit):
+                if city not in seen:
+                    seen.add(city)
+                    ranked.append(city)
+    finally:
+        buf.close()
+    return ranked[:limit]
+
+BASH_SCRIPT = """# gtime bash completion: eval "$(gtime --completion bash)"
+_gtime_complete() {
+    local cur="${COMP_WORDS[COMP_CWORD]//\\\\/}"
+    COMPREPLY=()
+    if [[ $COMP_CWORD -eq 1 ]]; then
+        COMPREPLY=($(compgen -W "%(commands)s" -- "$cur"))
+    elif [[ " %(city_commands)s " != *" ${COMP_WORDS[1]} "* ]]; then
+        return 0
+    fi
+    local city command=""
+    [[ $COMP_CWORD -gt 1 ]] && command="${COMP_WORDS[1]}"
+    while IFS= read -r city; do
+        COMPREPLY+=("$(printf '%%q' "$city")")
+    done < <(gtime --complete --command "$command" "$cur")
+}
+complete -o nosort -F _gtime_complete gtime 2>/dev/null || complete -F _gtime_complete gtime
+"""
+
+ZSH_SCRIPT = """#compdef gtime
+# gtime zsh completion: eval "$(gtime --completion zsh)"
+_gtime() {
+    local -a cities
+    local command=""
+    if (( CURRENT == 2 )); then
+        compadd -- %(commands)s
+    elif [[ ${words[2]} != (%(city_commands_zsh)s) ]]; then
+        return 1
+    else
+        command=${words[2]}
+    fi
+    cities=(${(f)"$(gtime --complete --command "$command" "$PREFIX")"})
+    compadd -U -V gtime-cities -- $cities
+}
+compdef _gtime gtime
+"""
+
+FISH_SCRIPT = """# gtime fish completion: gtime --completion fish | source
+function __gtime_cities
+    set -l words (commandline -opc)
+    gtime --complete --command "$words[2]" (commandline -ct)
+end
+complete -c gtime -f
+complete -c gtime -n "__fish_use_subcommand" -a "%(commands)s"
+complete -c gtime -n "__fish_use_subcommand; or __fish_seen_subcommand_from %(city_commands)s" -k -a "(__gtime_cities)"
+"""
+
+SCRIPTS = {"bash": BASH_SCRIPT, "zsh": ZSH_SCRIPT, "fish": FISH_SCRIPT}
+
+def completion_script(shell: str) -> Optional[str]:
+    script = SCRIPTS.get(shell)
+    if script is None:
+        return None
+    return script % {
+        "commands": " ".join(COMMANDS),
+        "city_commands": " ".join(CITY_COMMANDS),
+        "city_commands_zsh": "|".join(CITY_COMMANDS),
+    }
+
+def answer(args: List[str]) -> None:
+    """Print the candidates for 'gtime --complete [--command <cmd>] <partial>'; the shell scripts
+    pass the command being completed so its arguments can be narrowed."""
+    command = None
+    if args[:1] == ["--command"]:
+        command, args = (args[1:2] or [None])[0], args[2:]
+    candidates = complete(" ".join(args), command=command)
+    if candidates:
+        sys.stdout.write("\n".join(candidates) + "\n")
+
+def main() -> None:
+    """The `gtime` command: completion requests are answered here without importing gtime.cli
+    (and gtime.core behind it); anything else is handed to gtime.cli.main."""
+    if sys.argv[1:2] == ["--complete"]:
+        answer(sys.argv[2:])
+        return
+    from .cli import main as cli_main
+    cli_main()
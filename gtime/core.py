@@ -6,10 +6,13 @@ Core logic for Global Time Utility (gtime) lookup, fuzzy search, helpers
 """
 
 import datetime
+import heapq
 import json
+import os
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Optional, Union
 import random
+import time
 from functools import lru_cache
 
 try:
@@ -20,6 +23,7 @@ except ImportError:
 from .data import CITY_DB
 
 FAV_FILE = Path.home() / ".gtime_favorites.json"
+CACHE_DIR = Path.home() / ".cache" / "gtime"
 
 def load_favorites() -> List[str]:
     if FAV_FILE.exists():
@@ -34,80 +38,269 @@ def save_favorites(favs: List[str]) -> None:
     with open(FAV_FILE, "w") as f:
         json.dump(favs, f)
 
-_city_names_cache = None
-_city_name_to_index = None
+_city_index = None
+
+def build_city_index() -> dict:
+    """Derive the lookup structures from CITY_DB. Only plain lists, tuples and dicts, so the
+    result can be snapshotted to disk (see gtime.snapshot)."""
+    names = [f"{city} ({country})" for city, country, _, _ in CITY_DB]
+    city_lower = [city.lower() for city, _, _, _ in CITY_DB]
+    exact, fuzzy_index = {}, {}
+    for idx, (city, _, _, _) in enumerate(CITY_DB):
+        exact.setdefault(city_lower[idx], idx)
+        fuzzy_index.setdefault(city, idx)
+    return {
+        "names": names,
+        "name_to_index": {name: idx for idx, name in enumerate(names)},
+        "city_lower": city_lower,
+        "exact": exact,
+        # Distinct city names handed to the fuzzy scorer, and where each first appears
+        "fuzzy_choices": list(fuzzy_index),
+        "fuzzy_index": fuzzy_index,
+    }
+
+def get_city_index() -> dict:
+    global _city_index
+    if _city_index is None or len(_city_index["names"]) != len(CITY_DB):
+        from .snapshot import load_city_index
+        _city_index = load_city_index() or build_city_index()
+    return _city_index
 
 def _get_city_names():
-    global _city_names_cache, _city_name_to_index
-    if _city_names_cache is None or len(_city_names_cache) != len(CITY_DB):
-        _city_names_cache = [f"{city} ({country})" for city, country, _, _ in CITY_DB]
-        _city_name_to_index = {name: idx for idx, name in enumerate(_city_names_cache)}
-    return _city_names_cache, _city_name_to_index
+    index = get_city_index()
+    return index["names"], index["name_to_index"]
+
+@lru_cache(maxsize=None)
+def get_tzinfo(tz: str):
+    """ZoneInfo for an IANA name, or a fixed-offset timezone for 'UTC+05:45' style names."""
+    if tz.startswith("UTC") and len(tz) == 9 and tz[3] in "+-":
+        sign = 1 if tz[3] == "+" else -1
+        offset = datetime.timedelta(hours=int(tz[4:6]), minutes=int(tz[7:9]))
+        return datetime.timezone(sign * offset, offset_label(int(sign * offset.total_seconds())))
+    return ZoneInfo(tz)
+
+@lru_cache(maxsize=None)
+def _zone_countries() -> dict:
+    countries = {}
+    for _, country, tz, _ in CITY_DB:
+        countries.setdefault(tz, country)
+    return countries
+
+@lru_cache(maxsize=None)
+def _zone_city_rows() -> Dict[str, int]:
+    """Zone -> CITY_DB index of the city the zone is named after ('Africa/Accra' -> Accra, Ghana)."""
+    rows: Dict[str, int] = {}
+    for idx, (city, _, tz, _) in enumerate(CITY_DB):
+        if tz.rsplit("/", 1)[-1].replace("_", " ").lower() == city.lower():
+            rows.setdefault(tz, idx)
+    return rows
+
+def lookup_zone_city(query: str, components: bool = True, abbreviations: bool = True) -> Optional[Tuple[str, str, str, str]]:
+    """A city-shaped (name, country, tz, emoji) result for a zone name, abbreviation or UTC offset."""
+    from .tzindex import lookup_zone
+    found = lookup_zone(query, components, abbreviations)
+    if not found:
+        return None
+    tz, kind = found
+    if kind == "offset":
+        return (str(get_tzinfo(tz)), "Fixed offset", tz, "🌐")
+    name = query.strip().upper() if kind == "abbreviation" else tz
+    return (name, _zone_countries().get(tz, "Time zone"), tz, "🌐")
+
+# Fuzzy scorer backends, fastest first; GTIME_SCORER names one explicitly.
+# All of them produce thefuzz's WRatio scores (integers 0-100), so results agree whichever runs.
+SCORER_BACKENDS = ("cdist", "rapidfuzz", "python")
+CDIST_BLOCK = 1024  # query rows scored per cdist call
+
+@lru_cache(maxsize=None)
+def scorer_backend(name: Optional[str] = None) -> str:
+    """The backend to score with: `name` or $GTIME_SCORER if set (ImportError when its modules are
+    missing), else the first of SCORER_BACKENDS whose modules import."""
+    name = name or os.environ.get("GTIME_SCORER") or None
+    if name is not None and name not in SCORER_BACKENDS:
+        raise ValueError(f"unknown scorer backend: {name} (use one of: {', '.join(SCORER_BACKENDS)})")
+    for backend in (name,) if name else SCORER_BACKENDS:
+        try:
+            if backend == "cdist":
+                import numpy  # noqa: F401 - rapidfuzz's cdist returns numpy arrays
+            if backend in ("cdist", "rapidfuzz"):
+                import rapidfuzz  # noqa: F401
+            return backend
+        except ImportError:
+            if name:
+                raise
+    return "python"
+
+def _fuzz_process(text: str) -> str:
+    # thefuzz's default preprocessing, applied once per string instead of once per pair
+    from thefuzz.utils import full_process
+    return full_process(text, force_ascii=True)
+
+def score_matrix(queries: Sequence[str], choices: Sequence[str], backend: Optional[str] = None) -> Iterator[List[int]]:
+    """One row of scores per query, one column per choice, as rows are computed."""
+    backend = scorer_backend(backend)
+    if backend == "python":
+        from thefuzz import fuzz
+        for query in queries:
+            yield [fuzz.WRatio(query, choice) for choice in choices]
+        return
+    from rapidfuzz import fuzz, process
+    processed = [_fuzz_process(choice) for choice in choices]
+    if backend == "rapidfuzz":
+        for query in queries:
+            query = _fuzz_process(query)
+            yield [round(fuzz.WRatio(query, choice)) for choice in processed]
+        return
+    import numpy
+    for start in range(0, len(queries), CDIST_BLOCK):
+        block = [_fuzz_process(query) for query in queries[start:start + CDIST_BLOCK]]
+        scores = process.cdist(block, processed, scorer=fuzz.WRatio, dtype=numpy.float64, workers=-1)
+        yield from numpy.rint(scores).astype(numpy.int64).tolist()
+
+def best_matches(queries: Sequence[str], choices: Sequence[str], limit: int = 1,
+                 backend: Optional[str] = None) -> List[List[Tuple[int, int]]]:
+    """The best `limit` (choice index, score) pairs per query, best first; equal scores go to the
+    lower index. The accelerated backends never materialize the full matrix as Python objects."""
+    backend = scorer_backend(backend)
+    if backend == "python":
+        return [heapq.nlargest(limit, enumerate(row), key=lambda item: (item[1], -item[0]))
+                for row in score_matrix(queries, choices, backend)]
+    from rapidfuzz import fuzz, process
+    processed = [_fuzz_process(choice) for choice in choices]
+    results = []
+    if backend == "rapidfuzz":
+        for query in queries:
+            query = _fuzz_process(query)
+            found = process.extract(query, processed, scorer=fuzz.WRatio, processor=None, limit=limit)
+            if found:
+                # Refetch everything that rounds to the last kept score, so ties resolve by index
+                cutoff = max(round(found[-1][1]) - 0.5, 0)
+                found = process.extract(query, processed, scorer=fuzz.WRatio, processor=None, limit=None, score_cutoff=cutoff)
+            ranked = sorted(((idx, round(score)) for _, score, idx in found), key=lambda item: (-item[1], item[0]))
+            results.append(ranked[:limit])
+        return results
+    import numpy
+    for start in range(0, len(queries), CDIST_BLOCK):
+        block = [_fuzz_process(query) for query in queries[start:start + CDIST_BLOCK]]
+        scores = numpy.rint(process.cdist(block, processed, scorer=fuzz.WRatio, dtype=numpy.float64, workers=-1))
+        order = numpy.argsort(-scores, axis=1, kind="stable")[:, :limit]
+        for row, columns in zip(scores.astype(numpy.int64).tolist(), order.tolist()):
+            results.append([(idx, row[idx]) for idx in columns])
+    return results
+
+# Match tiers, best first; candidates rank by tier, then score, then weight, then CITY_DB order
+TIER_EXACT, TIER_ZONE, TIER_PREFIX, TIER_SUBSTRING, TIER_ZONE_PART, TIER_FUZZY = range(6)
+FUZZY_MATCH_SCORE = 60
+FUZZY_SUGGEST_SCORE = 40
+
+def rank_cities(query: str, k: int = 5, weights: Optional[Dict[str, float]] = None,
+                min_fuzzy: int = FUZZY_MATCH_SCORE) -> List[Tuple[int, Tuple[str, str, str, str]]]:
+    """The best k (tier, city_info) candidates for query, best first, from one pass over the index.
+    Exact, prefix and substring hits all score 100, so within those tiers `weights` (city name ->
+    weight, e.g. favorites) and list order decide; fuzzy hits are scored by best_matches() and only
+    computed when the earlier tiers left room among the k. Zone names, abbreviations and
+    UTC offsets (see gtime.tzindex) rank between the city tiers as fuzzy_search_city always has."""
+    index = get_city_index()
+    names = index["names"]
+    query_lower = query.lower()
+    if query_lower not in index["exact"]:
+        from .aliases import lookup
+        learned = lookup(query)
+        if learned:
+            # A correction learned from earlier lookups answers on its own, like an exact match
+            return [(TIER_EXACT, learned)]
+    weights = weights or {}
+    # Bounded heap holding the inverted keys of the best k, so heap[0] is the worst kept candidate
+    heap: List[tuple] = []
+    seen = set()
+
+    def offer(tier: int, score: float, idx: int, city_info: Tuple[str, str, str, str]):
+        label = f"{city_info[0]} ({city_info[1]})"
+        if label in seen:
+            return
+        item = (-tier, score, weights.get(city_info[0], 0), -idx, city_info)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[:4] > heap[0][:4]:
+            seen.discard(f"{heap[0][4][0]} ({heap[0][4][1]})")
+            heapq.heapreplace(heap, item)
+        else:
+            return
+        seen.add(label)
+
+    def has_room(tier: int) -> bool:
+        return len(heap) < k or -heap[0][0] > tier
+
+    full_name = "(" in query_lower
+    for idx, city_name in enumerate(index["city_lower"]):
+        if city_name == query_lower or (full_name and names[idx].lower() == query_lower):
+            tier = TIER_EXACT
+        elif city_name.startswith(query_lower):
+            tier = TIER_PREFIX
+        elif query_lower in city_name:
+            tier = TIER_SUBSTRING
+        else:
+            continue
+        offer(tier, 100, idx, CITY_DB[idx])
+
+    def offer_zone(tier: int, zone_match: Tuple[str, str, str, str]):
+        # A zone named after a listed city is that city's row ('Africa/Accra' is Accra, Ghana)
+        idx = _zone_city_rows().get(zone_match[2]) if zone_match[0] == zone_match[2] else None
+        if idx is None:
+            offer(tier, 100, len(CITY_DB), zone_match)
+        else:
+            offer(tier, 100, idx, CITY_DB[idx])
+
+    # Zone names, UTC offsets and upper-case abbreviations ('Asia/Kathmandu', 'UTC+5:45', 'NZST')
+    zone_match = None
+    if query_lower and has_room(TIER_ZONE):
+        zone_match = lookup_zone_city(query, components=False, abbreviations=query.isupper())
+        if zone_match:
+            offer_zone(TIER_ZONE, zone_match)
+
+    if query_lower and zone_match is None and has_room(TIER_ZONE_PART):
+        # Zone path components and abbreviations in any case ('kathmandu', 'nzst'), after every city name hit
+        part_match = lookup_zone_city(query)
+        if part_match:
+            offer_zone(TIER_ZONE_PART, part_match)
+
+    if query_lower and has_room(TIER_FUZZY):
+        # Fuzzy match on city names only (not including country)
+        choices = index["fuzzy_choices"]
+        for choice, score in best_matches([query], choices, limit=k)[0]:
+            if score > min_fuzzy:
+                idx = index["fuzzy_index"][choices[choice]]
+                offer(TIER_FUZZY, score, idx, CITY_DB[idx])
+
+    ranked = sorted(heap, reverse=True)
+    return [(-item[0], item[4]) for item in ranked]
 
 @lru_cache(maxsize=256)
 def fuzzy_search_city(query: str) -> Optional[Tuple[str, str, str, str]]:
-    from thefuzz import process
-    names, name_to_idx = _get_city_names()
-    
-    # First priority: exact match (case insensitive)
-    query_lower = query.lower()
-    for name in names:
-        city_name = name.split(" (")[0].lower()
-        if city_name == query_lower:
-            idx = name_to_idx[name]
-            return CITY_DB[idx]
-    
-    # Second priority: starts with (case insensitive)
-    for name in names:
-        city_name = name.split(" (")[0].lower()
-        if city_name.startswith(query_lower):
-            idx = name_to_idx[name]
-            return CITY_DB[idx]
-    
-    # Third priority: substring match (case insensitive)
-    for name in names:
-        city_name = name.split(" (")[0].lower()
-        if query_lower in city_name:
-            idx = name_to_idx[name]
-            return CITY_DB[idx]
-    
-    # Fourth priority: fuzzy match on city names only (not including country)
-    city_names_only = [name.split(" (")[0] for name in names]
-    match, score = process.extractOne(query, city_names_only)
-    if score > 60:
-        for name in names:
-            if name.split(" (")[0] == match:
-                idx = name_to_idx[name]
-                return CITY_DB[idx]
-    
-    return None
+    ranked = rank_cities(query, k=1)
+    return ranked[0][1] if ranked else None
 
 @lru_cache(maxsize=256)
 def get_city_by_name(city_name: str) -> Optional[Tuple[str, str, str, str]]:
-    for city, country, tz, emoji in CITY_DB:
-        if city.lower() == city_name.lower():
-            return (city, country, tz, emoji)
-    
+    idx = get_city_index()["exact"].get(city_name.lower())
+    if idx is not None:
+        return CITY_DB[idx]
+
     return fuzzy_search_city(city_name)
 
+def resolve_cities(names: Iterable[str]) -> Dict[str, Optional[Tuple[str, str, str, str]]]:
+    """Resolve each distinct name once, in order: exact names straight from the index, the rest
+    through the ranked lookup (None when nothing matches)."""
+    exact = get_city_index()["exact"]
+    resolved: Dict[str, Optional[Tuple[str, str, str, str]]] = {}
+    for name in names:
+        if name not in resolved:
+            idx = exact.get(name.lower())
+            resolved[name] = CITY_DB[idx] if idx is not None else fuzzy_search_city(name)
+    return resolved
+
 def suggest_cities(city_name: str) -> List[str]:
-    from thefuzz import process
-    names, _ = _get_city_names()
-    
-    # Use city names only for better suggestions
-    city_names_only = [name.split(" (")[0] for name in names]
-    matches = process.extract(city_name, city_names_only, limit=3)
-    
-    # Convert back to full names for suggestions
-    suggestions = []
-    for match, score in matches:
-        if score > 40:
-            for name in names:
-                if name.split(" (")[0] == match:
-                    suggestions.append(name)
-                    break
-    
-    return suggestions
+    return [f"{city} ({country})" for _, (city, country, _, _) in rank_cities(city_name, k=3, min_fuzzy=FUZZY_SUGGEST_SCORE)]
 
 def get_time_emoji(hour: int) -> str:
     if 5 <= hour < 12:
@@ -129,131 +322,312 @@ def get_greeting(hour: int) -> str:
     else:
         return "Good night"
 
+@lru_cache(maxsize=None)
+def offset_label(offset: int) -> str:
+    """'UTC+5:45' style label for an offset in seconds; there are only a few dozen distinct ones."""
+    total_minutes = offset // 60
+    sign = '+' if total_minutes >= 0 else '-'
+    hours, minutes = divmod(abs(total_minutes), 60)
+    return f'UTC{sign}{hours}' + (f':{minutes:02}' if minutes else '')
+
+def format_utc_offset(offset: Optional[datetime.timedelta]) -> str:
+    if offset is None:
+        return 'UTC?'
+    return offset_label(int(offset.total_seconds()))
+
+# Footer templates per phase of the day; get_funny_footer() formats one on demand
+MORNING_FOOTERS = (
+    "Rise and shine, {city}! ☀️",
+    "Coffee time in {city}? ☕",
+    "Start your engines, {city}! 🚗",
+    "The early bird catches the worm in {city}! 🐦",
+    "Fresh morning air in {city}! 🌬️",
+    "Time to seize the day in {city}! 💪",
+    "Morning jog weather in {city}? 🏃",
+    "Breakfast is the most important meal in {city}! 🥞",
+    "The sun is greeting {city} with a smile! 😊",
+    "New day, new possibilities in {city}! 🌈",
+    "Rush hour is starting in {city}! 🚌",
+    "Morning news is on in {city}! 📺",
+    "Good morning sunshine from {city}! 🌞",
+    "Fresh croissants and coffee in {city}? 🥐",
+    "Morning yoga session in {city}? 🧘‍♀️",
+    "Alarm clocks are ringing in {city}! ⏰",
+    "Another beautiful morning in {city}! 🌸",
+    "Time to make your bed in {city}! 🛏️",
+    "Fresh start vibes in {city}! ✨",
+    "Morning commute begins in {city}! 🚇",
+    "Time to water the plants in {city}! 🪴",
+    "Birds are chirping in {city}! 🐦",
+    "Morning motivation mode in {city}! 💪",
+    "The world is your oyster in {city}! 🦪",
+    "Sunrise spectacular in {city}! 🌅",
+    "Fresh as a daisy in {city}! 🌼",
+    "Morning mindfulness in {city}! 🧠",
+    "Early bird specials in {city}! 🍳",
+)
+AFTERNOON_FOOTERS = (
+    "Keep hustling, {city}! 💪",
+    "Perfect time for a siesta in {city}. 😴",
+    "Hope your day is going well in {city}! 🌞",
+    "Lunch break time in {city}? 🍽️",
+    "The sun is at its peak in {city}! ☀️",
+    "Productivity mode activated in {city}! 📈",
+    "Ice cream weather in {city}? 🍦",
+    "Working hard or hardly working in {city}? 💼",
+    "The afternoon hustle in {city} is real! 🏃‍♀️",
+    "Time flies when you're having fun in {city}! ⏰",
+    "Midday energy boost needed in {city}? ⚡",
+    "The perfect time for outdoor activities in {city}! 🌳",
+    "Sunshine and productivity in {city}! 🌻",
+    "Time to stretch those legs in {city}! 🤸‍♂️",
+    "Afternoon meeting marathon in {city}! 📊",
+    "Time for a quick power walk in {city}! 🚶‍♀️",
+    "Perfect weather for outdoor dining in {city}! 🍴",
+    "Getting things done in {city}! ✅",
+    "Halfway through the workday in {city}! 📈",
+    "Afternoon delight in {city}! 🎵",
+    "Keep calm and carry on in {city}! 🧘",
+    "The grind never stops in {city}! ⚙️",
+    "Peak performance hours in {city}! 🏆",
+    "Time for a coffee break in {city}! ☕",
+    "Afternoon adventures await in {city}! 🗺️",
+    "Sunshine therapy in {city}! ☀️",
+    "Power through the afternoon in {city}! 💪",
+    "The day is in full swing in {city}! 🎯",
+)
+EVENING_FOOTERS = (
+    "Time to relax in {city}. 🍷",
+    "Sunset vibes in {city}. 🌇",
+    "Netflix and chill in {city}? 🍿",
+    "Happy hour somewhere in {city}! 🍻",
+    "Dinner plans in {city}? 🍽️",
+    "The golden hour in {city} looks magical! ✨",
+    "Time to unwind in {city}! 🧘",
+    "Evening stroll weather in {city}? 🚶",
+    "The city lights are starting to twinkle in {city}! 💡",
+    "Date night in {city}? 💕",
+    "Rush hour traffic clearing up in {city}! 🚗",
+    "The workday is winding down in {city}! 📝",
+    "Time for some evening entertainment in {city}! 🎭",
+    "Time to cook dinner in {city}! 👨‍🍳",
+    "Golden hour photography in {city}! 📷",
+    "Winding down in {city}... 🛋️",
+    "Time for some evening exercise in {city}! 🏋️‍♀️",
+    "The day is coming to an end in {city}! 🌆",
+    "Perfect time for a walk in {city}! 🚶",
+    "Time to catch up with friends in {city}! 👥",
+    "Evening breeze in {city} feels nice! 🌬️",
+    "Cozy evening vibes in {city}! 🕯️",
+    "Time to unwind with a good book in {city}! 📚",
+    "Twilight magic in {city}! ✨",
+    "Time to reflect on the day in {city}! 💭",
+    "Perfect time for a romantic dinner in {city}! 🥂",
+    "Evening meditation time in {city}! 🧘‍♂️",
+    "Time to call it a day in {city}! 📞",
+    "The evening glow in {city} is stunning! 🌅",
+    "Time for some self-care in {city}! 💆‍♀️",
+)
+NIGHT_FOOTERS = (
+    "It's late in {city}. Don't let the bed bugs bite! 🛌",
+    "{city} is sleeping. Or are you a night owl? 🦉",
+    "Shhh... {city} is dreaming. 😴",
+    "The stars are shining bright over {city}! ✨",
+    "Midnight snack time in {city}? 🍕",
+    "The city that never sleeps? Not {city} right now! 💤",
+    "Late night thoughts from {city}... 💭",
+    "Even {city} needs beauty sleep! 💄",
+    "Night shift workers in {city} are keeping busy! 🌃",
+    "Sweet dreams from {city}! 🌙",
+    "Time for some beauty sleep in {city}! 💤",
+    "The moon is watching over {city} tonight! 🌛",
+    "Counting sheep in {city}... 1, 2, 3... 🐑",
+    "Pizza delivery is probably still open in {city}! 🍕",
+    "Time to binge-watch something in {city}! 📺",
+    "Late night coding session in {city}? 💻",
+    "The night is young in {city}! 🌃",
+    "Peaceful slumber awaits in {city}! 😴",
+    "Night photography weather in {city}! 📸",
+    "The city is tucked in for the night in {city}! 🛏️",
+    "Insomniacs unite in {city}! 😵",
+    "Time for a bedtime story in {city}! 📚",
+    "The witching hour in {city}! 🧙‍♀️",
+    "Dreaming of better days in {city}! 💭",
+    "Silent streets in {city} tell stories! 🏙️",
+)
+FOOTER_TEMPLATES = {
+    "Good morning": MORNING_FOOTERS,
+    "Good afternoon": AFTERNOON_FOOTERS,
+    "Good evening": EVENING_FOOTERS,
+    "Good night": NIGHT_FOOTERS,
+}
+
+FUN_FACTS = (
+    "Did you know? There are 24 time zones in the world! 🌐",
+    "UTC stands for Universal Time Coordinated! 🕒",
+    "Some countries have 30 or 45 minute offsets! ⏰",
+    "The world is a beautiful place—enjoy every timezone! 🌏",
+    "Time flies like an arrow. Fruit flies like a banana! 🍌",
+    "It's always 5 o'clock somewhere! 🍹",
+    "China uses only one time zone despite spanning 5 geographical zones! 🇨🇳",
+    "Russia has 11 time zones - the most of any country! 🇷🇺",
+    "The International Date Line isn't straight - it zigzags! 📅",
+    "Some Pacific islands are a full day ahead of others! 🏝️",
+    "Nepal has a unique +5:45 UTC offset - not a round hour! 🏔️",
+    "Australia's Lord Howe Island has a 30-minute daylight saving! ⏰",
+    "The North and South Poles technically have all time zones! 🧭",
+    "France has the most time zones (12) due to overseas territories! 🇫🇷",
+    "Arizona (mostly) doesn't observe daylight saving time! 🌵",
+    "Time zones were invented by railway companies! 🚂",
+    "Before time zones, every city had its own local time! 🏙️",
+    "The first country to see the new year is Kiribati! 🎉",
+    "GMT and UTC are almost the same but not exactly! ⏱️",
+    "Some countries have changed time zones for political reasons! 🗳️",
+)
+
 def get_funny_footer(city: str, hour: int) -> str:
-    night_jokes = [
-        f"It's late in {city}. Don't let the bed bugs bite! 🛌",
-        f"{city} is sleeping. Or are you a night owl? 🦉",
-        f"Shhh... {city} is dreaming. 😴",
-        f"The stars are shining bright over {city}! ✨",
-        f"Midnight snack time in {city}? 🍕",
-        f"The city that never sleeps? Not {city} right now! 💤",
-        f"Late night thoughts from {city}... 💭",
-        f"Even {city} needs beauty sleep! 💄",
-        f"Night shift workers in {city} are keeping busy! 🌃",
-        f"Sweet dreams from {city}! 🌙",
-        f"Time for some beauty sleep in {city}! 💤",
-        f"The moon is watching over {city} tonight! 🌛",
-        f"Counting sheep in {city}... 1, 2, 3... 🐑",
-        f"Pizza delivery is probably still open in {city}! 🍕",
-        f"Time to binge-watch something in {city}! 📺",
-        f"Late night coding session in {city}? 💻",
-        f"The night is young in {city}! 🌃",
-        f"Peaceful slumber awaits in {city}! 😴",
-        f"Night photography weather in {city}! 📸",
-        f"The city is tucked in for the night in {city}! 🛏️",
-        f"Insomniacs unite in {city}! 😵",
-        f"Time for a bedtime story in {city}! 📚",
-        f"The witching hour in {city}! 🧙‍♀️",
-        f"Dreaming of better days in {city}! 💭",
-        f"Silent streets in {city} tell stories! 🏙️",
-    ]
-    morning_jokes = [
-        f"Rise and shine, {city}! ☀️",
-        f"Coffee time in {city}? ☕",
-        f"Start your engines, {city}! 🚗",
-        f"The early bird catches the worm in {city}! 🐦",
-        f"Fresh morning air in {city}! 🌬️",
-        f"Time to seize the day in {city}! 💪",
-        f"Morning jog weather in {city}? 🏃",
-        f"Breakfast is the most important meal in {city}! 🥞",
-        f"The sun is greeting {city} with a smile! 😊",
-        f"New day, new possibilities in {city}! 🌈",
-        f"Rush hour is starting in {city}! 🚌",
-        f"Morning news is on in {city}! 📺",
-        f"Good morning sunshine from {city}! 🌞",
-        f"Fresh croissants and coffee in {city}? 🥐",
-        f"Morning yoga session in {city}? 🧘‍♀️",
-        f"Alarm clocks are ringing in {city}! ⏰",
-        f"Another beautiful morning in {city}! 🌸",
-        f"Time to make your bed in {city}! 🛏️",
-        f"Fresh start vibes in {city}! ✨",
-        f"Morning commute begins in {city}! 🚇",
-        f"Time to water the plants in {city}! 🪴",
-        f"Birds are chirping in {city}! 🐦",
-        f"Morning motivation mode in {city}! 💪",
-        f"The world is your oyster in {city}! 🦪",
-        f"Sunrise spectacular in {city}! 🌅",
-        f"Fresh as a daisy in {city}! 🌼",
-        f"Morning mindfulness in {city}! 🧠",
-        f"Early bird specials in {city}! 🍳",
-    ]
-    afternoon_jokes = [
-        f"Keep hustling, {city}! 💪",
-        f"Perfect time for a siesta in {city}. 😴",
-        f"Hope your day is going well in {city}! 🌞",
-        f"Lunch break time in {city}? 🍽️",
-        f"The sun is at its peak in {city}! ☀️",
-        f"Productivity mode activated in {city}! 📈",
-        f"Ice cream weather in {city}? 🍦",
-        f"Working hard or hardly working in {city}? 💼",
-        f"The afternoon hustle in {city} is real! 🏃‍♀️",
-        f"Time flies when you're having fun in {city}! ⏰",
-        f"Midday energy boost needed in {city}? ⚡",
-        f"The perfect time for outdoor activities in {city}! 🌳",
-        f"Sunshine and productivity in {city}! 🌻",
-        f"Time to stretch those legs in {city}! 🤸‍♂️",
-        f"Afternoon meeting marathon in {city}! 📊",
-        f"Time for a quick power walk in {city}! 🚶‍♀️",
-        f"Perfect weather for outdoor dining in {city}! 🍴",
-        f"Getting things done in {city}! ✅",
-        f"Halfway through the workday in {city}! 📈",
-        f"Afternoon delight in {city}! 🎵",
-        f"Keep calm and carry on in {city}! 🧘",
-        f"The grind never stops in {city}! ⚙️",
-        f"Peak performance hours in {city}! 🏆",
-        f"Time for a coffee break in {city}! ☕",
-        f"Afternoon adventures await in {city}! 🗺️",
-        f"Sunshine therapy in {city}! ☀️",
-        f"Power through the afternoon in {city}! 💪",
-        f"The day is in full swing in {city}! 🎯",
-    ]
-    evening_jokes = [
-        f"Time to relax in {city}. 🍷",
-        f"Sunset vibes in {city}. 🌇",
-        f"Netflix and chill in {city}? 🍿",
-        f"Happy hour somewhere in {city}! 🍻",
-        f"Dinner plans in {city}? 🍽️",
-        f"The golden hour in {city} looks magical! ✨",
-        f"Time to unwind in {city}! 🧘",
-        f"Evening stroll weather in {city}? 🚶",
-        f"The city lights are starting to twinkle in {city}! 💡",
-        f"Date night in {city}? 💕",
-        f"Rush hour traffic clearing up in {city}! 🚗",
-        f"The workday is winding down in {city}! 📝",
-        f"Time for some evening entertainment in {city}! 🎭",
-        f"Time to cook dinner in {city}! 👨‍🍳",
-        f"Golden hour photography in {city}! 📷",
-        f"Winding down in {city}... 🛋️",
-        f"Time for some evening exercise in {city}! 🏋️‍♀️",
-        f"The day is coming to an end in {city}! 🌆",
-        f"Perfect time for a walk in {city}! 🚶",
-        f"Time to catch up with friends in {city}! 👥",
-        f"Evening breeze in {city} feels nice! 🌬️",
-        f"Cozy evening vibes in {city}! 🕯️",
-        f"Time to unwind with a good book in {city}! 📚",
-        f"Twilight magic in {city}! ✨",
-        f"Time to reflect on the day in {city}! 💭",
-        f"Perfect time for a romantic dinner in {city}! 🥂",
-        f"Evening meditation time in {city}! 🧘‍♂️",
-        f"Time to call it a day in {city}! 📞",
-        f"The evening glow in {city} is stunning! 🌅",
-        f"Time for some self-care in {city}! 💆‍♀️",
-    ]
-    if 5 <= hour < 12:
-        return morning_jokes[hour % len(morning_jokes)]
-    elif 12 <= hour < 17:
-        return afternoon_jokes[hour % len(afternoon_jokes)]
-    elif 17 <= hour < 21:
-        return evening_jokes[hour % len(evening_jokes)]
+    templates = FOOTER_TEMPLATES[get_greeting(hour)]
+    return templates[hour % len(templates)].format(city=city)
+
+TIMEZONE_ALIASES = {
+    'UTC': ('UTC', 'Coordinated Universal Time'),
+    'GMT': ('UTC', 'Greenwich Mean Time'),
+    'EST': ('America/New_York', 'Eastern Standard Time'),
+    'EDT': ('America/New_York', 'Eastern Daylight Time'),
+    'CST': ('America/Chicago', 'Central Standard Time'),
+    'CDT': ('America/Chicago', 'Central Daylight Time'),
+    'MST': ('America/Denver', 'Mountain Standard Time'),
+    'MDT': ('America/Denver', 'Mountain Daylight Time'),
+    'PST': ('America/Los_Angeles', 'Pacific Standard Time'),
+    'PDT': ('America/Los_Angeles', 'Pacific Daylight Time'),
+    'CET': ('Europe/Paris', 'Central European Time'),
+    'CEST': ('Europe/Paris', 'Central European Summer Time'),
+    'JST': ('Asia/Tokyo', 'Japan Standard Time'),
+    'IST': ('Asia/Kolkata', 'India Standard Time'),
+}
+
+def resolve_zone(text: str) -> Optional[Tuple[str, str]]:
+    """Resolve a timezone abbreviation (EST), IANA name (Europe/Paris) or city to (tz, label)."""
+    text = text.strip()
+    if text.upper() in TIMEZONE_ALIASES:
+        tz, name = TIMEZONE_ALIASES[text.upper()]
+        return tz, f"{name} ({text.upper()})"
+    from .tzindex import lookup_zone
+    found = lookup_zone(text, components=False, abbreviations=text.isupper()) if text else None
+    if found:
+        tz, kind = found
+        label = f"{tz} ({text.upper()})" if kind == "abbreviation" else tz
+        return tz, label
+    if "/" in text:
+        return None
+    city_info = get_city_by_name(text) if text else None
+    if city_info:
+        return city_info[2], f"{city_info[0]} ({city_info[2]})"
+    return None
+
+def parse_instant(text: str) -> Optional[datetime.datetime]:
+    """Parse an ISO 8601 instant or date ('2025-03-30', '2025-03-30T09:00', '...Z', '...+05:30').
+    Values without an offset are read in the local timezone."""
+    text = text.strip()
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        dt = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.astimezone()
+
+# Renders take one instant from this clock and derive every row from it. set_now() or $GTIME_NOW
+# (an ISO instant or epoch seconds) pin it, so tests and benchmarks see a fixed time. Only the instant
+# is pinned: the local date and times still come from the machine's zone (set TZ to pin that too).
+_pinned_now: Optional[float] = None
+
+def set_now(instant: Union[None, float, datetime.datetime] = None) -> None:
+    """Pin the clock to an instant (epoch seconds or an aware datetime); None restores the system clock."""
+    global _pinned_now
+    _pinned_now = instant.timestamp() if isinstance(instant, datetime.datetime) else instant
+
+@lru_cache(maxsize=8)
+def _parse_now(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        dt = parse_instant(text)
+        return dt.timestamp() if dt else None
+
+def current_time() -> float:
+    """The current UTC instant in epoch seconds."""
+    if _pinned_now is not None:
+        return _pinned_now
+    text = os.environ.get("GTIME_NOW")
+    pinned = _parse_now(text) if text else None
+    return time.time() if pinned is None else pinned
+
+def current_datetime() -> datetime.datetime:
+    """current_time() as an aware datetime in the viewer's local timezone."""
+    return datetime.datetime.fromtimestamp(current_time()).astimezone()
+
+def parse_meeting_time(args: List[str], on: Optional[datetime.date] = None,
+                       zone: Optional[str] = None) -> Tuple[Optional[datetime.datetime], Optional[str]]:
+    if "at" in args:
+        idx = args.index("at")
+    elif "on" in args:
+        idx = args.index("on")
     else:
-        return night_jokes[hour % len(night_jokes)]
+        return None, None
+    time_str = " ".join(args[idx+1:])
+    
+    timezone_spec = None
+    timezone_info = None
+    
+    parts = time_str.split()
+    if zone:
+        # The zone was given separately ('meeting at 10:00 in Tokyo'); no trailing timezone token
+        timezone_spec = timezone_info = zone
+    elif len(parts) > 1 and parts[-1].upper() in TIMEZONE_ALIASES:
+        tz_abbr = parts[-1].upper()
+        timezone_spec, tz_name = TIMEZONE_ALIASES[tz_abbr]
+        timezone_info = f"{tz_name} ({tz_abbr})"
+        time_str = " ".join(parts[:-1])
+    elif len(parts) > 1:
+        from .tzindex import lookup_zone
+        found = lookup_zone(parts[-1], components=False)
+        if found:
+            timezone_spec, kind = found
+            if kind == "abbreviation":
+                timezone_info = f"{timezone_spec} ({parts[-1].upper()})"
+            else:
+                timezone_info = str(get_tzinfo(timezone_spec)) if kind == "offset" else timezone_spec
+            time_str = " ".join(parts[:-1])
+    
+    # The meeting day is today where the meeting happens: in the given zone, else on this machine
+    if timezone_spec:
+        today = datetime.datetime.fromtimestamp(current_time(), get_tzinfo(timezone_spec)).replace(tzinfo=None)
+    else:
+        today = datetime.datetime.fromtimestamp(current_time())
+    if on:
+        today = datetime.datetime.combine(on, today.time())
+    
+    formats = [
+        "%I:%M %p",    # 12-hour format with AM/PM (e.g., "3:30 PM")
+        "%H:%M",       # 24-hour format (e.g., "15:30")
+        "%I %p",       # Hour only with AM/PM (e.g., "3 PM")
+        "%H",          # Hour only 24-hour (e.g., "15")
+    ]
+    
+    for fmt in formats:
+        try:
+            dt = datetime.datetime.strptime(time_str, fmt)
+            meeting_time = today.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
+            
+            if timezone_spec:
+                specified_tz = get_tzinfo(timezone_spec)
+                meeting_time_in_tz = meeting_time.replace(tzinfo=specified_tz)
+                local_meeting_time = meeting_time_in_tz.astimezone()
+                meeting_time = local_meeting_time.replace(tzinfo=None)
+            
+            return meeting_time, timezone_info
+        except (ValueError, Exception):
+            continue
+    
+    return None, None
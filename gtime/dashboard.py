@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Multi-panel dashboard for Global Time Utility (gtime)
+Favorites, named compare groups and the timeline share one screen and one scheduler. Each panel
+knows the first instant its content can change (the next minute, the next timeline hour, the next
+UTC offset transition of a zone it shows); the scheduler sleeps until the earliest of those and
+re-renders only the panels that are due, so an idle dashboard costs one wakeup per minute.
+"""
+
+import datetime
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .core import current_time
+from .zones import offset_span
+
+def next_minute(ts: int) -> int:
+    return (ts // 60 + 1) * 60
+
+def zones_due(found: List[Tuple[str, str, str, str]], ts: int) -> Optional[int]:
+    """The earliest instant after ts at which any of the cities' UTC offsets may change."""
+    return min((offset_span(tz, ts)[1] for tz in {tz for _, _, tz, _ in found}), default=None)
+
+def _earliest(*instants: Optional[int]) -> int:
+    return min(ts for ts in instants if ts is not None)
+
+class ClockPanel:
+    """A titled table of cities with their local times; changes every minute."""
+
+    def __init__(self, title: str, found: List[Tuple[str, str, str, str]], sort: Optional[str] = None):
+        self.title = title
+        self.found = found
+        self.sort = sort
+
+    def render(self, ts: int):
+        from .cli import _time_table, _sort_index, _iter_time_rows
+        table = _time_table(title=f"[bold magenta]{self.title}[/bold magenta]")
+        for row in _iter_time_rows(self.found, _sort_index(self.found, self.sort, ts), ts):
+            table.add_row(*row)
+        return table
+
+    def due(self, ts: int) -> int:
+        return _earliest(next_minute(ts), zones_due(self.found, ts))
+
+class TimelinePanel:
+    """The hourly heatmap; changes when the 'now' column moves or a shown zone's offset changes."""
+
+    def __init__(self, found: List[Tuple[str, str, str, str]], hours: int = 24):
+        self.found = found
+        self.hours = hours
+
+    def render(self, ts: int):
+        from rich.console import Group
+        from rich.text import Text
+        from .cli import timeline_markup
+        *lines, legend = timeline_markup(self.found, self.hours, datetime.datetime.fromtimestamp(ts).astimezone())
+        texts = [Text.from_markup(line, overflow="crop") for line in lines]
+        for text in texts:
+            text.no_wrap = True
+        return Group(*texts, Text.from_markup(legend))
+
+    def due(self, ts: int) -> int:
+        from .cli import timeline_start
+        start = timeline_start(datetime.datetime.fromtimestamp(ts).astimezone())
+        next_hour = start + ((ts - start) // 3600 + 1) * 3600
+        return _earliest(next_hour, zones_due(self.found, ts))
+
+def run(panels: List, draw: Callable[[int, List], None], clock: Callable[[], float] = current_time,
+        sleep: Callable[[float], None] = time.sleep, monotonic: Callable[[], float] = time.monotonic):
+    """Render every panel and draw, then repeatedly sleep until the earliest due panel,
+    re-render the panels that are due and draw again. Runs until interrupted.
+
+    Waits are measured on the monotonic clock, so a pinned clock (GTIME_NOW) still redraws once
+    per period with the pinned instant; `clock` only gives the instant the panels show. A panel
+    is also due once `clock` passes its due instant, e.g. after a suspend."""
+    def schedule(i: int, now: int, started: float) -> List:
+        due = panels[i].due(now)
+        return [started + (due - now), i, due]
+
+    now, started = int(clock()), monotonic()
+    rendered = [panel.render(now) for panel in panels]
+    queue = [schedule(i, now, started) for i in range(len(panels))]
+    draw(now, rendered)
+    while queue:
+        delay = min(wake for wake, _, _ in queue) - monotonic()
+        if delay > 0:
+            sleep(delay)
+        now, started = int(clock()), monotonic()
+        ready = [entry for entry in queue if entry[0] <= started or entry[2] <= now]
+        if not ready:
+            continue
+        for entry in ready:
+            i = entry[1]
+            rendered[i] = panels[i].render(now)
+            entry[:] = schedule(i, now, started)
+        draw(now, rendered)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Shared row formatting for Global Time Utility (gtime)
+Table rows are assembled from cached fragments: offset labels, phase labels, city labels and
+date and clock strings are each built once, instead of per row with strftime and f-strings.
+"""
+
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from .core import get_time_emoji, get_greeting, offset_label
+from .zones import offset_at
+
+PHASE_LABELS = tuple(f"{get_time_emoji(hour)} {get_greeting(hour)}" for hour in range(24))
+
+@lru_cache(maxsize=None)
+def city_label(city: str, country: str) -> str:
+    return f"{city}, {country}"
+
+@lru_cache(maxsize=1024)
+def _day_label(day: int) -> str:
+    return time.strftime("%a, %b %d ", time.gmtime(day * 86400))
+
+@lru_cache(maxsize=None)
+def _clock_label(minute: int) -> str:
+    # At most 1440 keys, one per minute of the day
+    hours, minutes = divmod(minute, 60)
+    return f"{hours % 12 or 12:02}:{minutes:02} {'AM' if hours < 12 else 'PM'}"
+
+def local_time_label(ts: int, offset: int) -> str:
+    """Same text as strftime('%a, %b %d %I:%M %p') of the local time, from two cached fragments."""
+    local = ts + offset
+    return _day_label(local // 86400) + _clock_label(local % 86400 // 60)
+
+def time_row(city_info: Tuple[str, str, str, str], ts: int, offset: Optional[int] = None) -> Tuple[str, str, str, str, str]:
+    """(flag, city, local time, phase, UTC offset) cells for one city at instant ts; pass the zone's
+    offset when it is already known."""
+    city, country, tz, emoji = city_info
+    if offset is None:
+        offset = offset_at(tz, ts)
+    local = ts + offset
+    return (emoji, city_label(city, country), local_time_label(ts, offset),
+            PHASE_LABELS[local // 3600 % 24], offset_label(offset))
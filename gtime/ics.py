@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+iCalendar ingestion for Global Time Utility (gtime)
+Reads .ics exports one line at a time: folded lines are joined and each VEVENT is yielded as soon
+as it ends, so the file is never held in memory. Recurring events are expanded lazily with
+dateutil's rrule, only up to the end of the requested window, and occurrences are localized in
+batches through the per-zone offset spans (see gtime.ranges.zone_offsets).
+"""
+
+import datetime
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .core import get_tzinfo
+from .ranges import zone_offsets
+
+BATCH_SIZE = 512
+FORMATS = ("table", "jsonl")
+
+_DURATION_RE = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+_TEXT_ESCAPES = {"n": " ", "N": " ", ",": ",", ";": ";", "\\": "\\"}
+_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join RFC 5545 folded lines (continuations start with a space or tab)."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+def parse_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split 'NAME;PARAM=VALUE;...:value' into (NAME, params, value); quoted parameter values may
+    contain ':' and ';'."""
+    quoted = False
+    for pos, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:pos], line[pos + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *params = re.split(r';(?=(?:[^"]*"[^"]*")*[^"]*$)', head)
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parsed[key.upper()] = param_value.strip('"')
+    return name.upper(), parsed, value
+
+def events(lines: Iterable[str]) -> Iterator[Dict[str, List[Tuple[Dict[str, str], str]]]]:
+    """Yield each VEVENT as {property name: [(params, value), ...]}, ignoring nested components."""
+    event = None
+    depth = 0
+    for line in unfold(lines):
+        name, params, value = parse_property(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and event is None:
+                event, depth = {}, 0
+            elif event is not None:
+                depth += 1
+        elif name == "END" and event is not None:
+            if depth:
+                depth -= 1
+            elif value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not depth:
+            event.setdefault(name, []).append((params, value))
+
+def unescape(text: str) -> str:
+    return re.sub(r"\\(.)", lambda m: _TEXT_ESCAPES.get(m.group(1), m.group(1)), text)
+
+def zone_for_tzid(tzid: str):
+    """tzinfo for a TZID: an IANA name, one wrapped in a vendor prefix ('/mozilla.org/.../Europe/Paris'),
+    or anything gtime.tzindex resolves. None when unknown."""
+    from .tzindex import lookup_zone
+    tzid = tzid.strip().strip('"')
+    parts = tzid.strip("/").split("/")
+    for candidate in (tzid, "/".join(parts[-2:]), "/".join(parts[-3:])):
+        try:
+            return get_tzinfo(candidate)
+        except Exception:
+            pass
+    found = lookup_zone(tzid)
+    return get_tzinfo(found[0]) if found else None
+
+def parse_datetime(params: Dict[str, str], value: str) -> Tuple[datetime.datetime, bool]:
+    """(datetime, all_day) for a DTSTART/DTEND/EXDATE value. UTC values are aware, TZID values carry
+    their zone, and floating or all-day values are naive (read as the viewer's local time)."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.datetime.strptime(value[:8], "%Y%m%d"), True
+    dt = datetime.datetime.strptime(value.rstrip("Zz")[:15], "%Y%m%dT%H%M%S")
+    if value[-1:] in ("Z", "z"):
+        return dt.replace(tzinfo=datetime.timezone.utc), False
+    zone = zone_for_tzid(params["TZID"]) if "TZID" in params else None
+    return (dt.replace(tzinfo=zone) if zone else dt), False
+
+def parse_ics_duration(value: str) -> int:
+    match = _DURATION_RE.match(value.strip().upper())
+    if not match:
+        return 0
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    total = (int(weeks or 0) * 7 + int(days or 0)) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds or 0)
+    return -total if sign == "-" else total
+
+def _first(event: dict, name: str) -> Optional[Tuple[Dict[str, str], str]]:
+    values = event.get(name)
+    return values[0] if values else None
+
+def _rule_parts(rule: str) -> Dict[str, str]:
+    return {key.upper(): value for key, _, value in (part.partition("=") for part in rule.split(";"))}
+
+def _skip_ahead(rule: str, first: datetime.datetime, start: int) -> Tuple[str, datetime.datetime]:
+    """(rule, dtstart) producing the same occurrences from about one period before `start` on,
+    so a long-running series is not iterated from its first DTSTART. The new start is a whole
+    number of INTERVAL periods later, with the BYxxx values the rule took implicitly from the
+    original DTSTART spelled out. Rules with COUNT, or finer than daily, are left as they are."""
+    from dateutil.relativedelta import relativedelta
+    parts = _rule_parts(rule)
+    freq = parts.get("FREQ", "").upper()
+    if "COUNT" in parts or freq not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        return rule, first
+    interval = int(parts.get("INTERVAL") or 1)
+    if first.tzinfo is None:
+        window = datetime.datetime.fromtimestamp(start)
+    else:
+        window = datetime.datetime.fromtimestamp(start, first.tzinfo)
+    pins = []
+    if freq in ("DAILY", "WEEKLY"):
+        days = interval * (7 if freq == "WEEKLY" else 1)
+        periods = (window.date() - first.date()).days // days - 1
+        step = datetime.timedelta(days=days)
+        if freq == "WEEKLY" and "BYDAY" not in parts:
+            pins.append(f"BYDAY={_WEEKDAYS[first.weekday()]}")
+    else:
+        months = interval * (12 if freq == "YEARLY" else 1)
+        periods = ((window.year - first.year) * 12 + window.month - first.month) // months - 1
+        step = relativedelta(months=months)
+        implicit = not any(key in parts for key in ("BYDAY", "BYMONTHDAY", "BYYEARDAY", "BYWEEKNO"))
+        if freq == "YEARLY" and implicit and "BYMONTH" not in parts:
+            pins.append(f"BYMONTH={first.month}")
+        if implicit:
+            pins.append(f"BYMONTHDAY={first.day}")
+    if periods <= 0:
+        return rule, first
+    # Wall-clock arithmetic: the series keeps its local time across DST changes
+    return ";".join([rule] + pins), first + step * periods
+
+def occurrences(event_stream: Iterable[dict], start: int, end: int) -> Iterator[Tuple[int, int, str, str, bool]]:
+    """Yield (start, end, summary, uid, all_day) for each occurrence that starts in [start, end),
+    event by event. Recurrences are expanded lazily from about one period before the window
+    (see _skip_ahead) and stop at the end of the window.
+    Events whose dates cannot be read are skipped."""
+    from dateutil.rrule import rruleset, rrulestr
+    for event in event_stream:
+        dtstart = _first(event, "DTSTART")
+        if dtstart is None:
+            continue
+        try:
+            first, all_day = parse_datetime(*dtstart)
+            if "DTEND" in event:
+                length = int((parse_datetime(*event["DTEND"][0])[0] - first).total_seconds())
+            elif "DURATION" in event:
+                length = parse_ics_duration(event["DURATION"][0][1])
+            else:
+                length = 86400 if all_day else 0
+            summary = unescape(_first(event, "SUMMARY")[1]) if "SUMMARY" in event else ""
+            uid = _first(event, "UID")[1] if "UID" in event else ""
+            if "RRULE" not in event and "RDATE" not in event:
+                stamps = iter([first])
+            else:
+                rules = rruleset()
+                for _, rule in event.get("RRULE", []):
+                    if first.tzinfo is None:
+                        # dateutil refuses a UTC UNTIL with a floating start
+                        rule = re.sub(r"(UNTIL=\d{8}(?:T\d{6})?)Z", r"\1", rule, flags=re.IGNORECASE)
+                    rule, rule_start = _skip_ahead(rule, first, start)
+                    rules.rrule(rrulestr(rule, dtstart=rule_start))
+                for name, add in (("RDATE", rules.rdate), ("EXDATE", rules.exdate)):
+                    for params, value in event.get(name, []):
+                        for item in value.split(","):
+                            add(parse_datetime(params, item)[0])
+                stamps = iter(rules)
+            for dt in stamps:
+                ts = int(dt.timestamp())
+                if ts >= end:
+                    break
+                if ts >= start:
+                    yield ts, ts + length, summary, uid, all_day
+        except (ValueError, TypeError, OverflowError):
+            continue
+
+def localized(items: Iterable[tuple], zones: Sequence[str], batch: int = BATCH_SIZE) -> Iterator[Tuple[tuple, Tuple[int, ...]]]:
+    """Pair each occurrence with its UTC offset in every zone. Occurrences are taken BATCH_SIZE at a
+    time and their distinct instants walked in order, so a zone's offset is looked up again only
+    when an instant passes the end of its current span."""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, batch))
+        if not chunk:
+            return
+        offsets = {ts: tuple(row) for ts, row in zone_offsets(zones, sorted({item[0] for item in chunk}))}
+        for item in chunk:
+            yield item, offsets[item[0]]
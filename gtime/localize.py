@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk timestamp localization for Global Time Utility (gtime)
+Streams a CSV or JSON Lines file of (utc timestamp, city) records in newline-aligned chunks,
+localizes each chunk in a batch on a process pool and writes the results back in input order.
+Each distinct city is resolved once per worker and zone offsets are reused until they change.
+"""
+
+import csv
+import datetime
+import io
+import json
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .core import get_city_by_name
+from .ranges import format_local
+from .zones import offset_span
+
+FORMATS = ("csv", "jsonl")
+CHUNK_BYTES = 4 << 20
+TIMESTAMP_FIELDS = ("utc_timestamp", "timestamp", "utc", "ts", "time")
+CITY_FIELD = "city"
+OUTPUT_FIELD = "local_time"
+# Instants datetime can represent (years 1 to 9999); anything outside is not a timestamp
+MIN_TIMESTAMP = -62135596800
+MAX_TIMESTAMP = 253402300799
+
+@lru_cache(maxsize=None)
+def zone_for(city: str) -> Optional[str]:
+    city_info = get_city_by_name(city.strip()) if city.strip() else None
+    return city_info[2] if city_info else None
+
+def parse_timestamp(text: str) -> Optional[int]:
+    """Parse epoch seconds or an ISO 8601 instant; values without an offset are UTC.
+    None when unparseable or out of datetime's range."""
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        ts = int(float(text))
+    except (ValueError, OverflowError):
+        if text[-1] in "Zz":
+            text = text[:-1] + "+00:00"
+        try:
+            dt = datetime.datetime.fromisoformat(text)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=datetime.timezone.utc)
+            ts = int(dt.timestamp())
+        except (ValueError, OverflowError):
+            return None
+    # Epoch milliseconds and the like land far outside what datetime accepts
+    return ts if MIN_TIMESTAMP <= ts <= MAX_TIMESTAMP else None
+
+def localize_batch(records: List[Tuple[str, str]]) -> List[str]:
+    """Local ISO times for a batch of (timestamp, city) pairs; '' where either cannot be resolved."""
+    zones = {city: zone_for(city) for city in set(city for _, city in records)}
+    # Per zone: (offset, first instant known to use it, instant it stops applying)
+    spans: Dict[str, Tuple[int, int, int]] = {}
+    results = []
+    for ts_text, city in records:
+        tz = zones[city]
+        ts = parse_timestamp(ts_text) if tz else None
+        if ts is None:
+            results.append("")
+            continue
+        try:
+            span = spans.get(tz)
+            if span is None or not span[1] <= ts < span[2]:
+                offset, until = offset_span(tz, ts)
+                span = spans[tz] = (offset, ts, until)
+            results.append(format_local(ts, span[0]))
+        except (ValueError, OverflowError):
+            # At the edges of the representable range a zone's offset can push the local time out of it
+            results.append("")
+    return results
+
+def _json_row(line: str) -> dict:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        row = None
+    # Lines that are not JSON objects are kept, wrapped, so the output stays one record per input line
+    return row if isinstance(row, dict) else {"raw": line}
+
+def localize_chunk(data: bytes, fmt: str, ts_field, city_field) -> Tuple[bytes, int, int]:
+    """Localize one newline-aligned chunk; returns (output bytes, rows, rows that failed)."""
+    text = data.decode("utf-8", errors="replace")
+    out = io.StringIO()
+    if fmt == "jsonl":
+        rows = [_json_row(line) for line in text.splitlines() if line.strip()]
+        local = localize_batch([(str(row.get(ts_field, "")), str(row.get(city_field, ""))) for row in rows])
+        for row, value in zip(rows, local):
+            row[OUTPUT_FIELD] = value or None
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        rows = [row for row in csv.reader(io.StringIO(text)) if row]
+        width = max(ts_field, city_field) + 1
+        local = localize_batch([(row[ts_field], row[city_field]) if len(row) >= width else ("", "") for row in rows])
+        writer = csv.writer(out, lineterminator="\n")
+        for row, value in zip(rows, local):
+            writer.writerow(row + [value])
+    return out.getvalue().encode("utf-8"), len(rows), local.count("")
+
+def _localize_range(path: str, start: int, end: int, fmt: str, ts_field, city_field) -> Tuple[bytes, int, int]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return localize_chunk(f.read(end - start), fmt, ts_field, city_field)
+
+def file_chunks(path: str, start: int, chunk_bytes: int = CHUNK_BYTES) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) byte ranges of about chunk_bytes that always end on a line boundary."""
+    size = os.path.getsize(path)
+    if start >= size:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        while start < size:
+            newline = buf.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if newline < 0 else newline + 1
+            yield start, end
+            start = end
+
+def stream_chunks(stream: BinaryIO, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Like file_chunks for pipes: read about chunk_bytes, then finish the current line."""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            return
+        if not data.endswith(b"\n"):
+            data += stream.readline()
+        yield data
+
+def _ordered(executor: Optional[ProcessPoolExecutor], fn, jobs: Iterable[tuple], window: int) -> Iterator:
+    """Run fn over jobs with at most `window` in flight, yielding results in submission order."""
+    if executor is None:
+        for job in jobs:
+            yield fn(*job)
+        return
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(fn, *job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _header(first_line: bytes, fmt: str):
+    """Work out (ts_field, city_field, has_header) from the first line of the input."""
+    text = first_line.decode("utf-8", errors="replace").strip()
+    if fmt == "jsonl":
+        try:
+            row = json.loads(text) if text else {}
+        except ValueError:
+            row = {}
+        ts_field = next((name for name in TIMESTAMP_FIELDS if name in row), TIMESTAMP_FIELDS[0])
+        return ts_field, CITY_FIELD, False
+    fields = [field.strip().lower() for field in next(csv.reader([text]), [])]
+    if CITY_FIELD not in fields:
+        return 0, 1, False
+    ts_field = next((fields.index(name) for name in TIMESTAMP_FIELDS if name in fields), 0)
+    return ts_field, fields.index(CITY_FIELD), True
+
+def _stdin_jobs(head: bytes, chunks: Iterator[bytes], fmt: str, ts_field, city_field) -> Iterator[tuple]:
+    if head:
+        yield head, fmt, ts_field, city_field
+    for data in chunks:
+        yield data, fmt, ts_field, city_field
+
+def localize(source: Optional[str], out: BinaryIO, fmt: str = "csv", workers: int = 1,
+             chunk_bytes: int = CHUNK_BYTES, stdin: Optional[BinaryIO] = None) -> Tuple[int, int]:
+    """Localize a file (or stdin when source is None) into out; returns (rows, rows that failed)."""
+    if source is None:
+        chunks = stream_chunks(stdin, chunk_bytes)
+        first = next(chunks, b"")
+        newline = first.find(b"\n")
+        first_line = first if newline < 0 else first[:newline + 1]
+    else:
+        with open(source, "rb") as f:
+            first_line = f.readline()
+    ts_field, city_field, has_header = _header(first_line, fmt)
+    if has_header:
+        out.write(first_line.rstrip(b"\r\n") + f",{OUTPUT_FIELD}\n".encode("utf-8"))
+
+    if source is None:
+        head = first[len(first_line):] if has_header else first
+        jobs = _stdin_jobs(head, chunks, fmt, ts_field, city_field)
+        fn = localize_chunk
+    else:
+        start = len(first_line) if has_header else 0
+        jobs = ((source, lo, hi, fmt, ts_field, city_field) for lo, hi in file_chunks(source, start, chunk_bytes))
+        fn = _localize_range
+
+    rows = failed = 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for data, count, misses in _ordered(executor, fn, jobs, workers * 2):
+            out.write(data)
+            rows += count
+            failed += misses
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return rows, failed
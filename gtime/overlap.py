@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Working-hours overlap for Global Time Utility (gtime)
+Each zone's working window is normalized to UTC from its offset table, and pairs are compared by
+interval intersection, never by sampling minutes. Per day, the windows are arcs of the 24-hour
+UTC clock at that date's offsets; per week, they are the zone's Monday-to-Friday windows of that
+calendar week, so weekends and DST changes during the week are accounted for.
+Zones are computed once however many cities share them.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from .team import WORK_HOURS
+from .zones import offset_at, wall_to_instant
+
+DAY = 86400
+WORKDAYS = 5
+
+def day_arcs(offset: int, hours: Tuple[int, int] = WORK_HOURS) -> List[Tuple[int, int]]:
+    """The working window as [start, end) seconds of the UTC day, split in two where it wraps midnight."""
+    start = (hours[0] * 3600 - offset) % DAY
+    end = start + (hours[1] - hours[0]) * 3600
+    return [(start, end)] if end <= DAY else [(start, DAY), (0, end - DAY)]
+
+def intersect(a: Sequence[Tuple[int, int]], b: Sequence[Tuple[int, int]]) -> int:
+    """Total length shared by two sorted lists of disjoint [start, end) intervals (two-pointer sweep)."""
+    i = j = total = 0
+    while i < len(a) and j < len(b):
+        total += max(0, min(a[i][1], b[j][1]) - max(a[i][0], b[j][0]))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+def week_windows(tz: str, monday: int, hours: Tuple[int, int] = WORK_HOURS) -> List[Tuple[int, int]]:
+    """UTC [start, end) of tz's working hours on each weekday of the week starting on local day `monday`
+    (days since the epoch)."""
+    return [(wall_to_instant(tz, day * DAY + hours[0] * 3600), wall_to_instant(tz, day * DAY + hours[1] * 3600))
+            for day in range(monday, monday + WORKDAYS)]
+
+def overlap_matrix(zones: Sequence[str], day: int, week: bool = False,
+                   hours: Tuple[int, int] = WORK_HOURS) -> List[List[int]]:
+    """Shared working minutes for every pair of zones: on local day `day` (days since the epoch),
+    or over the Monday-to-Friday week containing it."""
+    distinct = list(dict.fromkeys(zones))
+    if week:
+        monday = day - (day + 3) % 7  # the epoch was a Thursday
+        windows: Dict[str, List[Tuple[int, int]]] = {tz: week_windows(tz, monday, hours) for tz in distinct}
+    else:
+        windows = {tz: sorted(day_arcs(offset_at(tz, wall_to_instant(tz, day * DAY + 43200)), hours)) for tz in distinct}
+    shared: Dict[Tuple[str, str], int] = {}
+    for i, a in enumerate(distinct):
+        for b in distinct[i:]:
+            shared[a, b] = shared[b, a] = intersect(windows[a], windows[b]) // 60
+    return [[shared[a, b] for b in zones] for a in zones]
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Interactive search-as-you-type city picker for Global Time Utility (gtime)
+Each keystroke narrows the previous result set instead of rescanning the city database,
+and fuzzy scoring runs on a worker thread so typing never waits for it.
+"""
+
+import codecs
+import heapq
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+MAX_ROWS = 10
+FUZZY_MIN_QUERY = 3
+FUZZY_MIN_SCORE = 60
+POLL_SECONDS = 0.05
+
+KEY_UP, KEY_DOWN, KEY_ENTER, KEY_BACKSPACE, KEY_ESCAPE, KEY_TAB = "up", "down", "enter", "backspace", "escape", "tab"
+
+class IncrementalFilter:
+    """Substring filter that narrows from the previous result set on each keystroke."""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.keys = [name.casefold() for name in names]
+        # Stack of (query, matching indices); every entry's query extends the one below it
+        self._stack: List[Tuple[str, List[int]]] = [("", list(range(len(names))))]
+
+    def update(self, query: str) -> List[int]:
+        query = query.casefold()
+        while not query.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        base_query, matches = self._stack[-1]
+        if query != base_query:
+            keys = self.keys
+            matches = [i for i in matches if query in keys[i]]
+            self._stack.append((query, matches))
+        return matches
+
+    def top(self, query: str, limit: int = MAX_ROWS) -> List[int]:
+        """Best `limit` matches: names starting with the query first, then shorter names."""
+        folded = query.casefold()
+        keys = self.keys
+        return heapq.nsmallest(limit, self.update(query), key=lambda i: (not keys[i].startswith(folded), len(keys[i]), i))
+
+def _fuzzy_scores(names: List[str], query: str) -> List[int]:
+    from thefuzz import process
+    choices = dict(enumerate(names))
+    return [idx for _, score, idx in process.extract(query, choices, limit=MAX_ROWS) if score >= FUZZY_MIN_SCORE]
+
+class FuzzyWorker:
+    """Runs fuzzy scoring for the latest query on a background thread, dropping stale requests."""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._query: Optional[str] = None
+        self._future: Optional[Future] = None
+
+    def submit(self, query: str) -> None:
+        if query == self._query:
+            return
+        if self._future is not None:
+            self._future.cancel()
+        self._query = query
+        self._future = self._executor.submit(_fuzzy_scores, self.names, query)
+
+    def result(self, query: str) -> Optional[List[int]]:
+        if query != self._query or self._future is None or not self._future.done():
+            return None
+        return self._future.result()
+
+    def pending(self, query: str) -> bool:
+        return query == self._query and self._future is not None and not self._future.done()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+@contextmanager
+def _cbreak():
+    if os.name == "nt":
+        yield
+        return
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+_ESCAPES = {"[A": KEY_UP, "[B": KEY_DOWN, "OA": KEY_UP, "OB": KEY_DOWN}
+_WINDOWS_KEYS = {"H": KEY_UP, "P": KEY_DOWN}
+_decoder = codecs.getincrementaldecoder("utf-8")()
+
+def _read_key(timeout: float) -> Optional[str]:
+    """Return one key press (a character or a KEY_* name), or None if nothing arrived in time."""
+    if os.name == "nt":
+        import msvcrt
+        import time
+        deadline = time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+        ch = msvcrt.getwch()
+        if ch in ("\x00", "\xe0"):
+            return _WINDOWS_KEYS.get(msvcrt.getwch())
+    else:
+        import select
+        fd = sys.stdin.fileno()
+        if not select.select([fd], [], [], timeout)[0]:
+            return None
+        ch = ""
+        while not ch:
+            ch = _decoder.decode(os.read(fd, 1))
+        if ch == "\x1b":
+            seq = ""
+            while len(seq) < 2 and select.select([fd], [], [], 0.02)[0]:
+                seq += os.read(fd, 1).decode("ascii", "ignore")
+            return _ESCAPES.get(seq, KEY_ESCAPE if not seq else None)
+    if ch in ("\r", "\n"):
+        return KEY_ENTER
+    if ch in ("\x7f", "\x08"):
+        return KEY_BACKSPACE
+    if ch == "\x1b":
+        return KEY_ESCAPE
+    if ch == "\t":
+        return KEY_TAB
+    if ch == "\x03":
+        raise KeyboardInterrupt
+    return ch if ch.isprintable() else None
+
+def _render(title: str, query: str, rows: List[int], names: List[str], cursor: int,
+            marked: Dict[int, None], multi: bool, fuzzy: bool, searching: bool):
+    from rich.table import Table
+    from rich.text import Text
+    table = Table(show_header=False, box=None, padding=(0, 1))
+    table.add_row(Text.assemble(("🔎 ", ""), (f"{title}: ", "bold cyan"), (query, "bold"), ("▌", "blink")))
+    if not rows:
+        table.add_row(Text("  searching…" if searching else "  no matching cities", style="dim"))
+    for pos, idx in enumerate(rows):
+        pointer = "❯" if pos == cursor else " "
+        mark = ("◉ " if idx in marked else "○ ") if multi else ""
+        table.add_row(Text(f"{pointer} {mark}{names[idx]}", style="bold green" if pos == cursor else ""))
+    hint = "↑/↓ move · Enter select · " + ("Tab mark · " if multi else "") + "Esc cancel"
+    if fuzzy:
+        hint += " · fuzzy matches"
+    table.add_row(Text(hint, style="dim"))
+    return table
+
+def pick(names: List[str], initial: str = "", multi: bool = False, title: str = "City") -> List[int]:
+    """Let the user pick one (or, with multi, several) of `names`; returns their indices."""
+    from .cli import console
+    try:
+        import termios  # noqa: F401
+    except ImportError:
+        if os.name != "nt":
+            return prompt_pick(names, initial, title)
+    from rich.live import Live
+
+    matcher = IncrementalFilter(names)
+    fuzzy = FuzzyWorker(names)
+    query, cursor, marked = initial, 0, {}
+
+    def rows_for(query: str) -> Tuple[List[int], bool]:
+        rows = matcher.top(query)
+        if len(rows) < MAX_ROWS and len(query) >= FUZZY_MIN_QUERY:
+            fuzzy.submit(query)
+            extra = [i for i in fuzzy.result(query) or [] if i not in rows]
+            return rows + extra[:MAX_ROWS - len(rows)], bool(extra)
+        return rows, False
+
+    rows, used_fuzzy = rows_for(query)
+    waiting = fuzzy.pending(query)
+    redraw = True
+    try:
+        with _cbreak(), Live(console=console, auto_refresh=False, transient=True) as live:
+            while True:
+                if redraw:
+                    cursor = min(cursor, max(len(rows) - 1, 0))
+                    live.update(_render(title, query, rows, names, cursor, marked, multi, used_fuzzy, waiting), refresh=True)
+                key = _read_key(POLL_SECONDS)
+                redraw = key is not None
+                if key is None:
+                    # Idle tick: pick up fuzzy results once the worker finishes
+                    if waiting and not fuzzy.pending(query):
+                        rows, used_fuzzy = rows_for(query)
+                        waiting, redraw = False, True
+                    continue
+                if key == KEY_ESCAPE:
+                    return []
+                if key == KEY_ENTER:
+                    if marked:
+                        return list(marked)
+                    return [rows[cursor]] if rows else []
+                if key == KEY_UP:
+                    cursor = max(cursor - 1, 0)
+                elif key == KEY_DOWN:
+                    cursor = min(cursor + 1, max(len(rows) - 1, 0))
+                elif key == KEY_TAB:
+                    if multi and rows:
+                        idx = rows[cursor]
+                        if idx in marked:
+                            del marked[idx]
+                        else:
+                            marked[idx] = None
+                else:
+                    query = query[:-1] if key == KEY_BACKSPACE else query + key
+                    cursor = 0
+                    rows, used_fuzzy = rows_for(query)
+                    waiting = fuzzy.pending(query)
+    except KeyboardInterrupt:
+        return []
+    finally:
+        fuzzy.close()
+
+def prompt_pick(names: List[str], initial: str = "", title: str = "City") -> List[int]:
+    """Line-based fallback for terminals without raw key input."""
+    from rich.prompt import Prompt
+    from .cli import console
+    matcher = IncrementalFilter(names)
+    query = Prompt.ask(f"🔎 {title}", default=initial or None, console=console) or ""
+    rows = matcher.top(query)
+    if not rows and len(query) >= FUZZY_MIN_QUERY:
+        rows = _fuzzy_scores(names, query)
+    if not rows:
+        return []
+    for pos, idx in enumerate(rows, 1):
+        console.print(f"  [bold]{pos}[/bold]. {names[idx]}")
+    choice = Prompt.ask("Choose", choices=[str(i) for i in range(1, len(rows) + 1)], default="1", console=console)
+    return [rows[int(choice) - 1]]
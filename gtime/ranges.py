@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Range conversion for Global Time Utility (gtime)
+Steps through a time range and yields one row of local times per instant through a chain of
+generators, so output starts at once and memory stays flat however long the range is.
+Each zone's offset is reused until its next transition instead of being looked up every step.
+"""
+
+import csv
+import json
+import re
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+from .zones import offset_span
+
+FORMATS = ("csv", "jsonl")
+
+_DURATION_UNITS = {"w": 7 * 86400, "d": 86400, "h": 3600, "m": 60, "s": 1}
+_DURATION_RE = re.compile(r"(\d+)([wdhms])")
+
+def parse_duration(text: str) -> int:
+    """Parse '30m', '1h30m', '2d' or '1w' into seconds; returns 0 when invalid."""
+    text = text.strip().lower()
+    if not text or _DURATION_RE.sub("", text):
+        return 0
+    return sum(int(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_RE.findall(text))
+
+def instants(start: int, end: int, step: int) -> Iterator[int]:
+    """Every step seconds from start up to and including end."""
+    ts = start
+    while ts <= end:
+        yield ts
+        ts += step
+
+def zone_offsets(zones: Sequence[str], stamps: Iterable[int]) -> Iterator[Tuple[int, List[int]]]:
+    """Yield (instant, offsets) for ascending instants, with one offset per zone that is only
+    looked up again once the instant passes the end of that zone's current span.
+    The offsets list is reused between rows; copy it to keep it."""
+    offsets = [0] * len(zones)
+    until = [-1 << 62] * len(zones)
+    for ts in stamps:
+        for i, tz in enumerate(zones):
+            if ts >= until[i]:
+                offsets[i], until[i] = offset_span(tz, ts)
+        yield ts, offsets
+
+def local_hours(zones: Sequence[str], start: int, hours: int) -> List[List[int]]:
+    """Local hour of day in each zone for `hours` hourly instants from start, in one pass."""
+    grid = [[] for _ in zones]
+    for ts, offsets in zone_offsets(zones, instants(start, start + (hours - 1) * 3600, 3600)):
+        for row, offset in zip(grid, offsets):
+            row.append((ts + offset) // 3600 % 24)
+    return grid
+
+@lru_cache(maxsize=None)
+def _iso_suffix(offset: int) -> str:
+    sign = "+" if offset >= 0 else "-"
+    hours, minutes = divmod(abs(offset) // 60, 60)
+    return f"{sign}{hours:02}:{minutes:02}"
+
+@lru_cache(maxsize=4096)
+def _iso_date(day: int) -> str:
+    return time.strftime("%Y-%m-%dT", time.gmtime(day * 86400))
+
+@lru_cache(maxsize=None)
+def _iso_clock(secs: int) -> str:
+    # At most 86400 distinct keys, one per second of the day
+    hours, secs = divmod(secs, 3600)
+    return "%02d:%02d:%02d" % (hours, *divmod(secs, 60))
+
+def _iso(ts: int, offset: int, suffix: str) -> str:
+    day, secs = divmod(ts + offset, 86400)
+    return _iso_date(day) + _iso_clock(secs) + suffix
+
+def format_local(ts: int, offset: int) -> str:
+    """ISO 8601 wall-clock time at UTC instant ts for a zone currently `offset` seconds from UTC."""
+    return _iso(ts, offset, _iso_suffix(offset))
+
+def local_rows(rows: Iterable[Tuple[int, List[int]]]) -> Iterator[List[str]]:
+    """Format (instant, offsets) rows as [utc, local time per zone] ISO 8601 strings."""
+    for ts, offsets in rows:
+        yield [_iso(ts, 0, "Z")] + [format_local(ts, offset) for offset in offsets]
+
+def convert_range(zones: Sequence[str], start: int, end: int, step: int) -> Iterator[List[str]]:
+    return local_rows(zone_offsets(zones, instants(start, end, step)))
+
+def write_rows(out: TextIO, header: List[str], rows: Iterable[List[str]], fmt: str = "csv") -> int:
+    """Stream rows to out as CSV (with a header line) or JSON Lines keyed by header; returns the row count."""
+    count = 0
+    if fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(header, row)), ensure_ascii=False) + "\n")
+            count += 1
+        return count
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
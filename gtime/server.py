@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio HTTP JSON service for Global Time Utility (gtime)
+Exposes city resolution, current time, time conversion and meeting conversion over HTTP
+using only the standard library, backed by the same lookup indexes as the CLI. Answers cached
+for the current minute are sent from the event loop; everything else is computed on one worker
+thread, so a slow batch does not hold up other connections.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+from .core import (
+    get_tzinfo, load_favorites, get_city_by_name, suggest_cities, get_greeting,
+    format_utc_offset, parse_meeting_time, current_time, TIMEZONE_ALIASES
+)
+from .tzindex import lookup_zone
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 1 << 20
+MAX_HEADERS = 100
+MAX_CACHE_ENTRIES = 4096
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+def _city_json(city_info: Tuple[str, str, str, str]) -> Dict[str, str]:
+    city, country, tz, emoji = city_info
+    return {"city": city, "country": country, "tz": tz, "emoji": emoji}
+
+def _time_json(city_info: Tuple[str, str, str, str], dt: datetime.datetime) -> Dict[str, str]:
+    row = _city_json(city_info)
+    row["local_time"] = dt.isoformat()
+    row["offset"] = format_utc_offset(dt.utcoffset())
+    row["phase"] = get_greeting(dt.hour)
+    return row
+
+def _optional(params: Dict[str, Any], name: str) -> Optional[str]:
+    value = params.get(name)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"parameter '{name}' must be a string")
+    return value or None
+
+def _require(params: Dict[str, Any], *names: str) -> str:
+    for name in names:
+        value = _optional(params, name)
+        if value:
+            return value
+    raise ValueError(f"missing parameter '{names[0]}'")
+
+def _lookup(name: str) -> Tuple[str, str, str, str]:
+    city_info = get_city_by_name(name)
+    if not city_info:
+        raise LookupError(f"city not found: {name}")
+    return city_info
+
+def _meeting_instant(time_str: str, source: Optional[str]) -> Tuple[datetime.datetime, Optional[str]]:
+    """Resolve a meeting time typed as in 'gtime meeting at' to an aware instant."""
+    words = ["at"] + time_str.split()
+    source_tz = None
+    if source and (source.upper() in TIMEZONE_ALIASES or lookup_zone(source, components=False)):
+        words.append(source)
+    elif source:
+        source_tz = _lookup(source)[2]
+    meeting_time, timezone_info = parse_meeting_time(words)
+    if meeting_time is None:
+        raise ValueError(f"invalid time: {time_str}")
+    if source_tz:
+        return meeting_time.replace(tzinfo=get_tzinfo(source_tz)), source_tz
+    return meeting_time.astimezone(), timezone_info
+
+def resolve(params: Dict[str, Any]) -> Dict[str, Any]:
+    query = _require(params, "q", "city")
+    city_info = get_city_by_name(query)
+    if city_info:
+        return {"query": query, "match": _city_json(city_info)}
+    return {"query": query, "match": None, "suggestions": suggest_cities(query)}
+
+def city_time(params: Dict[str, Any]) -> Dict[str, Any]:
+    query = _require(params, "city", "q")
+    city_info = _lookup(query)
+    result = {"query": query}
+    now = datetime.datetime.fromtimestamp(current_time(), get_tzinfo(city_info[2])).replace(second=0, microsecond=0)
+    result.update(_time_json(city_info, now))
+    return result
+
+def convert(params: Dict[str, Any]) -> Dict[str, Any]:
+    time_str = _require(params, "time")
+    target = _lookup(_require(params, "to"))
+    instant, source = _meeting_instant(time_str, _optional(params, "from"))
+    result = {"time": time_str, "from": source, "utc": instant.astimezone(datetime.timezone.utc).isoformat()}
+    result.update(_time_json(target, instant.astimezone(get_tzinfo(target[2]))))
+    return result
+
+def meeting(params: Dict[str, Any]) -> Dict[str, Any]:
+    time_str = _require(params, "time")
+    cities = params.get("cities") or load_favorites()
+    if isinstance(cities, str):
+        cities = [c.strip() for c in cities.split(",") if c.strip()]
+    elif not isinstance(cities, list) or not all(isinstance(c, str) for c in cities):
+        raise ValueError("parameter 'cities' must be a comma-separated string or a list of strings")
+    instant, source = _meeting_instant(time_str, _optional(params, "from"))
+    rows, not_found = [], []
+    for name in cities:
+        city_info = get_city_by_name(name)
+        if city_info:
+            rows.append(_time_json(city_info, instant.astimezone(get_tzinfo(city_info[2]))))
+        else:
+            not_found.append(name)
+    return {
+        "time": time_str,
+        "from": source,
+        "utc": instant.astimezone(datetime.timezone.utc).isoformat(),
+        "rows": rows,
+        "not_found": not_found,
+    }
+
+ENDPOINTS: Dict[str, Tuple[Callable[[Dict[str, Any]], Dict[str, Any]], str]] = {
+    "/resolve": (resolve, "q"),
+    "/time": (city_time, "city"),
+    "/convert": (convert, "time"),
+    "/meeting": (meeting, "time"),
+}
+
+_cache: Dict[Tuple, Tuple[int, bytes]] = {}
+_cache_minute = None
+# Queries that miss the cache run here: one thread, as the lookup caches are not shared safely
+# between threads and the work is CPU-bound anyway
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _cache_key(path: str, params: Dict[str, Any]) -> Tuple:
+    return (path, json.dumps(params, sort_keys=True, separators=(",", ":")))
+
+def _call(path: str, params: Dict[str, Any]) -> Tuple[int, bytes]:
+    """Run one endpoint query, reusing the serialized answer for the rest of the minute."""
+    global _cache_minute
+    minute = int(current_time() // 60)
+    if minute != _cache_minute or len(_cache) >= MAX_CACHE_ENTRIES:
+        _cache.clear()
+        _cache_minute = minute
+    key = _cache_key(path, params)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    handler, _ = ENDPOINTS[path]
+    try:
+        status, payload = 200, handler(params)
+    except LookupError as e:
+        status, payload = 404, {"error": str(e)}
+    except ValueError as e:
+        status, payload = 400, {"error": str(e)}
+    except Exception as e:
+        # Never cached: the next identical query gets a fresh attempt
+        return _error(500, f"internal error: {type(e).__name__}")
+    result = (status, json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    _cache[key] = result
+    return result
+
+def _cached(method: str, target: str) -> Optional[Tuple[int, bytes]]:
+    """The answer to a GET query already cached for this minute, or None."""
+    if method != "GET" or int(current_time() // 60) != _cache_minute:
+        return None
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"
+    if path not in ENDPOINTS:
+        return None
+    return _cache.get(_cache_key(path, dict(parse_qsl(url.query))))
+
+def _error(status: int, message: str) -> Tuple[int, bytes]:
+    return status, json.dumps({"error": message}).encode("utf-8")
+
+def handle_request(method: str, target: str, body: bytes = b"") -> Tuple[int, bytes]:
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"
+    if path not in ENDPOINTS:
+        return _error(404, f"unknown endpoint: {path}")
+    params: Dict[str, Any] = dict(parse_qsl(url.query))
+    if method == "GET":
+        return _call(path, params)
+    if method != "POST":
+        return _error(405, f"method not allowed: {method}")
+    try:
+        data = json.loads(body.decode("utf-8") or "null")
+    except ValueError:
+        return _error(400, "request body is not valid JSON")
+    if isinstance(data, dict):
+        params.update(data)
+        return _call(path, params)
+    if not isinstance(data, list):
+        return _error(400, "request body must be a JSON object or array")
+    # Batch: every element is answered (and cached) exactly like a single query.
+    _, primary = ENDPOINTS[path]
+    parts = []
+    for item in data:
+        item_params = dict(params)
+        if isinstance(item, dict):
+            item_params.update(item)
+        else:
+            item_params[primary] = item
+        parts.append(_call(path, item_params)[1])
+    return 200, b"[" + b",".join(parts) + b"]"
+
+def _http_response(status: int, payload: bytes, keep_alive: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + payload
+
+async def _read_headers(reader: asyncio.StreamReader) -> Optional[Dict[str, str]]:
+    """Header fields up to the blank line; None when there are too many or one is too long."""
+    headers = {}
+    for _ in range(MAX_HEADERS + 1):
+        try:
+            line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            return None
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return None
+
+async def _respond(method: str, target: str, body: bytes) -> Tuple[int, bytes]:
+    global _executor
+    cached = _cached(method, target)
+    if cached is not None:
+        return cached
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gtime-server")
+    return await asyncio.get_running_loop().run_in_executor(_executor, handle_request, method, target, body)
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                request_line = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                writer.write(_http_response(*_error(400, "request line too long"), keep_alive=False))
+                break
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_http_response(*_error(400, "malformed request line"), keep_alive=False))
+                break
+            headers = await _read_headers(reader)
+            if headers is None:
+                writer.write(_http_response(*_error(431, "request header fields too large"), keep_alive=False))
+                break
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+            length_text = headers.get("content-length") or "0"
+            if not length_text.isdigit():
+                writer.write(_http_response(*_error(400, "invalid Content-Length"), keep_alive=False))
+                break
+            length = int(length_text)
+            if length > MAX_BODY_BYTES:
+                writer.write(_http_response(*_error(413, "request body too large"), keep_alive=False))
+                break
+            body = await reader.readexactly(length) if length else b""
+            try:
+                status, payload = await _respond(method.upper(), target, body)
+            except Exception as e:
+                status, payload = _error(500, f"internal error: {type(e).__name__}")
+            writer.write(_http_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def run_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                     started: Optional[Callable[[List[Tuple]], None]] = None) -> None:
+    server = await asyncio.start_server(_handle_connection, host, port)
+    if started:
+        started([sock.getsockname() for sock in server.sockets])
+    async with server:
+        await server.serve_forever()
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          started: Optional[Callable[[List[Tuple]], None]] = None) -> None:
+    asyncio.run(run_server(host, port, started))
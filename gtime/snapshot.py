@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent index snapshot for Global Time Utility (gtime)
+Saves the derived lookup structures (city name indexes, fuzzy candidates, per-zone offset tables)
+to ~/.cache/gtime in marshal format, so a warm start loads them instead of rebuilding.
+The snapshot is keyed by a hash of the city data, the tz database, the gtime version and the
+marshal format.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from . import __version__
+from .core import CACHE_DIR, build_city_index
+from .data import CITY_DB
+
+SNAPSHOT_FILE = CACHE_DIR / "index.snapshot"
+STATS_FILE = CACHE_DIR / "index-stats.json"
+# One byte per snapshot hit or miss, appended; no read-modify-write on the lookup path
+STATS_LOG = CACHE_DIR / "index-stats.log"
+LOG_EVENTS = {"hits": b"h", "misses": b"m"}
+SNAPSHOT_MAGIC = b"gtime-snapshot-1"
+DATA_FILE = Path(__file__).with_name("data.py")
+
+_loaded = False
+
+def snapshot_key() -> str:
+    # The offset tables come from the installed tz database: an update invalidates them
+    from .tzindex import _source_signature
+    digest = hashlib.sha1()
+    try:
+        digest.update(DATA_FILE.read_bytes())
+    except OSError:
+        digest.update(repr(CITY_DB).encode("utf-8"))
+    digest.update(f"{__version__}/{marshal.version}/{_source_signature()}".encode("utf-8"))
+    return digest.hexdigest()
+
+def _read_stats() -> Dict[str, int]:
+    try:
+        with open(STATS_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _count(event: str) -> None:
+    stats = _read_stats()
+    stats[event] = stats.get(event, 0) + 1
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STATS_FILE, "w") as f:
+            json.dump(stats, f)
+    except Exception:
+        pass
+
+def _log(event: str) -> None:
+    # Pool workers (gtime localize) load the index too; only the command's own process counts
+    multiprocessing = sys.modules.get("multiprocessing")
+    if multiprocessing is not None and multiprocessing.parent_process() is not None:
+        return
+    try:
+        fd = os.open(STATS_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, LOG_EVENTS[event])
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+def _logged() -> Dict[str, int]:
+    try:
+        data = STATS_LOG.read_bytes()
+    except OSError:
+        data = b""
+    return {event: data.count(code) for event, code in LOG_EVENTS.items()}
+
+def build(years: Optional[range] = None, path: Path = SNAPSHOT_FILE) -> Dict[str, int]:
+    """Build every index, plus offset tables for each zone in CITY_DB over `years`
+    (default: this year and next), and write the snapshot. Returns what was stored."""
+    from .zones import year_table
+    if years is None:
+        this_year = time.gmtime().tm_year
+        years = range(this_year, this_year + 2)
+    zones = sorted(set(tz for _, _, tz, _ in CITY_DB))
+    tables = {(tz, year): year_table(tz, year) for tz in zones for year in years}
+    payload = marshal.dumps({"created": int(time.time()), "city_index": build_city_index(), "zone_tables": tables})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(b"%s %s\n" % (SNAPSHOT_MAGIC, snapshot_key().encode("ascii")))
+        f.write(payload)
+    os.replace(tmp, path)
+    _count("builds")
+    return {"cities": len(CITY_DB), "zones": len(zones), "zone_tables": len(tables), "bytes": path.stat().st_size}
+
+def load(path: Path = SNAPSHOT_FILE) -> Optional[dict]:
+    """Read the snapshot if it matches the current data and version, else None."""
+    try:
+        with open(path, "rb") as f:
+            header = f.readline().split()
+            if header != [SNAPSHOT_MAGIC, snapshot_key().encode("ascii")]:
+                return None
+            return marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+def load_city_index() -> Optional[dict]:
+    """The city index from the snapshot, preloading its zone tables. Only the first call in a
+    process consults the snapshot; it logs a hit, or a miss when the snapshot is stale."""
+    global _loaded
+    if _loaded or not SNAPSHOT_FILE.exists():
+        return None
+    _loaded = True
+    snapshot = load(SNAPSHOT_FILE)
+    if snapshot is None or len(snapshot["city_index"]["names"]) != len(CITY_DB):
+        _log("misses")
+        return None
+    from .zones import YEAR_TABLES
+    for key, table in snapshot["zone_tables"].items():
+        YEAR_TABLES.setdefault(key, table)
+    _log("hits")
+    return snapshot["city_index"]
+
+def stats(path: Path = SNAPSHOT_FILE) -> Dict[str, object]:
+    counters = _read_stats()
+    logged = _logged()
+    hits, misses = logged["hits"], logged["misses"]
+    info: Dict[str, object] = {
+        "path": str(path), "exists": path.exists(), "valid": False,
+        "hits": hits, "misses": misses, "builds": counters.get("builds", 0),
+        "hit_rate": hits / (hits + misses) if hits + misses else None,
+    }
+    if info["exists"]:
+        info["bytes"] = path.stat().st_size
+        snapshot = load(path)
+        if snapshot is not None:
+            info["valid"] = True
+            info["age_seconds"] = int(time.time()) - snapshot["created"]
+            info["cities"] = len(snapshot["city_index"]["names"])
+            info["zone_tables"] = len(snapshot["zone_tables"])
+    return info
+
+def clear(path: Path = SNAPSHOT_FILE) -> bool:
+    """Delete the snapshot and its counters; returns whether a snapshot existed."""
+    existed = path.exists()
+    for target in (path, STATS_FILE, STATS_LOG):
+        try:
+            target.unlink()
+        except OSError:
+            pass
+    return existed
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Team rosters for Global Time Utility (gtime)
+A roster maps people to cities. Cities are resolved once, when the roster is loaded, and stored
+with their zone; rendering groups members by zone so each distinct zone is converted once.
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core import get_city_by_name
+from .zones import offset_at
+
+TEAM_FILE = Path.home() / ".gtime_teams.json"
+PERSON_FIELDS = ("name", "person", "member")
+CITY_FIELD = "city"
+TEAM_FIELD = "team"
+# Local hours [start, end) on weekdays that count as working hours
+WORK_HOURS = (9, 17)
+
+def load_teams() -> Dict[str, List[List[str]]]:
+    """team -> [[person, city, country, tz, emoji], ...]"""
+    if TEAM_FILE.exists():
+        try:
+            with open(TEAM_FILE, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def save_teams(teams: Dict[str, List[List[str]]]) -> None:
+    with open(TEAM_FILE, "w") as f:
+        json.dump(teams, f)
+
+def read_roster(path: str, default_team: str) -> Tuple[Dict[str, List[List[str]]], List[str]]:
+    """Parse a roster CSV (person and city columns, optionally a team column; a header row is
+    optional) into resolved members per team. Each distinct city is looked up once.
+    Returns the teams and the city names that could not be resolved."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and any(cell.strip() for cell in row)]
+    person_col, city_col, team_col = 0, 1, None
+    if rows:
+        fields = [cell.strip().lower() for cell in rows[0]]
+        if CITY_FIELD in fields:
+            rows = rows[1:]
+            city_col = fields.index(CITY_FIELD)
+            person_col = next((fields.index(name) for name in PERSON_FIELDS if name in fields), 0)
+            team_col = fields.index(TEAM_FIELD) if TEAM_FIELD in fields else None
+    resolved: Dict[str, Optional[Tuple[str, str, str, str]]] = {}
+    teams: Dict[str, List[List[str]]] = {}
+    for row in rows:
+        if len(row) <= max(person_col, city_col):
+            continue
+        person, city = row[person_col].strip(), row[city_col].strip()
+        if city not in resolved:
+            resolved[city] = get_city_by_name(city) if city else None
+        city_info = resolved[city]
+        if city_info:
+            team = (row[team_col].strip() if team_col is not None and len(row) > team_col else "") or default_team
+            teams.setdefault(team, []).append([person, *city_info])
+    missing = sorted(city for city, city_info in resolved.items() if city_info is None and city)
+    return teams, missing
+
+def zone_groups(members: List[List[str]], ts: int) -> List[Tuple[str, int, List[List[str]]]]:
+    """(tz, UTC offset, members) per distinct zone, one offset lookup per zone, in first-seen order."""
+    groups: Dict[str, List[List[str]]] = {}
+    for member in members:
+        groups.setdefault(member[3], []).append(member)
+    return [(tz, offset_at(tz, ts), group) for tz, group in groups.items()]
+
+def is_working(ts: int, offset: int) -> bool:
+    local = ts + offset
+    weekday = (local // 86400 + 3) % 7  # 1970-01-01 was a Thursday; Monday is 0
+    return weekday < 5 and WORK_HOURS[0] <= local // 3600 % 24 < WORK_HOURS[1]
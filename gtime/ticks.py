@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NDJSON clock stream for Global Time Utility (gtime)
+Writes one compact JSON object per city and tick for status bars and other processes, without
+rich. Each city's constant fields are serialized once into a template; a tick only fills in the
+zone's local time, offset and phase, which are shared by every city in the zone, and a zone's
+offset is looked up again only once the tick passes the end of its current span. Ticks are
+scheduled on multiples of the interval, so the stream does not drift however long it runs.
+"""
+
+import json
+import time
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from .core import current_time, get_greeting
+from .ranges import format_local
+from .zones import offset_span
+
+# Phase names as used by the timeline legend: morning, afternoon, evening, night
+PHASES = tuple(json.dumps(get_greeting(hour)[5:]) for hour in range(24))
+
+def city_template(city_info: Tuple[str, str, str, str]) -> str:
+    """The record up to its first variable field, e.g. '{"city":"London","country":"UK","zone":"Europe/London",'."""
+    city, country, tz, _ = city_info
+    fixed = json.dumps({"city": city, "country": country, "zone": tz}, ensure_ascii=False, separators=(",", ":"))
+    return fixed[:-1] + ","
+
+def tick_records(found: List[Tuple[str, str, str, str]], changes: bool = False):
+    """A function of the instant returning the NDJSON lines for that tick: every city, or with
+    changes=True only the cities whose local minute or offset moved since the last tick."""
+    templates = [(city_template(city_info), city_info[2]) for city_info in found]
+    spans: Dict[str, Tuple[int, int]] = {tz: (0, -1 << 62) for _, tz in templates}
+    last: Dict[str, Tuple[int, int]] = {}
+
+    def records(ts: int) -> str:
+        fields: Dict[str, str] = {}
+        for tz, (offset, until) in spans.items():
+            if ts >= until:
+                offset, until = spans[tz] = offset_span(tz, ts)
+            key = ((ts + offset) // 60, offset)
+            if changes and last.get(tz) == key:
+                continue
+            last[tz] = key
+            fields[tz] = (f'"local":"{format_local(ts, offset)}","offset":{offset},'
+                          f'"phase":{PHASES[(ts + offset) // 3600 % 24]},"ts":{ts}}}\n')
+        return "".join(template + fields[tz] for template, tz in templates if tz in fields)
+
+    return records
+
+def stream(found: List[Tuple[str, str, str, str]], out: TextIO, every: int = 60, changes: bool = False,
+           count: Optional[int] = None, clock: Callable[[], float] = current_time,
+           sleep: Callable[[float], None] = time.sleep) -> int:
+    """Write a tick now and then on every multiple of `every` seconds, `count` ticks or until
+    interrupted; returns the number of ticks written. A pinned clock (GTIME_NOW) still sleeps
+    between ticks and reports the scheduled instants."""
+    records = tick_records(found, changes)
+    ticks = 0
+    ts = int(clock())
+    while count is None or ticks < count:
+        out.write(records(ts))
+        out.flush()
+        ticks += 1
+        if count is not None and ticks >= count:
+            break
+        ts = (ts // every + 1) * every
+        delay = ts - clock()
+        if delay > 0:
+            sleep(delay)
+        # After a suspend the clock may be well past the scheduled tick: report the real instant
+        ts = max(ts, int(clock()))
+    return ticks
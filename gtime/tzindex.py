@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+IANA zone and abbreviation index for Global Time Utility (gtime)
+Maps zone names ('Asia/Kathmandu'), their last path component ('kathmandu') and the
+abbreviations zones use this year ('NZST') to zones, so such queries resolve with one dict
+lookup. Built once from the system tz database and cached on disk; UTC offsets such as
+'UTC+5:45' are parsed directly.
+"""
+
+import datetime
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+from .core import CACHE_DIR, TIMEZONE_ALIASES, ZoneInfo
+from .data import CITY_DB
+
+INDEX_FILE = CACHE_DIR / "zones.json"
+REGIONS = ("Africa", "America", "Antarctica", "Asia", "Atlantic", "Australia", "Europe", "Indian", "Pacific")
+MAX_OFFSET_HOURS = 14
+# Words that read like abbreviations but are part of times typed after them
+NOT_ABBREVIATIONS = {"AM", "PM"}
+# Bumped when the index layout or contents change, so cached copies are rebuilt
+INDEX_VERSION = 2
+
+_OFFSET_RE = re.compile(r"^(?:utc|gmt)?\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$", re.IGNORECASE)
+_index: Optional[Dict[str, Dict[str, str]]] = None
+
+def parse_offset(query: str) -> Optional[str]:
+    """Canonical fixed-offset zone name ('UTC+05:45') for 'UTC+5:45', 'GMT-3' or '+0530'."""
+    match = _OFFSET_RE.match(query.strip())
+    if not match:
+        return None
+    sign, hours, minutes = match.group(1), int(match.group(2)), int(match.group(3) or 0)
+    if hours > MAX_OFFSET_HOURS or minutes >= 60:
+        return None
+    return f"UTC{sign}{hours:02}:{minutes:02}"
+
+def _available_zones():
+    try:
+        from zoneinfo import available_timezones
+        return available_timezones()
+    except ImportError:
+        import pytz
+        return set(pytz.all_timezones)
+
+def _source_signature() -> str:
+    """Changes when the tz database or the year changes (abbreviations are this year's)."""
+    parts = [str(INDEX_VERSION), sys.version.split()[0], str(time.gmtime().tm_year)]
+    try:
+        from zoneinfo import TZPATH
+        for path in TZPATH:
+            try:
+                parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+            except OSError:
+                pass
+    except ImportError:
+        import pytz
+        parts.append(pytz.OLSON_VERSION)
+    try:
+        import tzdata
+        parts.append(tzdata.IANA_VERSION)
+    except ImportError:
+        pass
+    return "|".join(parts)
+
+def _preference(tz: str, city_zones: Dict[str, int]) -> Tuple:
+    # Zones with known cities first, then canonical Region/City names, then alphabetical
+    return (-city_zones.get(tz, 0), tz.split("/")[0] not in REGIONS, tz)
+
+def build_index() -> Dict[str, Dict[str, str]]:
+    city_zones: Dict[str, int] = {}
+    for _, _, tz, _ in CITY_DB:
+        city_zones[tz] = city_zones.get(tz, 0) + 1
+    year = time.gmtime().tm_year
+    names, components, abbreviations = {}, {}, {}
+    # Legacy zones without a region ('EST', 'MST', 'Japan') would shadow the abbreviations and city
+    # names people mean by them; 'UTC' is kept
+    zones = [tz for tz in _available_zones() if "/" in tz or tz == "UTC"]
+    for tz in sorted(zones, key=lambda tz: _preference(tz, city_zones)):
+        names[tz.lower()] = tz
+        components.setdefault(tz.rsplit("/", 1)[-1].lower(), tz)
+        try:
+            zone = ZoneInfo(tz)
+        except Exception:
+            continue
+        for month in (1, 7):
+            abbr = datetime.datetime(year, month, 15, 12, tzinfo=zone).tzname() or ""
+            if abbr.isalpha() and abbr.upper() not in NOT_ABBREVIATIONS:
+                abbreviations.setdefault(abbr.upper(), tz)
+    return {"names": names, "components": components, "abbreviations": abbreviations}
+
+def load_index() -> Dict[str, Dict[str, str]]:
+    global _index
+    if _index is None:
+        signature = _source_signature()
+        try:
+            with open(INDEX_FILE, "r") as f:
+                cached = json.load(f)
+            if cached.get("signature") == signature:
+                _index = cached["index"]
+        except Exception:
+            pass
+        if _index is None:
+            _index = build_index()
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                with open(INDEX_FILE, "w") as f:
+                    json.dump({"signature": signature, "index": _index}, f)
+            except Exception:
+                pass
+    return _index
+
+def lookup_zone(query: str, components: bool = True, abbreviations: bool = True) -> Optional[Tuple[str, str]]:
+    """(zone, kind) for a zone name, path component, abbreviation or UTC offset; kind is one of
+    'zone', 'abbreviation' or 'offset'. None when the query is none of these."""
+    query = query.strip()
+    if not query:
+        return None
+    offset_zone = parse_offset(query)
+    if offset_zone:
+        return offset_zone, "offset"
+    if abbreviations and query.upper() in TIMEZONE_ALIASES:
+        # The aliases gtime has always used for meetings, in any case ('est' is New York too)
+        return TIMEZONE_ALIASES[query.upper()][0], "abbreviation"
+    index = load_index()
+    key = query.lower().replace(" ", "_")
+    tz = index["names"].get(key) or (components and index["components"].get(key))
+    if tz:
+        return tz, "zone"
+    tz = abbreviations and index["abbreviations"].get(query.upper())
+    if tz:
+        return tz, "abbreviation"
+    return None
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-zone UTC offset tables for Global Time Utility (gtime)
+Each (zone, year) table is built once, lazily, and then searched with bisect, so
+finding an offset or the next transition costs a binary search instead of a tz computation.
+"""
+
+import bisect
+import calendar
+import datetime
+import hashlib
+import heapq
+import json
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .core import get_tzinfo, CACHE_DIR
+
+# Offsets are sampled once per probe step and refined by bisection to the exact second.
+# No real-world offset lasts less than a week, so a change cannot hide between two probes.
+PROBE_STEP = 7 * 86400
+
+TRANSITIONS_CACHE = CACHE_DIR / "transitions.json"
+TRANSITIONS_CACHE_SLACK_DAYS = 30
+TRANSITIONS_CACHE_ENTRIES = 16
+
+@lru_cache(maxsize=None)
+def get_zone(tz: str):
+    return get_tzinfo(tz)
+
+def _probe(zone, ts: int) -> int:
+    return int(datetime.datetime.fromtimestamp(ts, zone).utcoffset().total_seconds())
+
+def year_start(year: int) -> int:
+    return calendar.timegm((year, 1, 1, 0, 0, 0))
+
+# (zone, year) -> table; filled lazily and preloaded from the index snapshot
+YEAR_TABLES: Dict[Tuple[str, int], Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+
+def year_table(tz: str, year: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Return (starts, offsets): offsets[i] seconds apply from starts[i] until starts[i + 1]."""
+    table = YEAR_TABLES.get((tz, year))
+    if table is None:
+        table = YEAR_TABLES[(tz, year)] = build_year_table(tz, year)
+    return table
+
+def build_year_table(tz: str, year: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    zone = get_zone(tz)
+    start, end = year_start(year), year_start(year + 1)
+    starts, offsets = [start], [_probe(zone, start)]
+    lo = start
+    while lo < end - 1:
+        hi = min(lo + PROBE_STEP, end - 1)
+        offset = _probe(zone, hi)
+        if offset != offsets[-1]:
+            a, b = lo, hi
+            while b - a > 1:
+                mid = (a + b) // 2
+                if _probe(zone, mid) == offsets[-1]:
+                    a = mid
+                else:
+                    b = mid
+            starts.append(b)
+            offsets.append(offset if b == hi else _probe(zone, b))
+        lo = hi
+    return tuple(starts), tuple(offsets)
+
+def _year_of(ts: int) -> int:
+    return time.gmtime(ts).tm_year
+
+def offset_at(tz: str, ts: int) -> int:
+    starts, offsets = year_table(tz, _year_of(ts))
+    return offsets[bisect.bisect_right(starts, ts) - 1]
+
+def offset_span(tz: str, ts: int) -> Tuple[int, int]:
+    """Return the offset in effect at ts and the instant until which it is guaranteed to hold."""
+    year = _year_of(ts)
+    starts, offsets = year_table(tz, year)
+    idx = bisect.bisect_right(starts, ts)
+    until = starts[idx] if idx < len(starts) else year_start(year + 1)
+    return offsets[idx - 1], until
+
+@lru_cache(maxsize=None)
+def fixed_zone(offset: int) -> datetime.timezone:
+    return datetime.timezone(datetime.timedelta(seconds=offset))
+
+def localize(tz: str, ts: float) -> datetime.datetime:
+    """The wall clock in tz at instant ts, as an aware datetime with a fixed-offset tzinfo."""
+    return datetime.datetime.fromtimestamp(ts, fixed_zone(offset_at(tz, int(ts // 1))))
+
+def transitions(tz: str, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield (instant, offset_before, offset_after) for every offset change in [start, end)."""
+    previous = None
+    for year in range(_year_of(start), _year_of(end) + 1):
+        starts, offsets = year_table(tz, year)
+        if previous is not None and previous != offsets[0] and start <= starts[0] < end:
+            yield starts[0], previous, offsets[0]
+        for i in range(1, len(starts)):
+            if start <= starts[i] < end:
+                yield starts[i], offsets[i - 1], offsets[i]
+        previous = offsets[-1]
+
+def wall_to_instant(tz: str, wall: int) -> int:
+    """UTC instant at which tz's clock reads `wall` (wall-clock seconds counted as if they were UTC).
+    A wall time skipped by a forward change resolves to just after the change."""
+    ts = wall - offset_at(tz, wall)
+    offset = offset_at(tz, ts)
+    return ts if ts + offset == wall else wall - offset
+
+def wall_instants(tz: str, wall: int) -> List[int]:
+    """Every UTC instant at which tz's clock reads `wall`, in order: none in a gap skipped by a
+    forward change, two in an hour repeated by a backward change. Only the offsets in effect within
+    a day either side can place an instant at `wall`, so each is checked once."""
+    day = 86400
+    offsets = {offset_at(tz, wall - day)} | {after for _, _, after in transitions(tz, wall - day, wall + day)}
+    return sorted(wall - offset for offset in offsets if offset_at(tz, wall - offset) == offset)
+
+NEXT_GAP, NEXT_REPEAT = "gap", "repeat"
+
+def next_wall_time(tz: str, seconds: int, now: int) -> Tuple[int, str]:
+    """The first instant at or after now when tz's clock reads `seconds` past midnight, and a note:
+    NEXT_GAP when a forward change at or after now skipped that time on an earlier day, so the answer
+    stands in for the skipped reading; NEXT_REPEAT when the clock reads it twice on the day found
+    (the later reading is returned only once the first has passed)."""
+    day = (now + offset_at(tz, now)) // 86400
+    note = ""
+    # A skipped time moves the answer a day at most; Samoa skipped a whole calendar day once
+    for day in range(day, day + 3):
+        wall = day * 86400 + seconds
+        stamps = wall_instants(tz, wall)
+        # A gap already behind now (earlier today) does not make the answer a substitute
+        if not stamps and any(ts >= now and ts + before <= wall < ts + after
+                              for ts, before, after in transitions(tz, wall - 86400, wall + 86400)):
+            note = NEXT_GAP
+        upcoming = [ts for ts in stamps if ts >= now]
+        if upcoming:
+            return upcoming[0], note or (NEXT_REPEAT if len(stamps) > 1 else "")
+    raise ValueError(f"{tz} never reads that time in the next three days")
+
+def next_wall_times(zones: Iterable[str], seconds: int, now: int) -> Dict[str, Tuple[int, str]]:
+    """next_wall_time for each distinct zone."""
+    return {tz: next_wall_time(tz, seconds, now) for tz in set(zones)}
+
+WEEK = 7 * 86400
+
+def weekly_drift(source: str, wall: int, weeks: int, zones: Sequence[str]) -> List[Tuple[int, int, Dict[str, int]]]:
+    """A meeting at `wall` in source, repeated weekly: for each week (0-based) where some zone's
+    local time differs from week 0, return (week, instant, {zone: shift in seconds versus week 0}).
+    Offsets only change at transitions, so the zones' transition lists are merged into one stream
+    and a week is re-evaluated only when an event has happened since the previous week."""
+    zones = list(dict.fromkeys(zones))
+    stamps = [wall_to_instant(source, wall + k * WEEK) for k in range(weeks)]
+    tracked = zones + ([source] if source not in zones else [])
+    offsets = {tz: offset_at(tz, stamps[0]) for tz in tracked}
+    base = {tz: offsets[tz] - offsets[source] for tz in zones}
+    events = heapq.merge(*[[(ts, tz, after) for ts, _, after in transitions(tz, stamps[0] + 1, stamps[-1] + 1)]
+                           for tz in tracked])
+    pending = next(events, None)
+    drift: Dict[str, int] = {}
+    rows = []
+    for week, ts in enumerate(stamps):
+        changed = False
+        while pending is not None and pending[0] <= ts:
+            offsets[pending[1]] = pending[2]
+            pending = next(events, None)
+            changed = True
+        if changed:
+            relative = offsets[source]
+            drift = {tz: offsets[tz] - relative - base[tz] for tz in zones if offsets[tz] - relative != base[tz]}
+        if drift:
+            rows.append((week, ts, drift))
+    return rows
+
+def upcoming_transitions(zones: Iterable[str], now: int, days: int) -> List[Tuple[int, str, int, int]]:
+    """Return sorted (instant, zone, offset_before, offset_after) changes within the next `days`."""
+    end = now + days * 86400
+    rows = []
+    for tz in set(zones):
+        rows.extend((ts, tz, before, after) for ts, before, after in transitions(tz, now, end))
+    rows.sort()
+    return rows
+
+def _transitions_key(zones: Iterable[str]) -> str:
+    return hashlib.sha1(",".join(sorted(set(zones))).encode("utf-8")).hexdigest()
+
+def cached_upcoming_transitions(zones: List[str], now: int, days: int) -> List[Tuple[int, str, int, int]]:
+    """Like upcoming_transitions, but served from disk until the first listed transition passes."""
+    key = _transitions_key(zones)
+    end = now + days * 86400
+    try:
+        with open(TRANSITIONS_CACHE, "r") as f:
+            entries = json.load(f)
+    except Exception:
+        entries = {}
+    entry = entries.get(key)
+    if entry and end <= entry["horizon"] and (not entry["rows"] or now < entry["rows"][0][0]):
+        return [tuple(row) for row in entry["rows"] if row[0] < end]
+
+    horizon_days = days + TRANSITIONS_CACHE_SLACK_DAYS
+    rows = upcoming_transitions(zones, now, horizon_days)
+    entries.pop(key, None)
+    entries[key] = {"horizon": now + horizon_days * 86400, "rows": rows}
+    while len(entries) > TRANSITIONS_CACHE_ENTRIES:
+        entries.pop(next(iter(entries)))
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(TRANSITIONS_CACHE, "w") as f:
+            json.dump(entries, f)
+    except Exception:
+        pass
+    return [row for row in rows if row[0] < end]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Latency benchmark for the shell completion backend with a 100k-city prefix index
+"""
+
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from gtime.complete import build_index, complete
+from gtime.data import CITY_DB
+
+def bench_complete(count=100_000, queries=2000):
+    rng = random.Random(42)
+    syllables = ["ka", "lo", "mi", "san", "ber", "to", "ri", "no", "va", "del", "port", "new"]
+    cities = [city for city, _, _, _ in CITY_DB]
+    while len(cities) < count:
+        word = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        cities.append(word.title() + (f" {rng.choice(syllables).title()}" if rng.random() < 0.3 else ""))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "complete.idx"
+        start = time.perf_counter()
+        build_index(cities, path, signature="bench")
+        print(f"Built index for {len(cities):,} cities in {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"({path.stat().st_size / 1024:.0f} KiB)")
+
+        prefixes = [c[:rng.randint(1, 4)] for c in rng.sample(cities, queries)]
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            complete(prefix, path=path, signature="bench")
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"complete() over {queries} prefixes: p50 {timings[len(timings) // 2] * 1000:.3f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms, max {timings[-1] * 1000:.3f} ms")
+
+    def wall(cmd, runs=10):
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(cmd, capture_output=True)
+            samples.append(time.perf_counter() - start)
+        return sorted(samples)[runs // 2] * 1000
+
+    baseline = wall([sys.executable, "-c", "pass"])
+    print(f"Process wall time: interpreter alone {baseline:.1f} ms, "
+          f"'gtime --complete par' {wall(['gtime', '--complete', 'par']):.1f} ms")
+
+if __name__ == "__main__":
+    bench_complete(*[int(a) for a in sys.argv[1:3]])
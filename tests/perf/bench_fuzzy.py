@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Throughput benchmark for batched fuzzy scoring (gtime.core.best_matches): dirty queries against a
+synthetic candidate list, per backend. The pure-Python backend is timed on a sample of the queries
+and extrapolated; every backend's top-1 results are checked against it on that sample.
+Usage: bench_fuzzy.py [queries] [candidates] [sample]   (defaults: 10000 10000 200)
+"""
+
+import random
+import sys
+import time
+
+from gtime.core import SCORER_BACKENDS, best_matches
+from gtime.data import CITY_DB
+
+def candidates(count, rng):
+    cities = [city for city, _, _, _ in CITY_DB]
+    names = [f"{city} ({country})" for city, country, _, _ in CITY_DB]
+    while len(names) < count:
+        names.append(f"{rng.choice(cities)} {rng.choice(('North', 'South', 'East', 'West', 'Old', 'New', 'Port', 'Upper'))} {len(names)}")
+    return names[:count]
+
+def dirty(name, rng):
+    chars = list(name.lower())
+    for _ in range(rng.randint(1, 3)):
+        pos = rng.randrange(len(chars))
+        edit = rng.random()
+        if edit < 0.4:
+            chars[pos] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif edit < 0.7:
+            del chars[pos]
+        else:
+            chars.insert(pos, rng.choice("aeiou "))
+    return "".join(chars)
+
+def available(backend):
+    from gtime.core import scorer_backend
+    try:
+        scorer_backend(backend)
+        return True
+    except ImportError:
+        return False
+
+def bench_fuzzy(query_count=10000, candidate_count=10000, sample=200):
+    rng = random.Random(7)
+    choices = candidates(candidate_count, rng)
+    queries = [dirty(rng.choice(choices), rng) for _ in range(query_count)]
+    sample = min(sample, query_count)
+    print(f"{query_count} queries x {candidate_count} candidates, top-1 checked on {sample} queries")
+
+    start = time.perf_counter()
+    reference = [row[0][0] for row in best_matches(queries[:sample], choices, backend="python")]
+    python_rate = sample * candidate_count / (time.perf_counter() - start)
+    print(f"{'python':>10}: {python_rate / 1e6:8.2f}M pairs/s (extrapolated {query_count * candidate_count / python_rate:7.1f}s)")
+
+    for backend in SCORER_BACKENDS:
+        if backend == "python":
+            continue
+        if not available(backend):
+            print(f"{backend:>10}: not installed")
+            continue
+        start = time.perf_counter()
+        top = [row[0][0] for row in best_matches(queries, choices, backend=backend)]
+        elapsed = time.perf_counter() - start
+        agree = sum(a == b for a, b in zip(top, reference))
+        rate = query_count * candidate_count / elapsed
+        print(f"{backend:>10}: {rate / 1e6:8.2f}M pairs/s ({elapsed:7.1f}s), {rate / python_rate:5.1f}x, "
+              f"top-1 agrees on {agree}/{sample}")
+
+if __name__ == "__main__":
+    bench_fuzzy(*[int(a) for a in sys.argv[1:4]])
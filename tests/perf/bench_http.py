@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local load benchmark for the gtime HTTP JSON service: reports requests per second and p99 latency
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+from gtime.server import run_server
+
+QUERIES = [
+    "/resolve?q=London",
+    "/resolve?q=toky",
+    "/time?city=Paris",
+    "/convert?time=15:30&from=EST&to=Tokyo",
+    "/meeting?time=10:00+AM&from=UTC&cities=London,Tokyo,Sydney",
+]
+
+def start_server():
+    ready = threading.Event()
+    address = []
+
+    def started(addresses):
+        address.extend(addresses[0][:2])
+        ready.set()
+
+    thread = threading.Thread(target=lambda: asyncio.run(run_server("127.0.0.1", 0, started)), daemon=True)
+    thread.start()
+    ready.wait()
+    return address[0], address[1]
+
+async def client(host, port, count, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(count):
+        target = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+async def load(host, port, clients, per_client):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_client, latencies) for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+def bench_http(clients=32, per_client=500):
+    host, port = start_server()
+    # Warm the lookup caches and the per-minute response cache once
+    asyncio.run(load(host, port, 1, len(QUERIES)))
+    elapsed, latencies = asyncio.run(load(host, port, clients, per_client))
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{len(latencies)} requests over {clients} keep-alive connections in {elapsed:.2f} s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"Latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    bench_http(*args)
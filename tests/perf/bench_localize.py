@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Throughput benchmark for 'gtime localize': rows per second, and per core, on a generated CSV log
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from gtime.data import CITY_DB
+from gtime.localize import localize
+
+def bench_localize(count=1_000_000, max_workers=None):
+    rng = random.Random(42)
+    cities = [city for city, _, _, _ in CITY_DB[:200]]
+    start = 1_700_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "log.csv")
+        with open(path, "w") as f:
+            f.write("utc_timestamp,city,status\n")
+            for i in range(count):
+                ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + i * 31))
+                f.write(f"{ts},{rng.choice(cities)},{rng.choice(('ok', 'error'))}\n")
+        size = os.path.getsize(path) / (1 << 20)
+        print(f"Input: {count:,} rows, {size:.0f} MiB")
+
+        cpus = max_workers or os.cpu_count() or 1
+        for workers in sorted({1, cpus}):
+            with open(os.devnull, "wb") as out:
+                began = time.perf_counter()
+                rows, failed = localize(path, out, "csv", workers)
+                elapsed = time.perf_counter() - began
+            print(f"workers={workers}: {rows / elapsed:,.0f} rows/s, {rows / elapsed / workers:,.0f} rows/s per core "
+                  f"({elapsed:.2f} s, {failed} failed)")
+
+if __name__ == "__main__":
+    bench_localize(*[int(a) for a in sys.argv[1:3]])
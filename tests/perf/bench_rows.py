@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmark for table row formatting: the previous per-row strftime/f-string builder
+versus rows assembled from cached fragments (gtime.formatting), on 1000-row renders
+"""
+
+import sys
+import time
+import tracemalloc
+
+from gtime.core import current_time, get_time_emoji, get_greeting, format_utc_offset
+from gtime.data import CITY_DB
+from gtime.formatting import time_row
+from gtime.zones import localize
+
+def rows_before(found, ts):
+    for city, country, tz, emoji in found:
+        dt = localize(tz, ts)
+        hour = dt.hour
+        yield (
+            emoji, f"{city}, {country}", dt.strftime('%a, %b %d %I:%M %p'),
+            f"{get_time_emoji(hour)} {get_greeting(hour)}", format_utc_offset(dt.utcoffset())
+        )
+
+def rows_after(found, ts):
+    for city_info in found:
+        yield time_row(city_info, ts)
+
+def measure(builder, found, ts, renders):
+    list(builder(found, ts))  # warm caches and offset tables
+    start = time.perf_counter()
+    for _ in range(renders):
+        list(builder(found, ts))
+    per_row = (time.perf_counter() - start) / (renders * len(found))
+
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    rows = list(builder(found, ts))
+    kept = sys.getallocatedblocks() - blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return per_row, kept / len(found), peak / len(found)
+
+def bench_rows(count=1000, renders=50):
+    found = [CITY_DB[i % len(CITY_DB)] for i in range(count)]
+    ts = int(current_time())  # GTIME_NOW pins it for comparable runs
+    print(f"{count} rows x {renders} renders")
+    results = {}
+    for name, builder in (("before", rows_before), ("after", rows_after)):
+        results[name] = per_row, blocks, peak = measure(builder, found, ts, renders)
+        print(f"{name:>6}: {per_row * 1e6:.2f} us/row, {blocks:.1f} live blocks/row, {peak:.0f} peak bytes/row")
+    before, after = results["before"], results["after"]
+    print(f"speedup {before[0] / after[0]:.1f}x, {before[1] - after[1]:.1f} fewer live blocks/row")
+
+if __name__ == "__main__":
+    bench_rows(*[int(a) for a in sys.argv[1:3]])
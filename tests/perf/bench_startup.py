@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cold-start benchmark for gtime commands: the current entry point against main() as it was before
+the command registry, taken from git and run against the current package
+Usage: bench_startup.py [runs] [base-revision]   (default base: the parent of the commit that added the registry)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[2]
+
+# The current run goes through the installed entry point, which answers --complete without
+# gtime.cli; the base run loads the old gtime/cli.py as a module of the current package
+RUNNER = """
+import sys
+arm, sys.argv = sys.argv[1], ["gtime"] + sys.argv[2:]
+if arm == "current":
+    from gtime.complete import main
+else:
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("gtime._base_cli", arm)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    main = module.main
+main()
+"""
+
+COMMANDS = [
+    ["-h"],
+    ["London"],
+    ["compare", "London", "Tokyo"],
+    ["list"],
+    ["--complete", "lon"],
+    ["convert", "--from", "2025-01-01", "--to", "1h", "London"],
+]
+
+# Both arms load cached bytecode, as an installed gtime does (the first run of each writes it)
+ENV = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=REPO, capture_output=True, text=True, check=True).stdout
+
+def base_revision():
+    added = git("log", "--reverse", "--format=%H", "-S", "def command(", "--", "gtime/cli.py").split()
+    return f"{added[0]}^"
+
+def wall(cmd, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, capture_output=True, env=ENV)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[runs // 2] * 1000
+
+def bench_startup(runs=15, base=None):
+    base = base or base_revision()
+    interpreter = wall([sys.executable, "-c", "pass"], runs)
+    print(f"Interpreter alone: {interpreter:.1f} ms (median of {runs}); base: {base}")
+    print(f"{'command':<40} {'base':>9} {'current':>9} {'saved':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        base_cli = Path(tmp) / "cli.py"
+        base_cli.write_text(git("show", f"{base}:gtime/cli.py"), encoding="utf-8")
+        for args in COMMANDS:
+            before = wall([sys.executable, "-c", RUNNER, str(base_cli), *args], runs)
+            after = wall([sys.executable, "-c", RUNNER, "current", *args], runs)
+            print(f"{' '.join(args):<40} {before:>7.1f}ms {after:>7.1f}ms {before - after:>7.1f}ms")
+
+if __name__ == "__main__":
+    bench_startup(*[int(a) for a in sys.argv[1:2]], *sys.argv[2:3])
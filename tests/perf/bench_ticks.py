@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cost of the NDJSON tick stream (gtime.ticks) over a long run: simulated days of ticks for a set of
+cities with a fake clock, written to a null sink. Reports time per tick and per record, and the
+memory still held at the end against the first day, which should not grow with the run length.
+Usage: bench_ticks.py [cities] [days] [every_seconds]   (defaults: 20 7 60)
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+from gtime.data import CITY_DB
+from gtime.ticks import stream
+
+class NullSink:
+    def __init__(self):
+        self.records = 0
+
+    def write(self, text):
+        self.records += text.count("\n")
+
+    def flush(self):
+        pass
+
+def run(found, start, ticks, every):
+    now = [float(start)]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    sink = NullSink()
+    stream(found, sink, every, count=ticks, clock=lambda: now[0], sleep=sleep)
+    return sink.records
+
+def bench_ticks(cities=20, days=7, every=60):
+    found = CITY_DB[::max(1, len(CITY_DB) // cities)][:cities]
+    start = int(os.environ.get("GTIME_NOW", "1735689600"))  # 2025-01-01, for comparable runs
+    ticks = days * 86400 // every
+    print(f"{len(found)} cities, {days} days at one tick per {every}s ({ticks} ticks)")
+
+    tracemalloc.start()
+    run(found, start, 86400 // every, every)
+    day_one = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    records = run(found, start, ticks, every)
+    elapsed = time.perf_counter() - started
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"  {elapsed * 1e6 / ticks:8.1f} us per tick, {elapsed * 1e6 / records:6.2f} us per record (traced)")
+    print(f"  {elapsed / (days * 86400) * 100:.5f}% of one core over the run; "
+          f"memory held after the run vs. one day: {(held - day_one) / 1024:+.1f} KiB")
+
+if __name__ == "__main__":
+    bench_ticks(*[int(a) for a in sys.argv[1:4]])
@@ -4,6 +4,7 @@ import subprocess
 import sys
 import os
 import json
+import time
 from pathlib import Path
 import pytest
 from datetime import datetime
@@ -12,15 +13,28 @@ import pytz
 SCRIPT = "gtime" # Entry point for the CLI
 
 FAV_FILE = Path.home() / ".gtime_favorites.json"
+ALIAS_FILE = Path.home() / ".cache" / "gtime" / "aliases.json"
 
 @pytest.fixture(autouse=True)
 def cleanup_favs():
-    # Remove favorites file before and after each test
-    if FAV_FILE.exists():
-        FAV_FILE.unlink()
+    # Remove favorites and learned aliases before and after each test
+    for path in (FAV_FILE, ALIAS_FILE):
+        if path.exists():
+            path.unlink()
     yield
-    if FAV_FILE.exists():
-        FAV_FILE.unlink()
+    for path in (FAV_FILE, ALIAS_FILE):
+        if path.exists():
+            path.unlink()
+
+@pytest.fixture
+def local_zone(monkeypatch):
+    # Set the machine's local zone (TZ) for this test, for this process and its subprocesses
+    def pin(name):
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+    yield pin
+    monkeypatch.undo()
+    time.tzset()
 
 def run_cli(*args):
     env = os.environ.copy()
@@ -273,3 +287,759 @@ def test_fuzzy_search_with_favorites():
 def test_compare_with_improved_search():
     out = run_cli("compare", "pairs", "toky")
     assert out.returncode == 0
+
+def test_http_resolve_endpoint():
+    from gtime.server import handle_request
+    status, body = handle_request("GET", "/resolve?q=lond")
+    assert status == 200
+    assert json.loads(body)["match"]["city"] == "London"
+
+def test_http_batch_time_endpoint():
+    from gtime.server import handle_request
+    status, body = handle_request("POST", "/time", json.dumps(["Tokyo", "NotACity"]).encode())
+    assert status == 200
+    tokyo, missing = json.loads(body)
+    assert tokyo["tz"] == "Asia/Tokyo"
+    assert tokyo["offset"] == "UTC+9"
+    assert "error" in missing
+
+def test_http_convert_and_meeting_endpoints():
+    from gtime.server import handle_request
+    status, body = handle_request("GET", "/convert?time=12:00&from=UTC&to=Tokyo")
+    assert status == 200
+    assert json.loads(body)["local_time"][11:16] == "21:00"
+    status, body = handle_request("GET", "/meeting?time=12:00&from=UTC&cities=London,Tokyo")
+    rows = json.loads(body)["rows"]
+    assert [row["city"] for row in rows] == ["London", "Tokyo"]
+    status, _ = handle_request("GET", "/nope")
+    assert status == 404
+
+def test_http_rejects_bad_params_and_headers(monkeypatch):
+    import asyncio
+    from gtime import server
+    from gtime.server import handle_request, _handle_connection
+    for body in ({"time": "12:00", "cities": 5}, {"time": "12:00", "cities": [1]}, {"time": 12}):
+        status, payload = handle_request("POST", "/meeting", json.dumps(body).encode())
+        assert status == 400 and "error" in json.loads(payload)
+    assert handle_request("POST", "/resolve", b"[5]")[0] == 200
+    def broken(params):
+        raise TypeError("boom")
+    monkeypatch.setitem(server.ENDPOINTS, "/resolve", (broken, "q"))
+    status, payload = handle_request("GET", "/resolve?q=Paris-broken")
+    assert status == 500 and json.loads(payload) == {"error": "internal error: TypeError"}
+
+    async def exchange(request):
+        server = await asyncio.start_server(_handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            return response
+
+    for length in (b"abc", b"-5"):
+        response = asyncio.run(exchange(b"POST /resolve HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n"))
+        assert response.startswith(b"HTTP/1.1 400") and b"Content-Length" in response.split(b"\r\n\r\n", 1)[1]
+    response = asyncio.run(exchange(b"GET /" + b"x" * 70000 + b" HTTP/1.1\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 400")
+    for headers in (b"X-Pad: 1\r\n" * 101, b"X-Pad: " + b"x" * 70000 + b"\r\n"):
+        response = asyncio.run(exchange(b"GET /time?city=Tokyo HTTP/1.1\r\n" + headers + b"\r\n"))
+        assert response.startswith(b"HTTP/1.1 431 Request Header Fields Too Large")
+
+def test_http_slow_queries_do_not_block_cached_ones(monkeypatch):
+    import asyncio
+    from gtime import server
+    from gtime.server import handle_request, _handle_connection
+    monkeypatch.setenv("GTIME_NOW", "2025-01-15T12:00:30Z")  # the cached answer stays current
+    assert handle_request("GET", "/time?city=Tokyo")[0] == 200
+    def slow(params):
+        time.sleep(0.5)
+        return {"slow": True}
+    monkeypatch.setitem(server.ENDPOINTS, "/resolve", (slow, "q"))
+
+    async def exchange(port, request, finished):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        response = await reader.read()
+        writer.close()
+        finished.append(response.split(b"\r\n\r\n", 1)[1])
+
+    async def both():
+        finished = []
+        listener = await asyncio.start_server(_handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            slow_query = asyncio.create_task(exchange(port, b"GET /resolve?q=x HTTP/1.0\r\n\r\n", finished))
+            await asyncio.sleep(0.1)
+            await exchange(port, b"GET /time?city=Tokyo HTTP/1.0\r\n\r\n", finished)
+            await slow_query
+        return finished
+
+    cached, slowest = asyncio.run(both())
+    assert json.loads(cached)["tz"] == "Asia/Tokyo" and json.loads(slowest) == {"slow": True}
+
+def test_zone_transition_table():
+    from gtime import zones
+    changes = list(zones.transitions("Europe/London", zones.year_start(2025), zones.year_start(2026)))
+    assert changes == [(1743296400, 0, 3600), (1761440400, 3600, 0)]
+    assert zones.offset_at("Europe/London", 1743296399) == 0
+    assert zones.offset_at("Europe/London", 1743296400) == 3600
+    assert list(zones.transitions("Asia/Tokyo", zones.year_start(2025), zones.year_start(2026))) == []
+
+def test_transitions_command():
+    run_cli("add", "London")
+    out = run_cli("transitions", "--days", "400")
+    assert out.returncode == 0
+    assert "London" in out.stdout
+    assert "UTC+1" in out.stdout and "UTC+0" in out.stdout
+
+def test_compare_sort_keys():
+    out = run_cli("compare", "Auckland", "Tokyo", "--sort", "offset")
+    assert out.stdout.index("Tokyo") < out.stdout.index("Auckland")
+    out = run_cli("compare", "Tokyo", "Auckland", "--sort", "name")
+    assert out.stdout.index("Auckland") < out.stdout.index("Tokyo")
+    out = run_cli("compare", "Tokyo", "--sort", "bogus")
+    assert "Invalid sort key" in out.stdout
+
+def test_large_favorites_list_is_paged():
+    from gtime.data import CITY_DB
+    with open(FAV_FILE, "w") as f:
+        json.dump([city for city, _, _, _ in CITY_DB[:120]], f)
+    out = run_cli("list", "--sort", "name")
+    assert out.returncode == 0
+    assert "Your Favorite Cities" in out.stdout
+    assert out.stdout.count("UTC Offset") == 1
+
+def test_complete_prefix_index():
+    out = run_cli("--complete", "lon")
+    assert out.stdout.splitlines()[0] == "London"
+    out = run_cli("--complete", "york")
+    assert "New York" in out.stdout.splitlines()
+
+def test_complete_does_not_import_the_lookup_layer():
+    code = ("import sys; sys.argv = ['gtime', '--complete', 'lon']; from gtime.complete import main; main(); "
+            "print(sorted(m for m in ('gtime.cli', 'gtime.core', 'gtime.data', 'zoneinfo') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert out.stdout.splitlines() == ["London", "[]"]
+
+def test_complete_ranks_favorites_first():
+    run_cli("add", "Lyon")
+    out = run_cli("--complete", "l")
+    assert out.stdout.splitlines()[0] == "Lyon"
+
+def test_complete_remove_offers_only_favorites():
+    run_cli("add", "Lyon")
+    run_cli("add", "New York")
+    assert run_cli("--complete", "--command", "remove", "l").stdout.splitlines() == ["Lyon"]
+    assert run_cli("--complete", "--command", "remove", "yo").stdout.splitlines() == ["New York"]
+    assert run_cli("--complete", "--command", "remove", "lon").stdout == ""
+    assert "London" in run_cli("--complete", "--command", "add", "lon").stdout.splitlines()
+
+def test_completion_scripts():
+    for shell in ("bash", "zsh", "fish"):
+        out = run_cli("--completion", shell)
+        assert "gtime --complete --command" in out.stdout
+
+def test_picker_incremental_filter():
+    from gtime.picker import IncrementalFilter
+    names = ["London (UK)", "Londonderry (UK)", "Lyon (France)", "Barcelona (Spain)"]
+    matcher = IncrementalFilter(names)
+    assert matcher.update("lon") == [0, 1, 3]
+    assert matcher.update("lond") == [0, 1]
+    assert matcher.update("lo") == [0, 1, 3]
+    assert matcher.top("lon") == [0, 1, 3]
+    assert matcher.update("yo") == [2]
+
+def test_add_and_compare_without_arguments_non_interactive():
+    out = run_cli("add")
+    assert "Usage: gtime add" in out.stdout
+    run_cli("add", "Tokyo")
+    out = run_cli("compare")
+    assert "Tokyo" in out.stdout
+
+def test_city_at_instant_across_dst():
+    out = run_cli("London", "--at", "2024-03-31T00:30Z")
+    assert "12:30 AM" in out.stdout and "UTC+0" in out.stdout
+    out = run_cli("London", "--at", "2024-03-31T01:30Z")
+    assert "02:30 AM" in out.stdout and "UTC+1" in out.stdout
+
+def test_compare_at_instant():
+    out = run_cli("compare", "Tokyo", "New York", "--at", "1999-12-31T23:00:00+00:00")
+    assert "Sat, Jan 01 08:00 AM" in out.stdout
+    assert "Fri, Dec 31 06:00 PM" in out.stdout
+    out = run_cli("London", "--at", "yesterday")
+    assert "Invalid instant" in out.stdout
+
+def test_convert_range_csv_across_dst():
+    out = run_cli("convert", "--from", "2024-03-31T00:00Z", "--to", "2h", "--step", "1h", "London", "Tokyo")
+    lines = out.stdout.splitlines()
+    assert lines[0] == "utc,London,Tokyo"
+    assert lines[1] == "2024-03-31T00:00:00Z,2024-03-31T00:00:00+00:00,2024-03-31T09:00:00+09:00"
+    assert lines[2] == "2024-03-31T01:00:00Z,2024-03-31T02:00:00+01:00,2024-03-31T10:00:00+09:00"
+    assert len(lines) == 4
+
+def test_convert_range_jsonl_and_durations():
+    from gtime.ranges import parse_duration
+    assert parse_duration("1h30m") == 5400
+    assert parse_duration("2w") == 14 * 86400
+    assert parse_duration("soon") == 0
+    out = run_cli("convert", "--from", "2025-01-01T00:00Z", "--to", "2025-01-01T00:45Z", "--step", "15m", "--format", "jsonl", "Kathmandu")
+    rows = [json.loads(line) for line in out.stdout.splitlines()]
+    assert len(rows) == 4
+    assert rows[-1] == {"utc": "2025-01-01T00:45:00Z", "Kathmandu": "2025-01-01T06:30:00+05:45"}
+
+def test_localize_csv_with_header(tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_text("id,utc_timestamp,city\n1,2024-03-31T00:30:00Z,London\n2,1711845000,Tokyo\n3,bad,London\n")
+    out = run_cli("localize", "--workers", "1", str(log))
+    assert out.stdout.splitlines() == [
+        "id,utc_timestamp,city,local_time",
+        "1,2024-03-31T00:30:00Z,London,2024-03-31T00:30:00+00:00",
+        "2,1711845000,Tokyo,2024-03-31T09:30:00+09:00",
+        "3,bad,London,",
+    ]
+    assert "1 of 3 rows" in out.stderr
+
+def test_localize_bad_rows_do_not_stop_the_run(tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_bytes(b"1700000000,London\n1700000000000,London\ninf,London\n\xff\xfe,Paris\n1700000000,Paris\n")
+    out = run_cli("localize", "--workers", "1", str(log))
+    lines = out.stdout.splitlines()
+    assert lines[0] == "1700000000,London,2023-11-14T22:13:20+00:00"
+    assert [line.rsplit(",", 1)[1] for line in lines[1:4]] == ["", "", ""]
+    assert lines[4] == "1700000000,Paris,2023-11-14T23:13:20+01:00"
+    assert "3 of 5 rows" in out.stderr
+
+def test_localize_pool_preserves_order(tmp_path):
+    import io
+    from gtime.localize import localize
+    log = tmp_path / "log.jsonl"
+    with open(log, "w") as f:
+        for i in range(500):
+            f.write(json.dumps({"ts": 1700000000 + i * 3600, "city": ["Paris", "Sydney"][i % 2], "n": i}) + "\n")
+    out = io.BytesIO()
+    assert localize(str(log), out, "jsonl", workers=2, chunk_bytes=1024) == (500, 0)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row["n"] for row in rows] == list(range(500))
+    assert rows[1]["local_time"] == "2023-11-15T10:13:20+11:00"
+
+def test_banner_only_for_commands_that_declare_it():
+    assert "Welcome" not in run_cli("London").stdout
+    assert "Welcome" not in run_cli("compare", "London", "Tokyo").stdout
+    assert "Welcome" not in run_cli("-h").stdout
+    assert "Welcome" in run_cli("list").stdout
+
+def test_command_registry_dependencies():
+    from gtime.cli import COMMANDS, Context
+    handler, needs, banner = COMMANDS["compare"]
+    assert "favorites" in needs and not banner
+    ctx = Context("convert", [], COMMANDS["convert"][1])
+    with pytest.raises(AttributeError, match="did not declare dependency 'favorites'"):
+        ctx.favorites
+
+def test_timeline_grid(local_zone):
+    # Columns start at the viewer's midnight (05:00 UTC in New York), not at midnight in --at's offset
+    local_zone("America/New_York")
+    out = run_cli("timeline", "London", "Kathmandu", "--at", "2025-01-01T06:30:00Z")
+    lines = out.stdout.splitlines()
+    assert "Timeline for Wed, Jan 01" in out.stdout
+    london = next(line for line in lines if line.startswith("London"))
+    kathmandu = next(line for line in lines if line.startswith("Kathmandu"))
+    assert london.split()[-1] == "".join(f"{h % 24:02}" for h in range(5, 29))
+    assert kathmandu.split()[-1].startswith("1011121314")
+    marker = next(line for line in lines if "▼ now" in line)
+    assert marker.index("▼") == london.index("06")
+
+def test_timeline_hours_option():
+    out = run_cli("timeline", "--hours", "48", "Tokyo")
+    assert "48h" in out.stdout
+    out = run_cli("timeline", "--hours", "12", "Tokyo")
+    assert "Invalid number of hours" in out.stdout
+
+def test_weekly_drift_merges_transitions():
+    import calendar
+    from gtime.zones import weekly_drift
+    wall = calendar.timegm((2025, 1, 6, 9, 0, 0))
+    rows = weekly_drift("America/New_York", wall, 52, ["Europe/London", "Asia/Tokyo", "America/Chicago"])
+    weeks = {week: drift for week, _, drift in rows}
+    assert weeks[9] == {"Europe/London": -3600, "Asia/Tokyo": -3600}
+    assert weeks[12] == {"Asia/Tokyo": -3600}
+    assert 43 not in weeks and 8 not in weeks
+
+def test_meeting_recur_reports_drift():
+    run_cli("add", "London")
+    out = run_cli("meeting", "recur", "9", "AM", "EST", "--weeks", "52", "--at", "2025-01-06")
+    assert "10–12" in out.stdout and "London" in out.stdout and "-1h" in out.stdout
+    out = run_cli("meeting", "recur", "9", "AM", "--weeks", "3")
+    assert "Usage: gtime meeting recur" in out.stdout
+
+def test_cache_build_stats_clear():
+    try:
+        out = run_cli("cache", "build")
+        assert "Built index snapshot" in out.stdout
+        assert "London" in run_cli("London").stdout
+        out = run_cli("cache", "stats")
+        assert "1 hits" in out.stdout and "offset tables" in out.stdout
+    finally:
+        out = run_cli("cache", "clear")
+    assert "Removed index snapshot" in out.stdout
+    assert "Not built" in run_cli("cache", "stats").stdout
+
+def test_snapshot_rejects_other_version(tmp_path, monkeypatch):
+    from gtime import snapshot
+    path = tmp_path / "index.snapshot"
+    monkeypatch.setattr(snapshot, "STATS_FILE", tmp_path / "index-stats.json")
+    snapshot.build(years=range(2025, 2026), path=path)
+    assert snapshot.load(path)["city_index"]["exact"]["london"] is not None
+    monkeypatch.setattr(snapshot, "__version__", "0.0.0")
+    assert snapshot.load(path) is None
+
+def test_snapshot_rejects_other_tz_database(tmp_path, monkeypatch):
+    from gtime import snapshot, tzindex
+    path = tmp_path / "index.snapshot"
+    for name, value in (("SNAPSHOT_FILE", path), ("STATS_FILE", tmp_path / "index-stats.json"),
+                        ("STATS_LOG", tmp_path / "index-stats.log"), ("_loaded", False)):
+        monkeypatch.setattr(snapshot, name, value)
+    snapshot.build(years=range(2025, 2026), path=path)
+    signature = tzindex._source_signature()
+    monkeypatch.setattr(tzindex, "_source_signature", lambda: signature + "|tzdata-upgraded")
+    assert snapshot.load_city_index() is None
+    assert (snapshot.stats(path)["misses"], snapshot.stats(path)["valid"]) == (1, False)
+
+def test_snapshot_hits_are_appended_by_the_main_process_only(tmp_path, monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+    from gtime import snapshot
+    path = tmp_path / "index.snapshot"
+    for name, value in (("SNAPSHOT_FILE", path), ("STATS_FILE", tmp_path / "index-stats.json"),
+                        ("STATS_LOG", tmp_path / "index-stats.log"), ("_loaded", False)):
+        monkeypatch.setattr(snapshot, name, value)
+    snapshot.build(years=range(2025, 2026), path=path)
+    stats_before = snapshot.STATS_FILE.read_text()
+    assert snapshot.load_city_index() is not None
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(snapshot._log, "hits").result()
+    assert snapshot.STATS_FILE.read_text() == stats_before
+    info = snapshot.stats(path)
+    assert (info["hits"], info["misses"], info["builds"]) == (1, 0, 1)
+
+def test_cached_row_fragments_match_strftime():
+    from gtime.core import ZoneInfo, format_utc_offset, get_time_emoji, get_greeting
+    from gtime.data import CITY_DB
+    from gtime.formatting import time_row
+    for ts in (1711846800, 1730000000, 1751328000):
+        for city_info in CITY_DB[::7]:
+            city, country, tz, emoji = city_info
+            dt = datetime.fromtimestamp(ts, ZoneInfo(tz))
+            assert time_row(city_info, ts) == (
+                emoji, f"{city}, {country}", dt.strftime('%a, %b %d %I:%M %p'),
+                f"{get_time_emoji(dt.hour)} {get_greeting(dt.hour)}", format_utc_offset(dt.utcoffset())
+            )
+
+def test_footer_templates():
+    from gtime.core import get_funny_footer, FOOTER_TEMPLATES
+    assert get_funny_footer("Paris", 9) == FOOTER_TEMPLATES["Good morning"][9 % len(FOOTER_TEMPLATES["Good morning"])].format(city="Paris")
+    assert "Paris" in get_funny_footer("Paris", 23)
+
+def test_zone_names_abbreviations_and_offsets():
+    from gtime.tzindex import parse_offset
+    assert parse_offset("UTC+5:45") == "UTC+05:45"
+    assert parse_offset("GMT-3") == "UTC-03:00"
+    assert parse_offset("+0530") == "UTC+05:30"
+    assert parse_offset("UTC+15") is None
+    out = run_cli("Asia/Kathmandu")
+    assert "UTC+5:45" in out.stdout
+    assert "New Zealand" in run_cli("NZST").stdout
+    assert "Fixed offset" in run_cli("UTC+5:45").stdout
+    assert "Istanbul" not in run_cli("IST").stdout
+    assert "Auckland" in run_cli("Auckland").stdout
+
+def test_city_names_outrank_zone_parts_and_lowercase_abbreviations():
+    from gtime.core import get_city_by_name, rank_cities
+    for query, city in (("eat", "Seattle"), ("lhi", "Delhi"), ("cat", "Muscat"), ("mst", "Amsterdam")):
+        assert get_city_by_name(query)[0] == city
+    assert get_city_by_name("EST")[2] == "America/New_York"
+    assert get_city_by_name("MST")[2] == "America/Denver"
+    assert [c for _, c in rank_cities("accra", k=3)].count(("Accra", "Ghana", "Africa/Accra", "🎶")) == 1
+    assert all(c[0] != "Africa/Accra" for _, c in rank_cities("accra", k=3))
+    assert get_city_by_name("Africa/Accra")[:2] == ("Accra", "Ghana")
+
+def test_meeting_at_zone_abbreviation():
+    from gtime.core import parse_meeting_time
+    meeting_time, info = parse_meeting_time(["at", "9:00", "NZST"])
+    assert info == "Pacific/Auckland (NZST)"
+    assert meeting_time is not None
+    meeting_time, info = parse_meeting_time(["at", "9:00", "UTC+05:45"])
+    assert info == "UTC+5:45"
+    meeting_time, info = parse_meeting_time(["at", "9", "am"])
+    assert info is None and meeting_time.hour == 9
+
+def test_dashboard_scheduler_wakes_only_when_due():
+    from gtime.core import get_city_by_name
+    from gtime.dashboard import ClockPanel, TimelinePanel, run
+
+    class Stop(Exception):
+        pass
+
+    clock = [1711846800.0 - 3 * 3600 + 30]  # 3.5 hours before London's 2024 spring-forward, mid-minute
+    renders = {"clock": 0, "timeline": 0}
+
+    class Counted:
+        def __init__(self, panel, name):
+            self.panel, self.name = panel, name
+            self.found = panel.found
+        def render(self, ts):
+            renders[self.name] += 1
+            return None
+        def due(self, ts):
+            return self.panel.due(ts)
+
+    def sleep(seconds):
+        assert seconds > 0
+        clock[0] += seconds
+        if clock[0] >= 1711846800 + 3600:
+            raise Stop()
+
+    found = [get_city_by_name("London"), get_city_by_name("Tokyo")]
+    panels = [Counted(ClockPanel("Favorites", found), "clock"), Counted(TimelinePanel(found), "timeline")]
+    wakeups = []
+    with pytest.raises(Stop):
+        run(panels, lambda ts, rendered: wakeups.append(ts), clock=lambda: clock[0], sleep=sleep,
+            monotonic=lambda: clock[0])
+    # The first draw, then one wakeup per minute boundary until the stop 3h59m30s later
+    assert len(wakeups) == 4 * 60
+    assert renders["clock"] == len(wakeups)
+    assert renders["timeline"] <= 1 + 4 + 1
+    assert 1711846800 in wakeups
+
+def test_dashboard_with_a_pinned_clock_still_sleeps_and_redraws():
+    from gtime.core import get_city_by_name
+    from gtime.dashboard import ClockPanel, run
+
+    class Stop(Exception):
+        pass
+
+    pinned, elapsed, sleeps, draws = 1711846800 + 30, [0.0], [], []
+
+    def sleep(seconds):
+        assert seconds > 0
+        sleeps.append(seconds)
+        elapsed[0] += seconds
+        if len(sleeps) == 5:
+            raise Stop()
+
+    with pytest.raises(Stop):
+        run([ClockPanel("Favorites", [get_city_by_name("London")])], lambda ts, rendered: draws.append(ts),
+            clock=lambda: pinned, sleep=sleep, monotonic=lambda: elapsed[0])
+    # One wakeup per minute-to-go of the pinned instant, every draw shows the pinned instant
+    assert sleeps == [30.0] * 5
+    assert draws == [pinned] * 5
+
+def test_dashboard_once():
+    run_cli("add", "London")
+    out = run_cli("dashboard", "work=Tokyo,Sydney", "favorites", "timeline", "--once")
+    assert "work" in out.stdout and "Sydney" in out.stdout
+    assert "Your Favorite Cities" in out.stdout and "Timeline for" in out.stdout
+    out = run_cli("dashboard", "bogus", "--once")
+    assert "Unknown panel" in out.stdout
+
+def test_team_load_and_show(tmp_path):
+    from gtime.team import TEAM_FILE
+    roster = tmp_path / "roster.csv"
+    roster.write_text("name,city,team\nAda,London,core\nBo,Tokyo,core\nCy,London,core\nEd,Chicago,infra\n")
+    try:
+        out = run_cli("team", "load", str(roster))
+        assert "Loaded team core: 3 members in 2 zones" in out.stdout
+        out = run_cli("team", "show", "core", "--sort", "offset")
+        assert "2: Ada, Cy" in out.stdout and "1: Bo" in out.stdout
+        assert out.stdout.index("London") < out.stdout.index("Tokyo")
+        # Monday 10:00 UTC: London is working, Tokyo (19:00) is not
+        out = run_cli("team", "show", "core", "--working", "--at", "2025-03-03T10:00Z")
+        assert "2 of 3 members in working hours" in out.stdout and "Bo" not in out.stdout
+        assert "Team not found" in run_cli("team", "show", "nope").stdout
+    finally:
+        if TEAM_FILE.exists():
+            TEAM_FILE.unlink()
+
+def test_team_zone_groups_and_working_hours():
+    from gtime.team import zone_groups, is_working
+    members = [["A", "London", "UK", "Europe/London", ""], ["B", "Paris", "France", "Europe/Paris", ""],
+               ["C", "Bristol", "UK", "Europe/London", ""]]
+    groups = zone_groups(members, 1741000000)
+    assert [(tz, offset, [m[0] for m in group]) for tz, offset, group in groups] == [
+        ("Europe/London", 0, ["A", "C"]), ("Europe/Paris", 3600, ["B"])]
+    assert is_working(1741000000, 0)  # Monday 11:06 UTC
+    assert not is_working(1741000000 + 5 * 86400, 0)  # Saturday
+
+def test_rank_cities_tiers_and_weights():
+    from gtime.core import rank_cities, get_city_by_name, TIER_EXACT, TIER_PREFIX, TIER_FUZZY
+    ranked = rank_cities("san", k=3)
+    assert len(ranked) == 3 and all(tier == TIER_PREFIX for tier, _ in ranked)
+    assert ranked[0][1][0] == "San Francisco"
+    assert rank_cities("san", k=3, weights={"San Diego": 1})[0][1][0] == "San Diego"
+    assert rank_cities("Santiago (Chile)", k=1)[0] == (TIER_EXACT, get_city_by_name("Santiago"))
+    tiers = [tier for tier, _ in rank_cities("Lon", k=5)]
+    assert tiers == sorted(tiers) and tiers[0] == TIER_PREFIX and tiers[-1] == TIER_FUZZY
+
+def test_ambiguous_city_offers_choices():
+    out = run_cli("san")
+    assert "San Francisco" in out.stdout
+    assert "Also matches:" in out.stdout and "Santiago (Chile)" in out.stdout
+    assert "Also matches" not in run_cli("pairs").stdout
+
+def test_fuzzy_backends_agree():
+    from gtime.core import best_matches, score_matrix, scorer_backend
+    choices = ["Paris (France)", "Parma (Italy)", "Perth (Australia)", "Porto (Portugal)", "Tokyo (Japan)"]
+    queries = ["pairs", "prth", "tokio", "porto portgal", "", "zz"]
+    expected = best_matches(queries, choices, limit=3, backend="python")
+    assert [row[0][0] for row in expected[:4]] == [0, 2, 4, 3]
+    assert best_matches(queries, choices, limit=3, backend="rapidfuzz") == expected
+    assert list(score_matrix(queries, choices, backend="rapidfuzz")) == list(score_matrix(queries, choices, backend="python"))
+    with pytest.raises(ValueError):
+        scorer_backend("bogus")
+
+def test_scorer_backend_from_environment():
+    out = subprocess.run([sys.executable, "-c", "from gtime.core import scorer_backend; print(scorer_backend())"],
+                         capture_output=True, text=True, env={**os.environ, "GTIME_SCORER": "python"})
+    assert out.stdout.strip() == "python"
+    env = {**os.environ, "GTIME_SCORER": "python", "PYTHONIOENCODING": "utf-8"}
+    out = subprocess.run([SCRIPT, "pairs"], capture_output=True, text=True, env=env)
+    assert "Paris" in out.stdout
+
+def test_learned_alias_skips_fuzzy_search():
+    for _ in range(3):
+        assert "Frankfurt" in run_cli("Frankfort").stdout
+    code = ("import sys, thefuzz\n"
+            "sys.modules['thefuzz.process'] = None\n"
+            "from gtime.core import get_city_by_name\n"
+            "print(get_city_by_name('Frankfort'))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert "Frankfurt" in out.stdout, out.stderr
+    assert "1 answering without fuzzy search" in run_cli("cache", "stats").stdout
+
+def test_alias_learning_confirmation_and_eviction(tmp_path, monkeypatch):
+    from gtime import aliases
+    from gtime.core import get_city_by_name
+    monkeypatch.setattr(aliases, "ALIAS_FILE", tmp_path / "aliases.json")
+    monkeypatch.setattr(aliases, "_table", None)
+    monkeypatch.setattr(aliases, "MAX_ALIASES", 2)
+    zurich, paris = get_city_by_name("Zurich"), get_city_by_name("Paris")
+    aliases.learn("zurik", zurich)
+    assert aliases.lookup("zurik") is None
+    aliases.remember_suggestions("zrch", ["Zurich (Switzerland)"])
+    aliases.confirm_suggestion(zurich)
+    assert aliases.lookup("ZRCH") == zurich
+    aliases.learn("pariss", paris, confirmed=True)
+    aliases.learn("zurikh", zurich)
+    # Two entries at most: the least used alias goes first
+    assert set(aliases._load()["aliases"]) == {"zrch", "pariss"}
+
+def test_alias_hits_are_written_once_at_exit(tmp_path, monkeypatch):
+    from gtime import aliases
+    from gtime.core import get_city_by_name
+    path = tmp_path / "aliases.json"
+    monkeypatch.setattr(aliases, "ALIAS_FILE", path)
+    monkeypatch.setattr(aliases, "_table", None)
+    aliases.learn("zurik", get_city_by_name("Zurich"), confirmed=True)
+    saved = path.read_text()
+    for _ in range(5):
+        assert aliases.lookup("zurik")[0] == "Zurich"
+    assert path.read_text() == saved
+    aliases._flush()
+    assert json.loads(path.read_text())["aliases"]["zurik"]["uses"] == aliases.PROMOTE_AFTER + 5
+
+ICS_SAMPLE = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+UID:sync
+SUMMARY:Weekly sync\\, team
+DTSTART;TZID=America/New_York:20250303T090000
+DTEND;TZID=America/New_York:20250303T093000
+RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20250401T000000Z
+EXDATE;TZID=America/New_York:20250317T090000
+BEGIN:VALARM
+TRIGGER:-PT15M
+END:VALARM
+END:VEVENT
+BEGIN:VEVENT
+UID:launch
+SUMMARY:Launch with a summary that is fol
+ ded
+DTSTART:20250320T150000Z
+DURATION:PT1H
+END:VEVENT
+END:VCALENDAR
+"""
+
+def test_ics_streaming_parser_and_recurrences():
+    from gtime.ics import events, occurrences, localized
+    parsed = list(events(iter(ICS_SAMPLE.splitlines(True))))
+    assert [event["UID"][0][1] for event in parsed] == ["sync", "launch"]
+    assert "TRIGGER" not in parsed[0]
+    start, end = 1740787200, 1744243200  # 2025-03-01 .. 2025-04-10 UTC
+    found = list(localized(occurrences(parsed, start, end), ["Europe/London"], batch=2))
+    # 9:00 New York every Monday except the 17th, across both DST changes
+    assert [(item[0], offsets) for item, offsets in found] == [
+        (1741010400, (0,)), (1741611600, (0,)), (1742821200, (0,)), (1743426000, (3600,)), (1742482800, (0,))]
+    assert found[-1][0][2] == "Launch with a summary that is folded" and found[-1][0][1] == 1742482800 + 3600
+
+def test_ics_old_series_start_near_the_window():
+    import datetime as dt
+    from gtime.core import get_tzinfo
+    from gtime.ics import _skip_ahead, occurrences
+    first = dt.datetime(1985, 1, 31, 9, 0, tzinfo=get_tzinfo("America/New_York"))
+    start, end = 1740787200, 1744243200  # 2025-03-01 .. 2025-04-10 UTC
+    rule, moved = _skip_ahead("FREQ=WEEKLY", first, start)
+    assert rule == "FREQ=WEEKLY;BYDAY=TH" and moved.hour == 9 and 0 < start - moved.timestamp() <= 14 * 86400
+    rule, moved = _skip_ahead("FREQ=MONTHLY", first, start)
+    assert rule == "FREQ=MONTHLY;BYMONTHDAY=31" and moved.year == 2025
+    assert _skip_ahead("FREQ=WEEKLY;COUNT=5", first, start) == ("FREQ=WEEKLY;COUNT=5", first)
+    event = {"DTSTART": [({"TZID": "America/New_York"}, "19850131T090000")], "RRULE": [({}, "FREQ=MONTHLY")]}
+    # Monthly on the 31st: only March 2025 has one inside the window
+    assert [ts for ts, *_ in occurrences([event], start, end)] == [1743426000]
+
+def test_ics_command_jsonl(tmp_path):
+    calendar = tmp_path / "cal.ics"
+    calendar.write_text(ICS_SAMPLE)
+    out = run_cli("ics", str(calendar), "--from", "2025-03-01T00:00Z", "--to", "2025-03-12T00:00Z", "--format", "jsonl", "Tokyo")
+    rows = [json.loads(line) for line in out.stdout.splitlines()]
+    assert [row["Tokyo"] for row in rows] == ["2025-03-03T23:00:00+09:00", "2025-03-10T22:00:00+09:00"]
+    assert rows[0]["summary"] == "Weekly sync, team"
+    assert "Usage: gtime ics" in run_cli("ics").stdout
+
+def test_overlap_matrix_intervals():
+    from gtime.overlap import overlap_matrix, day_arcs, intersect
+    assert day_arcs(9 * 3600) == [(0, 8 * 3600)]
+    assert day_arcs(-10 * 3600) == [(19 * 3600, 86400), (0, 3 * 3600)]
+    assert intersect([(0, 10), (20, 30)], [(5, 25)]) == 10
+    day = 20159  # Wed, 2025-03-12: New York already on daylight time, London not yet
+    zones = ["Europe/London", "America/New_York", "Asia/Tokyo", "Asia/Kolkata"]
+    assert overlap_matrix(zones, day) == [
+        [480, 240, 0, 150], [240, 480, 0, 0], [0, 0, 480, 270], [150, 0, 270, 480]]
+    assert overlap_matrix(zones, day, week=True)[0][:2] == [2400, 1200]
+    # Honolulu's working day ends during Auckland's next morning: 7h a day, but Honolulu's
+    # Friday afternoon is Auckland's Saturday, so the week shares four days rather than five
+    pair = ["Pacific/Auckland", "Pacific/Honolulu"]
+    assert overlap_matrix(pair, day)[0][1] == 420
+    assert overlap_matrix(pair, day, week=True)[0][1] == 4 * 420
+
+def test_overlap_command_csv():
+    out = run_cli("overlap", "London", "New York", "--format", "csv", "--at", "2025-03-12T12:00Z")
+    assert out.stdout.splitlines() == ["city,London,New York", "London,480,240", "New York,240,480"]
+    assert "Need at least two cities" in run_cli("overlap", "London").stdout
+
+def test_gtime_now_pins_the_clock():
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8", "GTIME_NOW": "2025-01-15T12:00:00Z"}
+    out = subprocess.run([SCRIPT, "compare", "London", "Tokyo"], capture_output=True, text=True, env=env)
+    assert "Wed, Jan 15 12:00 PM" in out.stdout and "Wed, Jan 15 09:00 PM" in out.stdout
+    env["GTIME_NOW"] = "1736942400"
+    out = subprocess.run([SCRIPT, "London"], capture_output=True, text=True, env=env)
+    assert "January 15, 2025" in out.stdout and "12:00 PM" in out.stdout
+
+def test_set_now_api(local_zone):
+    from gtime.core import set_now, current_time, current_datetime, parse_meeting_time
+    local_zone("Pacific/Auckland")  # already July 5th there at the pinned instant
+    try:
+        set_now(datetime(2025, 7, 4, 16, 30, tzinfo=pytz.utc))
+        assert current_time() == 1751646600
+        assert current_datetime().timestamp() == 1751646600
+        meeting_time, _ = parse_meeting_time(["at", "9:00", "UTC"])
+        assert meeting_time.astimezone(pytz.utc).date().isoformat() == "2025-07-04"
+        meeting_time, _ = parse_meeting_time(["at", "9:00"])
+        assert meeting_time.date() == datetime.fromtimestamp(1751646600).date()
+        assert meeting_time.date().isoformat() == "2025-07-05"
+    finally:
+        set_now(None)
+    assert current_time() != 1751646600
+
+def test_watch_stream_json():
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8", "GTIME_NOW": "2025-01-15T12:00:00Z"}
+    out = subprocess.run([SCRIPT, "watch", "--stream", "json", "--count", "1", "London", "Tokyo"],
+                         capture_output=True, text=True, env=env)
+    records = [json.loads(line) for line in out.stdout.splitlines()]
+    assert records == [
+        {"city": "London", "country": "UK", "zone": "Europe/London", "local": "2025-01-15T12:00:00+00:00",
+         "offset": 0, "phase": "afternoon", "ts": 1736942400},
+        {"city": "Tokyo", "country": "Japan", "zone": "Asia/Tokyo", "local": "2025-01-15T21:00:00+09:00",
+         "offset": 32400, "phase": "night", "ts": 1736942400},
+    ]
+    out = subprocess.run([SCRIPT, "watch", "--stream", "xml"], capture_output=True, text=True, env=env)
+    assert out.stdout == "" and "Usage" in out.stderr
+
+def test_tick_stream_changes_and_transitions():
+    import io
+    from gtime.ticks import stream
+    from gtime.core import get_city_by_name
+    now = [1743296370.0]  # 2025-03-30 00:59:30 UTC, half a minute before London's clocks go forward
+    def sleep(seconds):
+        now[0] += seconds
+    out = io.StringIO()
+    assert stream([get_city_by_name("London")], out, every=20, changes=True, count=5,
+                  clock=lambda: now[0], sleep=sleep) == 5
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["local"] for r in records] == ["2025-03-30T00:59:30+00:00", "2025-03-30T02:00:00+01:00"]
+    assert [r["offset"] for r in records] == [0, 3600]
+
+def test_meeting_for_cities_in_zone(local_zone):
+    # 06:00 UTC is still the 14th in Los Angeles but already the 15th in Tokyo, where the meeting is
+    local_zone("America/Los_Angeles")
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8", "GTIME_NOW": "2025-01-15T06:00:00Z"}
+    fav_file = os.path.expanduser("~/.gtime_favorites.json")
+    out = subprocess.run([SCRIPT, "meeting", "at", "10:00", "in", "Tokyo", "for", "London", "New York", "London"],
+                         capture_output=True, text=True, env=env)
+    assert "Meeting Times" in out.stdout
+    assert "Wed, Jan 15 01:00 AM" in out.stdout and "Tue, Jan 14 08:00 PM" in out.stdout
+    assert out.stdout.count("London, UK") == 1
+    assert "converted from Tokyo (Asia/Tokyo)" in out.stdout
+    assert not os.path.exists(fav_file)
+    from gtime.core import set_now, parse_meeting_time
+    try:
+        set_now(1736920800)
+        meeting_time, _ = parse_meeting_time(["at", "10:00"], zone="Asia/Tokyo")
+        assert meeting_time.astimezone(pytz.utc).isoformat() == "2025-01-15T01:00:00+00:00"
+    finally:
+        set_now(None)
+
+def test_meeting_for_cities_from_stdin():
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8", "GTIME_NOW": "2025-01-15T06:00:00Z"}
+    out = subprocess.run([SCRIPT, "meeting", "at", "3", "PM", "EST", "for"], input="Paris\n\n# team\nKathmandu\n",
+                         capture_output=True, text=True, env=env)
+    assert "Paris, France" in out.stdout and "Kathmandu, Nepal" in out.stdout
+    assert "UTC+5:45" in out.stdout and "Eastern Standard Time (EST)" in out.stdout
+
+def test_next_wall_time_gaps_and_repeats():
+    import calendar
+    from gtime.zones import next_wall_time, wall_instants, NEXT_GAP, NEXT_REPEAT
+    # London skips 01:30 on 2025-03-30 and reads it twice on 2025-10-26
+    assert wall_instants("Europe/London", calendar.timegm((2025, 3, 30, 1, 30, 0))) == []
+    assert next_wall_time("Europe/London", 5400, calendar.timegm((2025, 3, 29, 12, 0, 0))) == (
+        calendar.timegm((2025, 3, 31, 0, 30, 0)), NEXT_GAP)
+    # The change at 01:00 UTC still lies ahead a second before it, but not once 01:30 was skipped
+    assert next_wall_time("Europe/London", 5400, calendar.timegm((2025, 3, 30, 0, 59, 59))) == (
+        calendar.timegm((2025, 3, 31, 0, 30, 0)), NEXT_GAP)
+    assert next_wall_time("Europe/London", 5400, calendar.timegm((2025, 3, 30, 12, 0, 0))) == (
+        calendar.timegm((2025, 3, 31, 0, 30, 0)), "")
+    first, second = calendar.timegm((2025, 10, 26, 0, 30, 0)), calendar.timegm((2025, 10, 26, 1, 30, 0))
+    assert next_wall_time("Europe/London", 5400, first - 60) == (first, NEXT_REPEAT)
+    assert next_wall_time("Europe/London", 5400, first + 60) == (second, NEXT_REPEAT)
+    assert next_wall_time("Asia/Tokyo", 9 * 3600, calendar.timegm((2025, 1, 15, 0, 0, 0))) == (
+        calendar.timegm((2025, 1, 15, 0, 0, 0)), "")
+
+def test_next_command_sorted_by_soonest():
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8", "GTIME_NOW": "2025-01-15T06:00:00Z", "COLUMNS": "120"}
+    out = subprocess.run([SCRIPT, "next", "9", "AM", "London", "Tokyo", "New York"], capture_output=True, text=True, env=env)
+    lines = out.stdout
+    assert lines.index("London, UK") < lines.index("New York, USA") < lines.index("Tokyo, Japan")
+    assert "Thu, Jan 16 09:00 AM" in lines and " 3h " in lines
+    out = subprocess.run([SCRIPT, "next"], capture_output=True, text=True, env=env)
+    assert "Usage" in out.stdout
+
+def test_picked_city_rows_keep_their_country(capsys, monkeypatch):
+    from gtime import cli
+    from gtime.core import load_favorites
+    paris_texas = ("Paris", "USA", "America/Chicago", "🤠")
+    cli.print_compare([paris_texas, "Tokyo"], at=datetime(2025, 1, 15, 12, tzinfo=pytz.utc))
+    out = capsys.readouterr().out
+    assert "Paris, USA" in out and "UTC-6" in out and "France" not in out
+    monkeypatch.setattr(cli, "CITY_DB", cli.CITY_DB + [paris_texas])
+    cli.add_favorite(paris_texas, [])
+    assert load_favorites() == ["Paris (USA)"]